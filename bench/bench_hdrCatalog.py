@@ -0,0 +1,68 @@
+# Benchmarks for hdrCatalog.py.  Run them with "python -m bench.bench_hdrCatalog" from the tools folder.
+import os
+import shutil
+import tempfile
+import timeit
+from bench import standIn
+from hdrCatalog import EN_HdrCatalog, EN_HdrMipCache
+import hdrReader
+
+
+# Times indexing a library of generated Radiance images, refreshing it when nothing has changed and making the
+# thumbnails.  Returns the seconds taken by each.
+def benchmarkCatalog(count=50, width=512, height=256):
+    library = tempfile.mkdtemp()
+    catalogFolder = tempfile.mkdtemp()
+    try:
+        for index in range(count):
+            hdrReader.writeTestImage(os.path.join(library, "environment%03d.hdr" % index), width, height)
+        catalog = EN_HdrCatalog(catalogFolder)
+        times = {}
+        for label, work in (("index", lambda: catalog.refresh(library)),
+                            ("refresh", lambda: EN_HdrCatalog(catalogFolder).refresh(library)),
+                            ("thumbnails", lambda: [catalog.thumbnail(path) for path in catalog.images()]),
+                            ("read thumbnails", lambda: [EN_HdrCatalog(catalogFolder).thumbnail(path)
+                                                         for path in catalog.images()])):
+            startTime = timeit.default_timer()
+            work()
+            times[label] = timeit.default_timer() - startTime
+            print "%s: %.1f ms for %d images" % (label, times[label]*1000.0, count)
+    finally:
+        shutil.rmtree(library)
+        shutil.rmtree(catalogFolder)
+    return times
+
+
+# Times getting preview levels of generated lat-long Radiance images from the mip cache: making them, reading the
+# manifests back from disk, and using the manifests already in memory.  Returns the seconds taken by each.
+def benchmarkMipCache(count=5, width=1024, height=512, previewWidth=256):
+    library = tempfile.mkdtemp()
+    cacheFolder = tempfile.mkdtemp()
+    try:
+        paths = [os.path.join(library, "environment%03d.hdr" % index) for index in range(count)]
+        for path in paths:
+            hdrReader.writeTestImage(path, width, height)
+        cache = EN_HdrMipCache(cacheFolder)
+        times = {}
+        for label, work in (("build", lambda: [cache.levelFor(path, previewWidth) for path in paths]),
+                            ("from disk", lambda: [EN_HdrMipCache(cacheFolder).levelFor(path, previewWidth)
+                                                   for path in paths]),
+                            ("in memory", lambda: [cache.levelFor(path, previewWidth) for path in paths])):
+            startTime = timeit.default_timer()
+            work()
+            times[label] = timeit.default_timer() - startTime
+            print "%s: %.1f ms for %d images" % (label, times[label]*1000.0, count)
+    finally:
+        shutil.rmtree(library)
+        shutil.rmtree(cacheFolder)
+    return times
+
+
+# Runs every benchmark in this module.
+def main():
+    benchmarkCatalog()
+    benchmarkMipCache()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# Benchmarks for hdrReader.py.  Run them with "python -m bench.bench_hdrReader" from the tools folder.
+import os
+import shutil
+import tempfile
+import timeit
+from bench import standIn
+from hdrReader import buildMipLevels, importanceCdf, iterScanlines, readHeader, scanlineToFloat, writeTestImage
+
+
+# Times reading, downsampling and building the sampling tables of a generated lat-long Radiance image.
+# Prints the throughput of each step and returns the seconds each took.
+def benchmarkHdrReader(width=1024, height=512):
+    folder = tempfile.mkdtemp()
+    try:
+        path = os.path.join(folder, "environment.hdr")
+        writeTestImage(path, width, height)
+        megabytes = os.path.getsize(path)/1048576.0
+        megapixels = width*height/1e6
+        times = {}
+        levels = []
+        for label, work in (("header", lambda: readHeader(path)),
+                            ("scanlines", lambda: sum(1 for scanline in iterScanlines(path))),
+                            ("scanlines to float", lambda: sum(len(scanlineToFloat(scanline))
+                                                               for scanline in iterScanlines(path))),
+                            ("mip levels", lambda: levels.extend(buildMipLevels(path, width, 64))),
+                            ("sampling tables", lambda: importanceCdf(levels[0][2], levels[0][0], levels[0][1]))):
+            startTime = timeit.default_timer()
+            work()
+            times[label] = timeit.default_timer() - startTime
+            print "%s: %.1f ms, %.1f MB/sec, %.2f megapixels/sec" % (label, times[label]*1000.0,
+                                                                     megabytes/times[label], megapixels/times[label])
+    finally:
+        shutil.rmtree(folder)
+    return times
+
+
+# Runs every benchmark in this module.
+def main():
+    benchmarkHdrReader()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+# Benchmarks for lookDev_environment.py.  Run them with "python -m bench.bench_lookDev_environment" from the tools
+# folder, or import this module in Maya to time the real commands.
+import os
+import random
+import shutil
+import tempfile
+import timeit
+from bench import standIn
+from toolCore import EN_BuildContext, EN_IdleCoalescer, buildHistory, lazyImport
+from lookDev_environment import (applyBindings, applyControls, buildLookDev, controlUpdates, createdOptions,
+                                 createLookDevBatch, createThreePointLights, lightBindings, loadLookDevPreset,
+                                 lookDevNodes, postControlValue, resetLookDevState, saveLookDevPreset,
+                                 threePointLights)
+mc = lazyImport("maya.cmds")
+
+
+# Times creating the three-point lights headless.
+# Returns the light set ups created per second and the scene calls each one makes.
+def benchmarkLights(count=200):
+    resetCounts = getattr(mc, "resetCounts", None)
+    totalCalls = getattr(mc, "totalCalls", lambda: 0)
+    if resetCounts:
+        resetCounts()
+    startTime = timeit.default_timer()
+    for index in range(count):
+        mc.file(new=True, force=True)
+        createThreePointLights()
+    rate = count/(timeit.default_timer() - startTime)
+    # Leaves out the call that starts each new scene.
+    callsPerBuild = totalCalls()/float(count) - 1
+    print "%d light set ups: %.1f set ups/sec, %.1f scene calls per set up" % (count, rate, callsPerBuild)
+    return rate, callsPerBuild
+
+
+# Times dragging the environment sliders headless, against applying every drag event straight away.
+# Each idle cycle receives several drag events from each slider.  Returns the drag events received and the scene updates applied.
+def benchmarkSliderDrag(steps=100, eventsPerIdle=5, sliders=("sceneScale", "keyOne", "position")):
+    resetCounts = getattr(mc, "resetCounts", None)
+    totalCalls = getattr(mc, "totalCalls", lambda: 0)
+    runDeferred = getattr(mc, "runDeferred", lambda: None)
+    mc.file(new=True, force=True)
+    createThreePointLights()
+    createdOptions.update(threeLight=True, hdrLight=False, camCreate=False, bdCreate=False)
+    events = steps*eventsPerIdle*len(sliders)
+    for label, post, idle in (("coalesced", postControlValue, runDeferred),
+                              ("every event", lambda slider, value: applyControls({slider: value}), lambda: None)):
+        eventsBefore, appliedBefore = controlUpdates.events, controlUpdates.applied
+        if resetCounts:
+            resetCounts()
+        startTime = timeit.default_timer()
+        for step in range(steps):
+            for event in range(eventsPerIdle):
+                for slider in sliders:
+                    post(slider, 1.0 + (step*eventsPerIdle + event)*0.01)
+            idle()
+        elapsed = timeit.default_timer() - startTime
+        print "%s: %d drag events, %d idle updates, %.2f scene calls per event in %.4f sec" % (
+            label, events, controlUpdates.applied - appliedBefore, totalCalls()/float(events), elapsed)
+    return controlUpdates.events, controlUpdates.applied
+
+
+# Times toggling the light check boxes headless.  Each idle cycle receives several clicks on random check boxes, and
+# clicks that leave a box as it was are not written.  Returns the check box events received and the attributes written.
+def benchmarkBindings(steps=200, eventsPerIdle=4):
+    resetCounts = getattr(mc, "resetCounts", None)
+    totalCalls = getattr(mc, "totalCalls", lambda: 0)
+    runDeferred = getattr(mc, "runDeferred", lambda: None)
+    mc.file(new=True, force=True)
+    createThreePointLights()
+    createdOptions.update(threeLight=True)
+    generator = random.Random(3)
+    controls = [control for control, key, attribute in lightBindings if not control.endswith("One")]
+    values = dict((control, False) for control in controls)
+    written = [0]
+    # Counts the attributes written by each update.
+    def countWrites(pending):
+        written[0] += applyBindings(pending)
+    coalescer = EN_IdleCoalescer(countWrites)
+    if resetCounts:
+        resetCounts()
+    startTime = timeit.default_timer()
+    for step in range(steps):
+        for event in range(eventsPerIdle):
+            control = generator.choice(controls)
+            values[control] = not values[control]
+            coalescer.post(control, values[control])
+        runDeferred()
+    elapsed = timeit.default_timer() - startTime
+    print "%d check box events, %d idle updates, %d attributes written, %d scene calls in %.4f sec" % (
+        coalescer.events, coalescer.applied, written[0], totalCalls(), elapsed)
+    return coalescer.events, written[0]
+
+
+# Times one intensity update through the node registry against resolving the lights by name and selecting them,
+# as the sliders used to.  The stand-in scene is filled with many similarly named nodes, including a "KeyLight" that
+# is not the tool's, so Maya has to rename the tool's key light.  Returns the microseconds per update of each.
+def benchmarkNodeRegistry(sceneSize=20000, count=2000):
+    resetCounts = getattr(mc, "resetCounts", None)
+    totalCalls = getattr(mc, "totalCalls", lambda: 0)
+    mc.file(new=True, force=True)
+    for index in range(sceneSize):
+        mc.createNode("transform", name="%s%d" % (threePointLights[index % len(threePointLights)][0], index))
+    mc.createNode("transform", name="KeyLight")
+    createThreePointLights()
+    names = [row[0] for row in threePointLights]
+    # Resolves each light by name, selects it and sets its intensity.
+    def byName(value):
+        for name in names:
+            mc.select(mc.ls(name)[0])
+            mc.setAttr(mc.ls(sl=True)[0] + ".intensity", value)
+    # Sets each light's intensity through the registry.
+    def byRegistry(value):
+        for name in names:
+            mc.setAttr(lookDevNodes.get(name) + ".intensity", value)
+    latencies = {}
+    for label, update in (("name lookups", byName), ("registry", byRegistry)):
+        if resetCounts:
+            resetCounts()
+        startTime = timeit.default_timer()
+        for index in range(count):
+            update(index*0.001)
+        latencies[label] = (timeit.default_timer() - startTime)/count*1e6
+        print "%s: %.1f us per update, %.1f scene calls per update" % (label, latencies[label],
+                                                                       totalCalls()/float(count))
+    print "Registry key light: %s, key light found by name: %s" % (lookDevNodes.get("KeyLight"), mc.ls("KeyLight")[0])
+    return latencies
+
+
+# Times restoring presets headless.  Saves count presets with random control values and then restores them in turn,
+# the way a lighter flips between presets during a review.  Returns the average milliseconds per restore.
+def benchmarkPresets(count=24, restores=500):
+    resetCounts = getattr(mc, "resetCounts", None)
+    totalCalls = getattr(mc, "totalCalls", lambda: 0)
+    mc.file(new=True, force=True)
+    resetLookDevState()
+    buildLookDev(True, False, True, True)
+    generator = random.Random(7)
+    folder = tempfile.mkdtemp()
+    try:
+        paths = []
+        for index in range(count):
+            controls = {"sceneScale": generator.uniform(0.5, 2.0), "lightAngle": generator.uniform(-10, 10),
+                        "position": generator.uniform(-360, 360)}
+            for control, key, attribute in lightBindings:
+                controls[control] = generator.uniform(0, 2) if control.endswith("One") else generator.random() < 0.5
+            applyControls(controls)
+            paths.append(os.path.join(folder, "preset%02d.json" % index))
+            saveLookDevPreset(paths[-1])
+        if resetCounts:
+            resetCounts()
+        startTime = timeit.default_timer()
+        for index in range(restores):
+            loadLookDevPreset(paths[index % count])
+        restoreTime = (timeit.default_timer() - startTime)/restores*1000.0
+        print "%d restores of %d presets: %.2f ms per restore, %.1f scene calls per restore, %d bytes per preset" % (
+            restores, count, restoreTime, totalCalls()/float(restores), os.path.getsize(paths[0]))
+    finally:
+        shutil.rmtree(folder)
+    return restoreTime
+
+
+# Times the batch mode on generated asset files with different numbers of workers.  Uses the stand-in by default, so
+# the asset files are written in its scene format and it runs without Maya.  Set autoPlace to time fitting the set up
+# to each asset too.  Returns the assets/sec of each run.
+def benchmarkLookDevBatch(count=200, workerCounts=(1, 2, 4), useStandIn=True, autoPlace=False):
+    assetFolder = tempfile.mkdtemp()
+    rates = {}
+    try:
+        # Writes small asset scenes of a few hundred transforms each, with a mesh under every tenth one.  The assets
+        # are of different sizes, so fitting the set up to them gives each its own placement.
+        assetPaths = []
+        for index in range(count):
+            assetPaths.append(os.path.join(assetFolder, "asset%04d.ma" % index))
+            with open(assetPaths[-1], "w") as assetFile:
+                for part in range(300):
+                    assetFile.write("transform asset%d_part%d None 0 0 0\n" % (index, part))
+                    if part % 10 == 0:
+                        assetFile.write("mesh asset%d_part%dShape asset%d_part%d %g %g %g\n"
+                                        % (index, part, index, part, part*0.01*(index + 1), part*0.02, -part*0.01))
+        for workers in workerCounts:
+            outputFolder = tempfile.mkdtemp()
+            try:
+                startTime = timeit.default_timer()
+                createLookDevBatch(assetPaths, outputFolder, workers=workers, useStandIn=useStandIn, renderJobs=True,
+                                   autoPlace=autoPlace)
+                rates[workers] = count/(timeit.default_timer() - startTime)
+            finally:
+                shutil.rmtree(outputFolder)
+    finally:
+        shutil.rmtree(assetFolder)
+    return rates
+
+
+# Times building the set up headless on its own and inside a build context, and prints where the last build's time
+# went.  The stand-in does not redraw or keep undo, so this shows the cost of timing every call.  Returns the seconds
+# per build without and with the context.
+def benchmarkBuildContext(count=100):
+    times = []
+    for useContext in (False, True):
+        startTime = timeit.default_timer()
+        for index in range(count):
+            mc.file(new=True, force=True)
+            resetLookDevState()
+            if useContext:
+                with EN_BuildContext("buildLookDev"):
+                    buildLookDev(True, False, True, True)
+            else:
+                buildLookDev(True, False, True, True)
+        times.append((timeit.default_timer() - startTime)/count)
+    print "%d builds: %.2f ms per build, %.2f ms in a build context" % (count, times[0]*1000.0, times[1]*1000.0)
+    buildHistory["buildLookDev"].report()
+    return tuple(times)
+
+
+# Runs every benchmark in this module.
+def main():
+    benchmarkLights()
+    benchmarkSliderDrag()
+    benchmarkBindings()
+    benchmarkNodeRegistry()
+    benchmarkPresets()
+    benchmarkLookDevBatch()
+    benchmarkBuildContext()
+
+
+if __name__ == "__main__":
+    main()
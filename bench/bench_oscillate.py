@@ -0,0 +1,201 @@
+# Benchmarks for oscillate.py.  Run them with "python -m bench.bench_oscillate" from the tools folder, or import this
+# module in Maya to time the real commands.
+import bisect
+import math
+import os
+import random
+import sys
+import timeit
+from bench import standIn
+from toolCore import lazyImport
+from oscillate import (EN_NodeNetworkSimulator, EN_OscillatorBatch, EN_OscillatorCache, combinedWaveformTable,
+                       createOscillator, hermitePoint, oscillationExpression, oscillationValues, primitiveTypes,
+                       reduceKeys, sampleTable, tableResolution, waveformNames, waveformValue)
+mc = lazyImport("maya.cmds")
+numpy = lazyImport("numpy", optional=True)
+
+
+# Measures how closely the lookup tables follow sin at different resolutions, and how fast they are
+# compared with calling the formula for every sample.
+def benchmarkWaveformTables(samples=200000, resolutions=(64, 256, 1024, 4096)):
+    generator = random.Random(7)
+    cycles = [generator.uniform(-100.0, 100.0) for i in range(samples)]
+    offsets = [0]*samples
+    if numpy is not None:
+        cycles = numpy.array(cycles)
+        offsets = numpy.zeros(samples, dtype=int)
+    # Times the formula.
+    startTime = timeit.default_timer()
+    if numpy is not None:
+        exact = numpy.sin(2*math.pi*cycles)
+    else:
+        sin = math.sin
+        exact = [sin(2*math.pi*cycle) for cycle in cycles]
+    formulaRate = samples/(timeit.default_timer() - startTime)
+    print "Formula: %.0f samples/sec" % formulaRate
+    for resolution in resolutions:
+        table = combinedWaveformTable(resolution)[0]
+        startTime = timeit.default_timer()
+        values = sampleTable(table, offsets, cycles, resolution)
+        tableRate = samples/(timeit.default_timer() - startTime)
+        worstError = max(abs(value - reference) for value, reference in zip(values, exact))
+        print "Table of %d: %.0f samples/sec, worst error %.2g" % (resolution, tableRate, worstError)
+    # Times a waveform that has no cheap formula.
+    startTime = timeit.default_timer()
+    for cycle in cycles[:samples//10]:
+        waveformValue("noise", cycle)
+    noiseRate = (samples//10)/(timeit.default_timer() - startTime)
+    noiseOffsets = offsets + waveformNames.index("noise")*(tableResolution + 1) if numpy is not None else \
+        [waveformNames.index("noise")*(tableResolution + 1)]*samples
+    startTime = timeit.default_timer()
+    sampleTable(combinedWaveformTable()[0], noiseOffsets, cycles)
+    print "Noise: %.0f samples/sec from the formula, %.0f samples/sec from the table" % (
+        noiseRate, samples/(timeit.default_timer() - startTime))
+
+
+# Times creating oscillating objects headless.
+# Returns the oscillators created per second and the scene calls each one makes, so call count regressions can be caught.
+def benchmarkOscillators(count=1000, mode="expression"):
+    resetCounts = getattr(mc, "resetCounts", None)
+    totalCalls = getattr(mc, "totalCalls", lambda: 0)
+    if resetCounts:
+        resetCounts()
+    # Hides the message printed for every oscillator while timing.
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        startTime = timeit.default_timer()
+        for index in range(count):
+            createOscillator(primitiveTypes[index % 4], "translateY", 0.0, 1.0 + index % 5, 1.0 + index % 3,
+                             ("sin", "cos")[index % 2], mode, 1, 48)
+        rate = count/(timeit.default_timer() - startTime)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    callsPerOscillator = totalCalls()/float(count)
+    print "%d oscillators (%s): %.1f oscillators/sec, %.1f scene calls each" % (count, mode, rate, callsPerOscillator)
+    return rate, callsPerOscillator
+
+
+# Times the batch evaluator for the given number of oscillators.
+def benchmarkBatchOscillation(count=10000, frames=100, fps=24.0):
+    # Builds a mix of records with different ranges, periods, waveforms and phases.
+    records = [("osc%d" % i, "translateY", 0.0, 2.0 + i % 5, 1.0 + (i % 7)*0.25, waveformNames[i % len(waveformNames)], i*0.01)
+               for i in range(count)]
+    batch = EN_OscillatorBatch(records)
+    # Times the evaluation on its own.
+    startTime = timeit.default_timer()
+    for frame in range(frames):
+        batch.evaluate(frame/fps)
+    evaluateRate = frames/(timeit.default_timer() - startTime)
+    # Times the evaluation together with writing every value to the scene.
+    startTime = timeit.default_timer()
+    for frame in range(frames):
+        batch.applyFrame(frame, fps)
+    applyRate = frames/(timeit.default_timer() - startTime)
+    print "%d oscillators: %.1f frames/sec evaluated, %.1f frames/sec applied" % (count, evaluateRate, applyRate)
+    return applyRate
+
+
+# Compares the cost of driving oscillators with expressions against baking them to keys.
+# The stand-in from mayaStandIn counts the scene calls each approach makes while building.
+# Playback is approximated in Python: the expression path evaluates the formula for every object on every frame,
+# while the baked path looks up the kept keys and interpolates between them the way fixed tangents do.
+def benchmarkBakeVsExpression(count=1000, frames=240, fps=24.0, tolerance=0.001):
+    records = [("osc%d" % i, "translateY", 0.0, 2.0 + i % 5, 1.0 + (i % 7)*0.25, ("sin", "cos")[i % 2], 0.0)
+               for i in range(count)]
+    resetCounts = getattr(mc, "resetCounts", None)
+    totalCalls = getattr(mc, "totalCalls", lambda: 0)
+
+    # Builds the expressions.
+    if resetCounts:
+        resetCounts()
+    for obj, att, minimum, maximum, period, oscType, phase in records:
+        speed, ran, start = oscillationValues(minimum, maximum, period)
+        mc.expression(string=oscillationExpression(obj + "." + att, oscType, speed, ran, start))
+    expressionCalls = totalCalls()
+    # Plays back the expressions.
+    startTime = timeit.default_timer()
+    for frame in range(frames):
+        time = frame/fps
+        for obj, att, minimum, maximum, period, oscType, phase in records:
+            speed, ran, start = oscillationValues(minimum, maximum, period)
+            getattr(math, oscType)(time*speed)*ran + start
+    expressionPlayback = timeit.default_timer() - startTime
+
+    # Bakes the keys, keeping the kept keys for playback.
+    if resetCounts:
+        resetCounts()
+    batch = EN_OscillatorBatch(records)
+    keyCount = batch.bake(0, frames - 1, fps, tolerance)
+    bakeCalls = totalCalls()
+    times = [frame/fps for frame in range(frames)]
+    samples = batch.evaluateRange(times)
+    slopes = batch.evaluateRange(times, derivative=True)
+    curves = []
+    for values, rates in zip(samples, slopes):
+        rates = [rate/fps for rate in rates]
+        kept = reduceKeys(values, tolerance, rates)
+        curves.append((kept, [float(values[index]) for index in kept], [float(rates[index]) for index in kept]))
+    # Plays back the baked curves.
+    startTime = timeit.default_timer()
+    for frame in range(frames):
+        for keyFrames, keyValues, keySlopes in curves:
+            index = bisect.bisect_right(keyFrames, frame) - 1
+            if index >= len(keyFrames) - 1:
+                continue
+            length = float(keyFrames[index + 1] - keyFrames[index])
+            hermitePoint(keyValues[index], keySlopes[index], keyValues[index + 1], keySlopes[index + 1],
+                         length, (frame - keyFrames[index])/length)
+    bakePlayback = timeit.default_timer() - startTime
+
+    print "Expression: %d scene calls, %.3f sec for %d frames" % (expressionCalls, expressionPlayback, frames)
+    print "Baked: %d scene calls, %d keys (%.1f per curve), %.3f sec for %d frames" % (
+        bakeCalls, keyCount, keyCount/float(count), bakePlayback, frames)
+    return expressionPlayback, bakePlayback
+
+
+# Builds node networks on the stand-in, checks their output against the closed-form formula and compares
+# the cost of evaluating them with the cost of evaluating the expression formula.
+def benchmarkNodeNetwork(count=200, frames=240, fps=24.0):
+    records = [("osc%d" % i, "translateY", 0.0, 2.0 + i % 5, 1.0 + (i % 7)*0.25, ("sin", "cos")[i % 2])
+               for i in range(count)]
+    cache = EN_OscillatorCache(maxSize=count)
+    outputs = [cache.connect(obj + "." + att, oscType, minimum, maximum, period, "nodes") + ".output"
+               for obj, att, minimum, maximum, period, oscType in records]
+    simulator = EN_NodeNetworkSimulator(mc, fps)
+    # Evaluates the networks and records the worst difference from the formula.
+    worstError = 0.0
+    startTime = timeit.default_timer()
+    for frame in range(frames):
+        time = frame/fps
+        for output, (obj, att, minimum, maximum, period, oscType) in zip(outputs, records):
+            speed, ran, start = oscillationValues(minimum, maximum, period)
+            error = abs(simulator.evaluate(output, time) - (getattr(math, oscType)(time*speed)*ran + start))
+            worstError = max(worstError, error)
+    networkTime = timeit.default_timer() - startTime
+    # Evaluates the expression formula for the same records.
+    startTime = timeit.default_timer()
+    for frame in range(frames):
+        time = frame/fps
+        for obj, att, minimum, maximum, period, oscType in records:
+            speed, ran, start = oscillationValues(minimum, maximum, period)
+            getattr(math, oscType)(time*speed)*ran + start
+    expressionTime = timeit.default_timer() - startTime
+    print "Node networks: %d signatures, %d nodes, worst error %.2g" % (cache.misses, 3*cache.misses, worstError)
+    print "Node evaluations per frame: %d, simulated in %.3f sec (formula with checks) vs expression formula %.3f sec" % (
+        simulator.evaluations/frames, networkTime, expressionTime)
+    return worstError
+
+
+# Runs every benchmark in this module.
+def main():
+    benchmarkWaveformTables()
+    benchmarkOscillators()
+    benchmarkBatchOscillation()
+    benchmarkBakeVsExpression()
+    benchmarkNodeNetwork()
+
+
+if __name__ == "__main__":
+    main()
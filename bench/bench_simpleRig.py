@@ -0,0 +1,188 @@
+# Benchmarks for simpleRig.py.  Run them with "python -m bench.bench_simpleRig" from the tools folder, or import this
+# module in Maya to time the real commands.
+import os
+import random
+import shutil
+import tempfile
+import timeit
+from bench import standIn
+from toolCore import lazyImport
+from simpleRig import (EN_SkeletonPreview, EN_SkeletonTemplateCache, buildJoints, buildSkeleton, compileJointTable,
+                       computeJointPositions, createCrowdVariants, createSkeleton, exportSkeletons, importSkeletons,
+                       readSkeletonFile, skeletonParameters)
+mc = lazyImport("maya.cmds")
+numpy = lazyImport("numpy", optional=True)
+
+
+# Compares building skeletons in an empty scene and in a scene with many other nodes, for the skeleton root group
+# and for the old approach of selecting and grouping everything in the scene before scaling.
+# Needs the mayaStandIn stand-in, which it fills with sceneSize transforms.
+def benchmarkRootScaling(sceneSize=100000, count=20):
+    positions = computeJointPositions([[1.0]*len(skeletonParameters)])[0]
+    names, parents, matrix, mirrorSources = compileJointTable()
+    # Builds a skeleton the old way: select everything, group it and scale the group.
+    def buildWithSelectAll():
+        buildJoints(names, parents, positions)
+        mc.select(all=True)
+        mc.group(absolute=True)
+        mc.scale(2.0, 2.0, 2.0)
+    rates = {}
+    for size in (0, sceneSize):
+        for label, build in (("root group", lambda: buildSkeleton(positions, 2.0)), ("select all", buildWithSelectAll)):
+            # Fills a fresh scene with unrelated transforms.
+            mc.resetScene()
+            for index in range(size):
+                mc.addNode("prop%d" % index, "transform", None, True)
+            startTime = timeit.default_timer()
+            for index in range(count):
+                build()
+            rates[(label, size)] = count/(timeit.default_timer() - startTime)
+            print "%s, %d other nodes: %.1f rigs/sec" % (label, size, rates[(label, size)])
+    return rates
+
+
+# Times writing and reading a binary skeleton file of many skeletons, against just reading its bytes from disk.
+# With NumPy reading should take about as long as the disk read, since no Python code runs per joint.  Without it,
+# grouping the values into tuples takes most of the time.  Then times building some of the skeletons, which needs
+# mayaStandIn.install() before this module is imported.
+# Returns the seconds taken to read the bytes and to load the skeletons.
+def benchmarkSkeletonFiles(count=5000, buildCount=50):
+    generator = random.Random(5)
+    valueRows = [[generator.uniform(1.0, 2.0) for parameter in skeletonParameters] for index in range(count)]
+    handle, path = tempfile.mkstemp(suffix=".skel")
+    os.close(handle)
+    try:
+        startTime = timeit.default_timer()
+        exportSkeletons(path, valueRows)
+        exportTime = timeit.default_timer() - startTime
+        # Reads the raw bytes once first, so both timings below start from the file in the disk cache.
+        with open(path, "rb") as skeletonFile:
+            skeletonFile.read()
+        startTime = timeit.default_timer()
+        with open(path, "rb") as skeletonFile:
+            skeletonFile.read()
+        readTime = timeit.default_timer() - startTime
+        startTime = timeit.default_timer()
+        names, parents, scales, positions = readSkeletonFile(path)
+        # Touches every value, so a memory mapped load pays for reading the whole file too.
+        total = sum(float(scale) for scale in scales) if numpy is None else float(positions.sum() + scales.sum())
+        loadTime = timeit.default_timer() - startTime
+        print "%d skeletons, %.1f KB: exported in %.1f ms, bytes read in %.1f ms, loaded in %.1f ms" % (
+            count, os.path.getsize(path)/1024.0, exportTime*1000.0, readTime*1000.0, loadTime*1000.0)
+        startTime = timeit.default_timer()
+        importSkeletons(path, range(buildCount))
+        print "Built %d skeletons from the file: %.1f rigs/sec" % (buildCount,
+                                                                 buildCount/(timeit.default_timer() - startTime))
+    finally:
+        os.remove(path)
+    return readTime, loadTime
+
+
+# Times building crowd variants with different numbers of workers and reports variants/sec and the speed up
+# over one worker.  Uses the stand-in by default so it runs without Maya.
+def benchmarkCrowdVariants(count=400, workerCounts=(1, 2, 4), useStandIn=True):
+    generator = random.Random(5)
+    valueRows = [[generator.uniform(1.0, 2.0) for parameter in skeletonParameters] for index in range(count)]
+    rates = {}
+    for workers in workerCounts:
+        outputFolder = tempfile.mkdtemp()
+        try:
+            startTime = timeit.default_timer()
+            createCrowdVariants(valueRows, outputFolder, workers, useStandIn)
+            rates[workers] = count/(timeit.default_timer() - startTime)
+        finally:
+            shutil.rmtree(outputFolder)
+        print "%d workers: %.1f variants/sec (%.2fx one worker)" % (
+            workers, rates[workers], rates[workers]/rates[workerCounts[0]])
+    return rates
+
+
+# Times building skeletons headless.
+# Returns the rigs built per second and the scene calls each rig makes, so call count regressions can be caught.
+def benchmarkRigs(count=200):
+    resetCounts = getattr(mc, "resetCounts", None)
+    totalCalls = getattr(mc, "totalCalls", lambda: 0)
+    if resetCounts:
+        resetCounts()
+    startTime = timeit.default_timer()
+    for index in range(count):
+        mc.select(clear=True)
+        createSkeleton(torsoLength=1.0 + index % 3, armLength=1.0 + index % 4)
+    rate = count/(timeit.default_timer() - startTime)
+    callsPerRig = totalCalls()/float(count)
+    print "%d rigs: %.1f rigs/sec, %.1f scene calls per rig" % (count, rate, callsPerRig)
+    # Times computing the joint positions for the same number of variants on their own.
+    startTime = timeit.default_timer()
+    computeJointPositions([[1.0 + index % 3, 1.0 + index % 4] + [1.0]*8 for index in range(count)])
+    print "Joint positions for %d variants computed in %.4f sec" % (count, timeit.default_timer() - startTime)
+    return rate, callsPerRig
+
+
+# Times creating the same skeleton repeatedly, rebuilding it each time and copying it from the template cache.
+# The stand-in copies nodes one by one, so the
+# scene calls per rig are the better guide to how much Maya saves.  Returns the rigs per second of each.
+def benchmarkTemplateCache(count=50):
+    resetCounts = getattr(mc, "resetCounts", None)
+    totalCalls = getattr(mc, "totalCalls", lambda: 0)
+    values = [1.5]*len(skeletonParameters)
+    cache = EN_SkeletonTemplateCache()
+    rates = {}
+    for label, build in (("rebuild", lambda: createSkeleton(*values)), ("template cache", lambda: cache.create(values))):
+        if resetCounts:
+            resetCounts()
+        startTime = timeit.default_timer()
+        for index in range(count):
+            build()
+        rates[label] = count/(timeit.default_timer() - startTime)
+        print "%s: %.1f rigs/sec, %.1f scene calls per rig" % (label, rates[label], totalCalls()/float(count))
+    print "Template cache: %d hits, %d misses" % (cache.hits, cache.misses)
+    return rates
+
+
+# Times dragging a slider over the live preview.  Each step posts several drag events before Maya goes idle.
+# Reports the events received, the scene updates
+# applied and the joints moved, against rebuilding the skeleton for every event.
+def benchmarkPreview(parameter="shinLength", steps=100, eventsPerIdle=5):
+    resetCounts = getattr(mc, "resetCounts", None)
+    totalCalls = getattr(mc, "totalCalls", lambda: 0)
+    runDeferred = getattr(mc, "runDeferred", lambda: None)
+    preview = EN_SkeletonPreview()
+    preview.set(parameter, 1.0)
+    runDeferred()
+    if resetCounts:
+        resetCounts()
+    startTime = timeit.default_timer()
+    for step in range(steps):
+        for event in range(eventsPerIdle):
+            preview.set(parameter, 1.0 + (step*eventsPerIdle + event)*0.01)
+        runDeferred()
+    elapsed = timeit.default_timer() - startTime
+    events = steps*eventsPerIdle
+    print "%d events, %d scene updates, %d joints moved, %.1f scene calls per event in %.4f sec" % (
+        preview.coalescer.events - 1, preview.coalescer.applied - 1, preview.jointMoves,
+        totalCalls()/float(events), elapsed)
+    # Rebuilds the skeleton for every event instead, like deleting and recreating the rig would.
+    values = [1.0]*len(skeletonParameters)
+    if resetCounts:
+        resetCounts()
+    startTime = timeit.default_timer()
+    for event in range(events):
+        values[skeletonParameters.index(parameter)] = 1.0 + event*0.01
+        mc.delete(createSkeleton(*values))
+    print "Rebuild per event: %.1f scene calls per event in %.4f sec" % (totalCalls()/float(events),
+                                                                       timeit.default_timer() - startTime)
+    return preview.coalescer.events - 1, preview.coalescer.applied - 1
+
+
+# Runs every benchmark in this module.
+def main():
+    benchmarkRootScaling()
+    benchmarkSkeletonFiles()
+    benchmarkCrowdVariants()
+    benchmarkRigs()
+    benchmarkTemplateCache()
+    benchmarkPreview()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+# Benchmarks for toolCore.py.  Run them with "python -m bench.bench_toolCore" from the tools folder.
+import os
+import subprocess
+import sys
+
+
+# Measures how long each tool takes to import in a fresh interpreter, such as mayapy or a plain Python with no Maya.
+# Each import runs in its own process so nothing is cached between runs.  Returns the fastest import time in seconds for each module.
+def benchmarkImportTime(modules=("oscillate", "simpleRig", "lookDev_environment"), repeat=5):
+    script = "import timeit; startTime = timeit.default_timer(); import %s; print(timeit.default_timer() - startTime)"
+    # Runs from the tools folder, one above this one, so the tools can be found.
+    folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = {}
+    for module in modules:
+        times = [float(subprocess.check_output([sys.executable, "-c", script % module], cwd=folder))
+                 for index in range(repeat)]
+        results[module] = min(times)
+        print "%s: %.1f ms" % (module, results[module]*1000.0)
+    return results
+
+
+# Runs every benchmark in this module.
+def main():
+    benchmarkImportTime()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+# Sets up the benchmarks.  In Maya they time the real maya.cmds.  Without Maya the stand-in is installed, so they run
+# from a plain Python and count the scene calls the tools make.  Benchmarks that fill the scene need the stand-in.
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import mayaStandIn
+
+try:
+    import maya.cmds as cmds
+except ImportError:
+    cmds = mayaStandIn.install()
@@ -0,0 +1,345 @@
+import os
+import sys
+import json
+import mmap
+import array
+import struct
+import hashlib
+# The tools share the lazy importer.  NumPy is optional.  When it is available thumbnails are filtered in vectorized passes.
+from toolCore import lazyImport
+import hdrReader
+numpy = lazyImport("numpy", optional=True)
+
+'''
+This module keeps a catalog of an HDR image library, for choosing the look development tool's IBL image.
+The catalog walks a folder tree once, reads only the header of each image and saves what it found to an index file.
+Later refreshes only read the headers of images that were added or changed since.  Small preview thumbnails are
+made by streaming each image's scanlines once, and are saved next to the index as files that are memory mapped
+when they are read, so browsing the library never reads the full images again.
+The mip cache keeps smaller versions of lat-long images for preview renders, with tables for importance sampling them.
+
+To index a library:
+    import hdrCatalog
+    catalog = hdrCatalog.EN_HdrCatalog("/path/to/catalog")
+    catalog.refresh("/path/to/hdr/library")
+'''
+
+
+# Thumbnail files are a small header followed by the pixels.  All values are little endian.  The layout is:
+#     header  magic "ENTH", width and height (uint32)
+#     pixels  the red, green and blue of each pixel, row by row from the top (float32)
+thumbnailHeader = struct.Struct("<4sII")
+thumbnailMagic = "ENTH"
+catalogVersion = 1
+
+# Creates the HDR catalog class.  The index and the thumbnails are kept in the catalog folder.
+class EN_HdrCatalog(object):
+    # Initializes the catalog and loads its index if it has been saved before.
+    def __init__(self, folder, thumbnailWidth=64):
+        self.folder = folder
+        self.thumbnailWidth = thumbnailWidth
+        self.indexPath = os.path.join(folder, "hdrCatalog.json")
+        # The entry of each image, keyed by its path.  Each entry holds the size, modification time, format, width
+        # and height of the image, and the name of its thumbnail file once one has been made.
+        self.entries = {}
+        if os.path.exists(self.indexPath):
+            with open(self.indexPath) as indexFile:
+                index = json.load(indexFile)
+            if index.get("version") == catalogVersion:
+                self.entries = index["entries"]
+        # Counts the headers read by the last refresh, to show how much an incremental refresh saves.
+        self.headersRead = 0
+
+    # Walks the folder tree and brings the index up to date.  Images whose size and modification time have not
+    # changed keep their entries, so only new and changed images are read.  Images that are gone are dropped, and
+    # images whose headers cannot be read are skipped.  With thumbnails set, missing thumbnails are made too.
+    # Saves the index and returns the number of images in it.
+    def refresh(self, root, thumbnails=False):
+        self.headersRead = 0
+        found = {}
+        for folder, folderNames, fileNames in os.walk(root):
+            for fileName in fileNames:
+                if not fileName.lower().endswith(hdrReader.hdrExtensions):
+                    continue
+                path = os.path.join(folder, fileName)
+                status = os.stat(path)
+                entry = self.entries.get(path)
+                if entry is None or entry["size"] != status.st_size or entry["mtime"] != status.st_mtime:
+                    try:
+                        header = hdrReader.readHeader(path)
+                    except (IOError, ValueError):
+                        continue
+                    self.headersRead += 1
+                    self.removeThumbnail(entry)
+                    entry = {"size": status.st_size, "mtime": status.st_mtime, "format": header["format"],
+                             "width": header["width"], "height": header["height"], "thumbnail": None}
+                found[path] = entry
+        for path, entry in self.entries.items():
+            if inFolder(path, root) and path not in found:
+                self.removeThumbnail(entry)
+                del self.entries[path]
+        self.entries.update(found)
+        if thumbnails:
+            for path in found:
+                # Images whose pixels turn out to be damaged keep their entries, without a thumbnail.
+                try:
+                    self.thumbnail(path, save=False)
+                except (IOError, ValueError):
+                    self.entries[path]["thumbnail"] = None
+        self.save()
+        return len(self.entries)
+
+    # Saves the index to the catalog folder.
+    def save(self):
+        self.makeFolder()
+        with open(self.indexPath, "w") as indexFile:
+            json.dump({"version": catalogVersion, "entries": self.entries}, indexFile, separators=(",", ":"))
+
+    # Returns the paths of the images in the catalog, optionally only those at least a given width or in a folder.
+    def images(self, minimumWidth=0, root=None):
+        return sorted(path for path, entry in self.entries.items()
+                      if entry["width"] >= minimumWidth and (root is None or inFolder(path, root)))
+
+    # Returns the thumbnail of an image as (width, height, pixels), making it first if it has not been made.
+    # The pixels are memory mapped from the thumbnail file.  With NumPy they are a (height, width, 3) array,
+    # otherwise a flat array of red, green and blue values.  Returns None for images that have no thumbnail, such as
+    # OpenEXR images, whose pixels this module does not decode.  A new thumbnail is recorded in the saved index unless
+    # save is off.
+    def thumbnail(self, path, save=True):
+        entry = self.entries[path]
+        if entry["thumbnail"] is None or not os.path.exists(os.path.join(self.folder, entry["thumbnail"])):
+            if entry["format"] != "radiance":
+                return None
+            entry["thumbnail"] = "thumb_%s.bin" % hashlib.md5(path).hexdigest()
+            self.makeFolder()
+            writeThumbnail(os.path.join(self.folder, entry["thumbnail"]), *makeThumbnail(path, self.thumbnailWidth))
+            if save:
+                self.save()
+        return readThumbnail(os.path.join(self.folder, entry["thumbnail"]))
+
+    # Creates the catalog folder if it does not exist yet.
+    def makeFolder(self):
+        if not os.path.isdir(self.folder):
+            os.makedirs(self.folder)
+
+    # Deletes the thumbnail file of an entry, if it has one.
+    def removeThumbnail(self, entry):
+        if entry is not None and entry.get("thumbnail"):
+            thumbnailPath = os.path.join(self.folder, entry["thumbnail"])
+            if os.path.exists(thumbnailPath):
+                os.remove(thumbnailPath)
+
+
+# Returns whether a path is in a folder or one of its subfolders.  A sibling folder whose name starts with the same
+# letters, such as hdr2 next to hdr, does not count.
+def inFolder(path, folder):
+    return path.startswith(os.path.join(folder, ""))
+
+# Makes a thumbnail of a Radiance image by streaming its scanlines once.  The thumbnail is width pixels wide and keeps
+# the image's aspect ratio.  Only one scanline per thumbnail row is converted, and each thumbnail pixel averages the
+# pixels of that scanline it covers.  Returns (width, height, pixels) with the pixels as a flat list of floats.
+def makeThumbnail(path, width=64):
+    header = hdrReader.readHeader(path)
+    width = min(width, header["width"])
+    height = max(1, int(round(width*header["height"]/float(header["width"]))))
+    # The column where each thumbnail pixel starts.
+    starts = [column*header["width"]//width for column in range(width)]
+    pixels = []
+    row = 0
+    for index, scanline in enumerate(hdrReader.iterScanlines(path)):
+        if row < height and index == row*header["height"]//height:
+            colors = hdrReader.scanlineToFloat(scanline)
+            if numpy is not None:
+                counts = numpy.diff(starts + [header["width"]]).reshape(-1, 1)
+                pixels.extend((numpy.add.reduceat(colors, starts, axis=0)/counts).ravel().tolist())
+            else:
+                for column, start in enumerate(starts):
+                    end = starts[column + 1] if column + 1 < width else header["width"]
+                    for channel in range(3):
+                        pixels.append(sum(color[channel] for color in colors[start:end])/(end - start))
+            row += 1
+    return width, height, pixels
+
+# Writes a thumbnail file.
+def writeThumbnail(path, width, height, pixels):
+    values = array.array("f", pixels)
+    if sys.byteorder == "big":
+        values.byteswap()
+    with open(path, "wb") as thumbnailFile:
+        thumbnailFile.write(thumbnailHeader.pack(thumbnailMagic, width, height))
+        thumbnailFile.write(values.tostring())
+
+# Reads a thumbnail file by memory mapping it.  Returns (width, height, pixels), with the pixels as a
+# (height, width, 3) array view of the file with NumPy, or as a flat array of floats without it.
+def readThumbnail(path):
+    with open(path, "rb") as thumbnailFile:
+        data = mmap.mmap(thumbnailFile.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, width, height = thumbnailHeader.unpack_from(data)
+    if magic != thumbnailMagic:
+        raise ValueError("%s is not a thumbnail file" % path)
+    if numpy is not None:
+        pixels = numpy.frombuffer(data, dtype="<f4", count=width*height*3, offset=thumbnailHeader.size)
+        return width, height, pixels.reshape(height, width, 3)
+    pixels = array.array("f")
+    pixels.fromstring(data[thumbnailHeader.size:thumbnailHeader.size + 12*width*height])
+    data.close()
+    if sys.byteorder == "big":
+        pixels.byteswap()
+    return width, height, pixels
+
+
+# Sampling table files hold the tables importanceCdf builds, after the same kind of header as thumbnails.  The layout
+# is:
+#     header       magic "ENCD", and the width and height of the image the tables sample (uint32)
+#     marginal     height + 1 values (float32)
+#     conditional  width + 1 values for each row (float32)
+tablesHeader = struct.Struct("<4sII")
+tablesMagic = "ENCD"
+
+# Creates the HDR mip cache class.  It keeps the mip levels and sampling tables of lat-long Radiance images in a
+# folder, keyed by a hash of each image's contents.  A renamed or copied image reuses them, and a changed image gets
+# new ones.  The levels are Radiance files, so renderers can use them in place of the full size image.
+class EN_HdrMipCache(object):
+    # Initializes the cache.  Levels are made from the first no wider than maxWidth, or wider when levelFor asks for a
+    # wider one, down to the last no narrower than minWidth.  The sampling tables are made from the smallest level at
+    # least tableWidth wide.
+    def __init__(self, folder, maxWidth=2048, minWidth=64, tableWidth=256):
+        self.folder = folder
+        self.maxWidth = maxWidth
+        self.minWidth = minWidth
+        self.tableWidth = tableWidth
+        # The content hash of each image with its size and modification time, as [size, mtime, hash] keyed by path, so
+        # an unchanged image is only hashed once.  They are saved in the cache folder, so later sessions reuse them.
+        self.hashesPath = os.path.join(folder, "hashes.json")
+        self.hashes = {}
+        if os.path.exists(self.hashesPath):
+            with open(self.hashesPath) as hashesFile:
+                hashes = json.load(hashesFile)
+            if hashes.get("version") == catalogVersion:
+                self.hashes = hashes["hashes"]
+        # The manifests of the images used so far, keyed by content hash.
+        self.manifests = {}
+        self.hits = 0
+        self.misses = 0
+
+    # Returns the hash of an image's contents.  The image is read in blocks, so it is never held in memory whole.
+    # Images whose size and modification time match the saved hash are not read again.
+    def fileHash(self, path):
+        status = os.stat(path)
+        saved = self.hashes.get(path)
+        if saved is not None and saved[0] == status.st_size and saved[1] == status.st_mtime:
+            return saved[2]
+        digest = hashlib.md5()
+        with open(path, "rb") as imageFile:
+            for block in iter(lambda: imageFile.read(1 << 20), ""):
+                digest.update(block)
+        self.hashes[path] = [status.st_size, status.st_mtime, digest.hexdigest()]
+        if not os.path.isdir(self.folder):
+            os.makedirs(self.folder)
+        with open(self.hashesPath, "w") as hashesFile:
+            json.dump({"version": catalogVersion, "hashes": self.hashes}, hashesFile, separators=(",", ":"))
+        return self.hashes[path][2]
+
+    # Returns the manifest of an image's cached levels and tables, making them first if they are not cached.  The
+    # manifest holds the folder they are in, the width and height of the image, its levels, largest first, as
+    # [width, height, file name] lists, and the file name of the sampling tables.  The levels start at the first no
+    # wider than maxWidth, or than the cache's maxWidth if that is larger.  Cached levels that start smaller are made
+    # again.  When build is off, returns None instead of making levels that are not cached.
+    def manifest(self, path, maxWidth=0, build=True):
+        maxWidth = max(self.maxWidth, maxWidth)
+        key = self.fileHash(path)
+        manifest = self.manifests.get(key)
+        if manifest is None:
+            manifestPath = os.path.join(self.folder, key, "manifest.json")
+            if os.path.exists(manifestPath):
+                with open(manifestPath) as manifestFile:
+                    manifest = json.load(manifestFile)
+        if manifest is not None and manifest.get("version") == catalogVersion and manifest["maxWidth"] >= maxWidth:
+            self.hits += 1
+        elif not build:
+            return None
+        else:
+            self.misses += 1
+            manifest = self.build(path, key, maxWidth)
+        manifest["folder"] = os.path.join(self.folder, key)
+        self.manifests[key] = manifest
+        return manifest
+
+    # Makes the levels and sampling tables of an image and saves them with their manifest.  The manifest is saved
+    # last, so an interrupted build is made again next time.  Returns the manifest.
+    def build(self, path, key, maxWidth):
+        folder = os.path.join(self.folder, key)
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        header = hdrReader.readHeader(path)
+        levels = hdrReader.buildMipLevels(path, maxWidth, self.minWidth)
+        manifest = {"version": catalogVersion, "width": header["width"], "height": header["height"], "levels": [],
+                    "maxWidth": maxWidth, "tables": "tables.bin"}
+        for width, height, rows in levels:
+            fileName = "level_%dx%d.hdr" % (width, height)
+            hdrReader.writeRadiance(os.path.join(folder, fileName), width, height, rows)
+            manifest["levels"].append([width, height, fileName])
+        # Builds the tables from the smallest level wide enough, or from the image itself if no level is.
+        wideEnough = [level for level in levels if level[0] >= self.tableWidth]
+        if wideEnough:
+            width, height, rows = wideEnough[-1]
+        else:
+            width, height = header["width"], header["height"]
+            rows = [hdrReader.scanlineToFloat(scanline) for scanline in hdrReader.iterScanlines(path)]
+        writeTables(os.path.join(folder, manifest["tables"]), width, height,
+                    *hdrReader.importanceCdf(rows, width, height))
+        with open(os.path.join(folder, "manifest.json"), "w") as manifestFile:
+            json.dump(manifest, manifestFile, separators=(",", ":"))
+        return manifest
+
+    # Returns the path of the smallest version of an image at least width pixels wide.  This is one of its levels, or
+    # the image itself if none of its levels are that wide.  The levels are made wide enough for the request, and an
+    # image with no level that wide is returned straight away, without reading it.  When build is off, returns None
+    # instead of making levels that are not cached, so a caller that must stay responsive can make them later.
+    def levelFor(self, path, width, build=True):
+        header = hdrReader.readHeader(path)
+        sizes = [size for size in hdrReader.mipSizes(header["width"], header["height"], header["width"], self.minWidth)
+                 if size[0] >= width]
+        if not sizes:
+            return path
+        manifest = self.manifest(path, sizes[-1][0], build)
+        if manifest is None:
+            return None
+        for levelWidth, levelHeight, fileName in reversed(manifest["levels"]):
+            if levelWidth >= width:
+                return os.path.join(manifest["folder"], fileName)
+        return path
+
+    # Returns the sampling tables of an image as (width, height, marginal, conditional), for sampleImportance.
+    def tables(self, path):
+        manifest = self.manifest(path)
+        return readTables(os.path.join(manifest["folder"], manifest["tables"]))
+
+# Writes a sampling table file.
+def writeTables(path, width, height, marginal, conditional):
+    values = array.array("f", list(marginal) + list(conditional))
+    if sys.byteorder == "big":
+        values.byteswap()
+    with open(path, "wb") as tablesFile:
+        tablesFile.write(tablesHeader.pack(tablesMagic, width, height))
+        tablesFile.write(values.tostring())
+
+# Reads a sampling table file by memory mapping it.  Returns (width, height, marginal, conditional), as array views
+# of the file with NumPy or as arrays of floats without it.
+def readTables(path):
+    with open(path, "rb") as tablesFile:
+        data = mmap.mmap(tablesFile.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, width, height = tablesHeader.unpack_from(data)
+    if magic != tablesMagic:
+        raise ValueError("%s is not a sampling table file" % path)
+    if numpy is not None:
+        marginal = numpy.frombuffer(data, dtype="<f4", count=height + 1, offset=tablesHeader.size)
+        conditional = numpy.frombuffer(data, dtype="<f4", count=height*(width + 1),
+                                       offset=tablesHeader.size + 4*(height + 1))
+        return width, height, marginal, conditional
+    values = array.array("f")
+    values.fromstring(data[tablesHeader.size:tablesHeader.size + 4*((height + 1) + height*(width + 1))])
+    data.close()
+    if sys.byteorder == "big":
+        values.byteswap()
+    return width, height, values[:height + 1], values[height + 1:]
@@ -0,0 +1,383 @@
+import math
+import bisect
+import struct
+# The tools share the lazy importer.  NumPy is optional.  When it is available pixels are converted in vectorized passes.
+from toolCore import lazyImport
+numpy = lazyImport("numpy", optional=True)
+
+'''
+This module reads HDR images without Maya, for the look development tool's IBL set up.
+It reads the headers of Radiance .hdr and OpenEXR .exr files without reading their pixels, and streams the scanlines
+of Radiance files one at a time, so large images never have to be held in memory whole.
+It also makes smaller mip levels of lat-long Radiance images for preview renders, and the tables for importance
+sampling them, and writes Radiance files.
+'''
+
+
+# Extensions of the HDR images this module can read.
+hdrExtensions = (".hdr", ".pic", ".exr")
+
+# Returns the header of an HDR image as a dictionary with at least its format, width and height.
+# Only the header is read.  Raises ValueError if the file is not an HDR image this module can read.
+def readHeader(path):
+    with open(path, "rb") as imageFile:
+        magic = imageFile.read(4)
+        imageFile.seek(0)
+        try:
+            if magic == exrMagic:
+                return readExrHeader(imageFile)
+            if magic.startswith("#?"):
+                return readRadianceHeader(imageFile)
+        except (struct.error, IndexError):
+            raise ValueError("%s has a damaged header" % path)
+    raise ValueError("%s is not a Radiance or OpenEXR image" % path)
+
+
+# This portion of the script reads Radiance .hdr files.
+# Reads the header of a Radiance file, leaving the file at the start of the pixels.  Returns the format, the width,
+# the height, whether scanlines run top to bottom, the exposure and the byte offset of the pixels.
+def readRadianceHeader(imageFile):
+    header = {"format": "radiance", "exposure": 1.0}
+    if not imageFile.readline().startswith("#?"):
+        raise ValueError("missing Radiance signature")
+    # Reads the variables up to the blank line that ends them.
+    for line in iter(imageFile.readline, ""):
+        line = line.strip()
+        if not line:
+            break
+        name, separator, value = line.partition("=")
+        if name == "FORMAT" and value != "32-bit_rle_rgbe":
+            raise ValueError("unsupported Radiance pixel format %s" % value)
+        if name == "EXPOSURE":
+            header["exposure"] *= float(value)
+    # Reads the resolution line, for example "-Y 512 +X 1024".  Only the standard orientations are supported.
+    fields = imageFile.readline().split()
+    if len(fields) != 4 or fields[0][1] != "Y" or fields[2][1] != "X":
+        raise ValueError("unsupported Radiance resolution line")
+    header["height"] = int(fields[1])
+    header["width"] = int(fields[3])
+    header["topToBottom"] = fields[0][0] == "-"
+    header["offset"] = imageFile.tell()
+    return header
+
+# Reads one scanline of a Radiance file.  Returns the red, green, blue and exponent bytes as four bytearrays of
+# width bytes each.  Handles run length encoded, flat and old style run length encoded scanlines.
+def readRadianceScanline(imageFile, width):
+    start = bytearray(imageFile.read(4))
+    if len(start) < 4:
+        raise ValueError("Radiance file ends early")
+    # New style scanlines start with 2, 2 and the width, and then hold each channel run length encoded in turn.
+    if 8 <= width < 0x8000 and start[0] == 2 and start[1] == 2 and (start[2] << 8 | start[3]) == width:
+        channels = []
+        for channel in range(4):
+            values = bytearray()
+            while len(values) < width:
+                run = imageFile.read(1)
+                if not run:
+                    raise ValueError("Radiance file ends early")
+                count = ord(run)
+                # A zero count would never finish the scanline.
+                if count == 0:
+                    raise ValueError("bad Radiance scanline")
+                size = 1 if count > 128 else count
+                data = imageFile.read(size)
+                if len(data) < size:
+                    raise ValueError("Radiance file ends early")
+                values.extend(data*(count - 128) if count > 128 else data)
+            if len(values) != width:
+                raise ValueError("bad Radiance scanline")
+            channels.append(values)
+        return channels
+    # Flat scanlines hold one RGBE pixel after another.  Old style runs are marked by a 1, 1, 1 pixel whose exponent
+    # is a repeat count for the pixel before it.
+    pixels = bytearray()
+    pixel = start
+    shift = 0
+    while True:
+        if pixel[0] == 1 and pixel[1] == 1 and pixel[2] == 1 and pixels:
+            pixels.extend(pixels[-4:]*(pixel[3] << shift))
+            shift += 8
+        else:
+            pixels.extend(pixel)
+            shift = 0
+        if len(pixels) >= 4*width:
+            return [pixels[channel:4*width:4] for channel in range(4)]
+        pixel = bytearray(imageFile.read(4))
+        if len(pixel) < 4:
+            raise ValueError("Radiance file ends early")
+
+# Yields the scanlines of a Radiance file from top to bottom, reading them from disk one at a time.
+# Each scanline is the red, green, blue and exponent bytes as four bytearrays.
+def iterScanlines(path):
+    with open(path, "rb") as imageFile:
+        header = readRadianceHeader(imageFile)
+        for row in range(header["height"]):
+            yield readRadianceScanline(imageFile, header["width"])
+
+# Converts a scanline's RGBE bytes to floating point colors.  With NumPy it returns a (width, 3) float32 array,
+# otherwise a list of (r, g, b) tuples.
+def scanlineToFloat(channels):
+    if numpy is not None:
+        rgbe = numpy.array([numpy.frombuffer(bytes(channel), dtype=numpy.uint8) for channel in channels])
+        scale = numpy.where(rgbe[3] > 0, numpy.ldexp(1.0, rgbe[3].astype(int) - 136), 0.0)
+        return ((rgbe[:3] + 0.5)*scale).T.astype(numpy.float32)
+    red, green, blue, exponent = channels
+    colors = []
+    for index in range(len(exponent)):
+        if exponent[index]:
+            scale = math.ldexp(1.0, exponent[index] - 136)
+            colors.append(((red[index] + 0.5)*scale, (green[index] + 0.5)*scale, (blue[index] + 0.5)*scale))
+        else:
+            colors.append((0.0, 0.0, 0.0))
+    return colors
+
+
+# This portion of the script reads OpenEXR headers.
+exrMagic = struct.pack("<i", 20000630)
+# The names of the OpenEXR compression methods, by their number in the header.
+exrCompressions = ["none", "rle", "zips", "zip", "piz", "pxr24", "b44", "b44a", "dwaa", "dwab"]
+
+# Reads the header of an OpenEXR file.  Returns the format, the width and height of the data window, the
+# compression, the channel names and the byte offset of the pixel offset table.
+def readExrHeader(imageFile):
+    if imageFile.read(4) != exrMagic:
+        raise ValueError("missing OpenEXR signature")
+    version = struct.unpack("<i", imageFile.read(4))[0]
+    # Multi-part and deep files have a different layout.
+    if version & 0x1800:
+        raise ValueError("multi-part and deep OpenEXR files are not supported")
+    header = {"format": "exr"}
+    while True:
+        name = readExrString(imageFile)
+        if not name:
+            break
+        attributeType = readExrString(imageFile)
+        size = struct.unpack("<i", imageFile.read(4))[0]
+        value = imageFile.read(size)
+        if name == "dataWindow" and attributeType == "box2i":
+            xMin, yMin, xMax, yMax = struct.unpack("<4i", value)
+            header["width"] = xMax - xMin + 1
+            header["height"] = yMax - yMin + 1
+        elif name == "compression":
+            header["compression"] = exrCompressions[ord(value[0])] if ord(value[0]) < len(exrCompressions) else "unknown"
+        elif name == "channels":
+            header["channels"] = readExrChannels(value)
+    if "width" not in header:
+        raise ValueError("OpenEXR header has no data window")
+    header["offset"] = imageFile.tell()
+    return header
+
+# Returns the channel names in an OpenEXR channel list.  Each channel is its name, a zero byte and 16 bytes of
+# pixel type and sampling.  The list ends with a zero byte.
+def readExrChannels(value):
+    names = []
+    offset = 0
+    while offset < len(value) and value[offset] != "\0":
+        end = value.index("\0", offset)
+        names.append(value[offset:end])
+        offset = end + 17
+    return names
+
+# Reads a zero terminated string from an OpenEXR header.
+def readExrString(imageFile):
+    characters = []
+    for character in iter(lambda: imageFile.read(1), ""):
+        if character == "\0":
+            break
+        characters.append(character)
+    return "".join(characters)
+
+
+# This portion of the script writes Radiance .hdr files.
+# Converts floating point colors to a scanline's RGBE bytes, the reverse of scanlineToFloat.  Takes a (width, 3) array
+# with NumPy, or a list of (r, g, b) tuples, and returns the red, green, blue and exponent bytes as four bytearrays.
+def floatToScanline(colors):
+    if numpy is not None:
+        colors = numpy.asarray(colors, dtype=numpy.float64).reshape(-1, 3)
+        brightest = colors.max(axis=1)
+        mantissa, exponent = numpy.frexp(brightest)
+        visible = brightest > 1e-32
+        scale = numpy.where(visible, mantissa*256.0/numpy.where(visible, brightest, 1.0), 0.0)
+        rgb = numpy.clip(colors*scale[:, None], 0, 255).astype(numpy.uint8)
+        exponent = numpy.where(visible, exponent + 128, 0).astype(numpy.uint8)
+        return [bytearray(rgb[:, 0].tostring()), bytearray(rgb[:, 1].tostring()), bytearray(rgb[:, 2].tostring()),
+                bytearray(exponent.tostring())]
+    channels = [bytearray(len(colors)) for channel in range(4)]
+    for index, color in enumerate(colors):
+        brightest = max(color)
+        if brightest > 1e-32:
+            mantissa, exponent = math.frexp(brightest)
+            scale = mantissa*256.0/brightest
+            for channel in range(3):
+                channels[channel][index] = min(max(int(color[channel]*scale), 0), 255)
+            channels[3][index] = exponent + 128
+    return channels
+
+# Writes a Radiance image from its rows of floating point colors, top to bottom.  Each row is what floatToScanline
+# takes.  Scanlines are run length encoded unless the width is too small or too large for it, or flat is set.
+def writeRadiance(path, width, height, rows, flat=False):
+    flat = flat or not 8 <= width < 0x8000
+    with open(path, "wb") as imageFile:
+        imageFile.write("#?RADIANCE\nFORMAT=32-bit_rle_rgbe\n\n-Y %d +X %d\n" % (height, width))
+        for row in rows:
+            writeScanline(imageFile, floatToScanline(row), flat)
+
+# Writes one scanline's RGBE bytes, as four bytearrays of equal length.
+def writeScanline(imageFile, channels, flat=False):
+    if flat:
+        imageFile.write(bytearray(value for pixel in zip(*channels) for value in pixel))
+        return
+    width = len(channels[0])
+    imageFile.write(bytearray([2, 2, width >> 8, width & 255]))
+    for channel in channels:
+        imageFile.write(encodeRuns(channel))
+
+# Run length encodes one channel of a Radiance scanline.
+def encodeRuns(values):
+    encoded = bytearray()
+    index = 0
+    while index < len(values):
+        # Measures the run of equal values that starts here.
+        run = 1
+        while index + run < len(values) and run < 127 and values[index + run] == values[index]:
+            run += 1
+        if run > 2:
+            encoded.extend([128 + run, values[index]])
+            index += run
+            continue
+        # Otherwise copies values up to the next run of three or more.
+        end = index
+        while end < len(values) and end - index < 128:
+            if end + 2 < len(values) and values[end] == values[end + 1] == values[end + 2]:
+                break
+            end += 1
+        encoded.append(end - index)
+        encoded.extend(values[index:end])
+        index = end
+    return encoded
+
+# Writes a Radiance image of the given size filled with a smooth gradient, for testing and benchmarks.
+# Scanlines are run length encoded unless flat is set.
+def writeTestImage(path, width=256, height=128, flat=False):
+    with open(path, "wb") as imageFile:
+        imageFile.write("#?RADIANCE\nFORMAT=32-bit_rle_rgbe\n\n-Y %d +X %d\n" % (height, width))
+        for row in range(height):
+            # Every pixel in the row shares an exponent, and the red channel steps every 16 pixels so it has runs.
+            writeScanline(imageFile, [bytearray((column//16*8) % 256 for column in range(width)),
+                                      bytearray(column*255//max(width - 1, 1) for column in range(width)),
+                                      bytearray([row*255//max(height - 1, 1)]*width),
+                                      bytearray([128 + row*4//height]*width)], flat)
+
+
+# This portion of the script makes smaller versions of lat-long images for preview renders and for sampling.
+# Box filters rows of floating point colors down to width columns and height rows.  The rows are read one at a time
+# from any iterable, so an image can be filtered as it streams from disk.  Yields the filtered rows top to bottom.
+def iterBoxFiltered(rows, sourceWidth, sourceHeight, width, height):
+    # The column where each filtered pixel starts.
+    starts = [column*sourceWidth//width for column in range(width)]
+    ends = starts[1:] + [sourceWidth]
+    if numpy is not None:
+        counts = numpy.array(ends) - numpy.array(starts)
+    total = None
+    count = 0
+    row = 0
+    for index, colors in enumerate(rows):
+        if numpy is not None:
+            filtered = numpy.add.reduceat(numpy.asarray(colors, dtype=numpy.float32), starts, axis=0)/counts[:, None]
+            total = filtered if total is None else total + filtered
+        else:
+            filtered = [tuple(sum(color[channel] for color in colors[start:end])/(end - start) for channel in range(3))
+                        for start, end in zip(starts, ends)]
+            total = filtered if total is None else [(a[0] + b[0], a[1] + b[1], a[2] + b[2])
+                                                    for a, b in zip(total, filtered)]
+        count += 1
+        # Yields the row once the last source row it covers has been added.
+        if (index + 1)*height//sourceHeight > row:
+            if numpy is not None:
+                yield total/count
+            else:
+                yield [(color[0]/count, color[1]/count, color[2]/count) for color in total]
+            total = None
+            count = 0
+            row += 1
+
+# Returns the sizes of the mip levels of a lat-long image, largest first.  Each level halves the one before.  The
+# largest is the first level no wider than maxWidth and the smallest the last no narrower than minWidth.  The image
+# itself is the full size level, so it is left out.
+def mipSizes(width, height, maxWidth=2048, minWidth=64):
+    sizes = []
+    width, height = width//2, height//2
+    while width >= minWidth and height >= 1:
+        if width <= maxWidth:
+            sizes.append((width, height))
+        width, height = width//2, height//2
+    return sizes
+
+# Makes the mip levels of a Radiance lat-long image.  The image is read once, streaming its scanlines into the largest
+# level, and each smaller level is filtered from the one before, so only the largest level is ever held in memory.
+# Returns a list of (width, height, rows), largest first.
+def buildMipLevels(path, maxWidth=2048, minWidth=64):
+    header = readHeader(path)
+    levels = []
+    sourceRows = (scanlineToFloat(scanline) for scanline in iterScanlines(path))
+    sourceWidth, sourceHeight = header["width"], header["height"]
+    for width, height in mipSizes(header["width"], header["height"], maxWidth, minWidth):
+        rows = list(iterBoxFiltered(sourceRows, sourceWidth, sourceHeight, width, height))
+        levels.append((width, height, rows))
+        sourceRows, sourceWidth, sourceHeight = rows, width, height
+    return levels
+
+# Returns the lat-long width a render needs for the environment to be no softer than the render, from the render's
+# width in pixels and its camera's horizontal field of view in degrees.
+def latLongWidthFor(renderWidth, fieldOfView):
+    return int(math.ceil(renderWidth*360.0/max(fieldOfView, 1e-3)))
+
+# Builds the tables for importance sampling a lat-long image by brightness.  Each pixel is weighted by its luminance
+# and by the sine of its polar angle, for the solid angle it covers.  Returns (marginal, conditional).  The marginal
+# is the cumulative distribution over rows, height + 1 values from 0 to 1.  The conditional holds the cumulative
+# distribution over columns of each row, width + 1 values per row, one row after another.  Rows with no light are
+# sampled uniformly.  With NumPy both are float32 arrays, otherwise lists.
+def importanceCdf(rows, width, height):
+    weights = [math.sin(math.pi*(row + 0.5)/height) for row in range(height)]
+    if numpy is not None:
+        luminance = numpy.asarray(rows, dtype=numpy.float64).reshape(height, width, 3).dot([0.2126, 0.7152, 0.0722])
+        luminance *= numpy.array(weights)[:, None]
+        conditional = numpy.zeros((height, width + 1))
+        numpy.cumsum(luminance, axis=1, out=conditional[:, 1:])
+        rowTotals = conditional[:, -1].copy()
+        empty = rowTotals <= 0
+        conditional[empty] = numpy.linspace(0.0, 1.0, width + 1)
+        conditional[~empty] /= rowTotals[~empty, None]
+        marginal = numpy.zeros(height + 1)
+        numpy.cumsum(rowTotals, out=marginal[1:])
+        marginal = marginal/marginal[-1] if marginal[-1] > 0 else numpy.linspace(0.0, 1.0, height + 1)
+        return marginal.astype(numpy.float32), conditional.ravel().astype(numpy.float32)
+    marginal = [0.0]
+    conditional = []
+    for row, colors in enumerate(rows):
+        cumulative = [0.0]
+        for color in colors:
+            cumulative.append(cumulative[-1] + (0.2126*color[0] + 0.7152*color[1] + 0.0722*color[2])*weights[row])
+        rowTotal = cumulative[-1]
+        if rowTotal > 0:
+            conditional.extend(value/rowTotal for value in cumulative)
+        else:
+            conditional.extend(column/float(width) for column in range(width + 1))
+        marginal.append(marginal[-1] + rowTotal)
+    if marginal[-1] > 0:
+        marginal = [value/marginal[-1] for value in marginal]
+    else:
+        marginal = [row/float(height) for row in range(height + 1)]
+    return marginal, conditional
+
+# Picks a point on a lat-long image from two random numbers between 0 and 1, using the tables from importanceCdf, so
+# bright parts of the image are picked more often.  Returns the column and row as floats.
+def sampleImportance(marginal, conditional, width, height, u, v):
+    row = min(max(bisect.bisect_right(marginal, v) - 1, 0), height - 1)
+    rowCdf = conditional[row*(width + 1):(row + 1)*(width + 1)]
+    column = min(max(bisect.bisect_right(rowCdf, u) - 1, 0), width - 1)
+    # Places the point within the pixel in proportion to where the random number falls in its part of the tables.
+    rowSpan = marginal[row + 1] - marginal[row]
+    columnSpan = rowCdf[column + 1] - rowCdf[column]
+    return (column + ((u - rowCdf[column])/columnSpan if columnSpan > 0 else 0.5),
+            row + ((v - marginal[row])/rowSpan if rowSpan > 0 else 0.5))
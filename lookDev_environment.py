@@ -1,6 +1,13 @@
-import maya.cmds as mc
-import maya.mel as mel
+# Maya is only imported the first time a command is used, so importing this module has no side effects.
+from toolCore import EN_BuildContext, EN_IdleCoalescer, EN_NodeRegistry, lazyImport, runWorkers
+import hdrReader
+import hdrCatalog
+import os
 import math
+import json
+import functools
+mc = lazyImport("maya.cmds")
+mel = lazyImport("maya.mel")
 
 '''
 This tool allows the user to create a basic look development set-up.
@@ -29,21 +36,31 @@ def lookDevWindow():
     mc.checkBox("hdrLight", label="Create Image Based Lighting")
     mc.checkBox("camCreate", label="Create New Render Camera")
     mc.checkBox("bdCreate", label="Create Backdrop")
+    # Renders previews with a smaller version of the HDR image that is still sharp enough for the render.
+    mc.checkBox("hdrPreview", label="Use Preview Resolution HDR", cc=toggleHdrPreview)
+    # Places and sizes the lights, camera and backdrop around the selected asset instead of around the origin.
+    mc.checkBox("autoPlace", label="Fit To Selected Asset")
     # Allows the user to browse to their desired location to import an HDR file to use with the IBL.
-    mc.textFieldButtonGrp("getFile", label='HDRI file',text="", buttonLabel='Browse', buttonCommand="browseBtnCmd()")
+    mc.textFieldButtonGrp("getFile", label='HDRI file',text="", buttonLabel='Browse', buttonCommand=browseBtnCmd)
+    # Lets the user pick the HDR file from an indexed library instead of browsing the network share.
+    mc.button(label="Browse HDR Library", command=libraryBtnCmd, p="c_layout")
     # Compartmentalizes the create button using a separator.  Mostly just for keeping the UI organized.
     mc.separator(style="in")
     # The create button that creates the LookDev environment using the createLookDev() function.
-    mc.button(label="Create LookDev Environment", command="createLookDev()", p="c_layout")
+    mc.button(label="Create LookDev Environment", command=createLookDev, p="c_layout")
+    # Buttons for saving the tuned set up as a preset and restoring one.
+    mc.button(label="Save Preset", command=savePresetBtnCmd, p="c_layout")
+    mc.button(label="Load Preset", command=loadPresetBtnCmd, p="c_layout")
     mc.separator(style="in")
     # Another heading using separators with text.
     mc.separator()
     mc.text("ADJUST ENVIRONMENT")
     mc.separator()
     # A section of the UI where the user can adjust the environment with the lights in it.  This is interactive.
-    mc.floatSliderGrp("sceneScale", label="Scene Scale", field=True, minValue=0, value = 1, dc="adjustEnvironmentScale()")
-    mc.floatSliderGrp("lightAngle", label="Light Angle", field=True, minValue=-10, maxValue=10, value = 0, dc="adjustEnvironmentAngle()")
-    mc.floatSliderGrp("position", label="Light Position", field=True, minValue=-360, maxValue=360, value = 0, dc="adjustEnvironmentPosition()")
+    # Drags are passed to postControlValue, which applies the latest value once per idle cycle.
+    mc.floatSliderGrp("sceneScale", label="Scene Scale", field=True, minValue=0, value = 1, dc=functools.partial(postControlValue, "sceneScale"))
+    mc.floatSliderGrp("lightAngle", label="Light Angle", field=True, minValue=-10, maxValue=10, value = 0, dc=functools.partial(postControlValue, "lightAngle"))
+    mc.floatSliderGrp("position", label="Light Position", field=True, minValue=-360, maxValue=360, value = 0, dc=functools.partial(postControlValue, "position"))
     # Heading number 3.
     mc.separator()
     mc.text("ADJUST LIGHT SETTINGS")
@@ -51,22 +68,22 @@ def lookDevWindow():
     # Attribute adjustments for the main three-point lighting.  Requires the user to have selected this to be included in the scene.
     # Adjustments for the Key Light.
     mc.text("Key Light")
-    mc.floatSliderGrp("keyOne", label="Intensity", min=0, field=True, dc="adjustLookDevLightsIntensity()", cw3=(98, 75, 1))
-    mc.checkBox("keyShad", label="Turn On Shadows", onc="adjustLookDevLightsKeyShadows()", ofc="adjustLookDevLightsKeyShadows()")
-    mc.checkBox("keyDiff", label="Emit Diffuse", onc="adjustLookDevLightsKeyDiffuse()", ofc="adjustLookDevLightsKeyDiffuse()")
-    mc.checkBox("keySpec", label="Emit Specular", onc="adjustLookDevLightsKeySpec()", ofc="adjustLookDevLightsKeySpec()")
+    mc.floatSliderGrp("keyOne", label="Intensity", min=0, field=True, dc=functools.partial(postControlValue, "keyOne"), cw3=(98, 75, 1))
+    mc.checkBox("keyShad", label="Turn On Shadows", cc=functools.partial(postControlValue, "keyShad"))
+    mc.checkBox("keyDiff", label="Emit Diffuse", cc=functools.partial(postControlValue, "keyDiff"))
+    mc.checkBox("keySpec", label="Emit Specular", cc=functools.partial(postControlValue, "keySpec"))
     # Adjustments for the Rim Light.
     mc.text("Rim Light")
-    mc.floatSliderGrp("rimOne", label="Intensity", min=0, field=True, dc="adjustLookDevLightsIntensity()", cw3=(98, 75, 1))
-    mc.checkBox("rimShad", label="Turn On Shadows", onc="adjustLookDevLightsRimShadows()", ofc="adjustLookDevLightsRimShadows()")
-    mc.checkBox("rimDiff", label="Emit Diffuse", onc="adjustLookDevLightsRimDiffuse()", ofc="adjustLookDevLightsRimDiffuse()")
-    mc.checkBox("rimSpec", label="Emit Specular", onc="adjustLookDevLightsRimSpec()", ofc="adjustLookDevLightsRimSpec()")
+    mc.floatSliderGrp("rimOne", label="Intensity", min=0, field=True, dc=functools.partial(postControlValue, "rimOne"), cw3=(98, 75, 1))
+    mc.checkBox("rimShad", label="Turn On Shadows", cc=functools.partial(postControlValue, "rimShad"))
+    mc.checkBox("rimDiff", label="Emit Diffuse", cc=functools.partial(postControlValue, "rimDiff"))
+    mc.checkBox("rimSpec", label="Emit Specular", cc=functools.partial(postControlValue, "rimSpec"))
     # Adjustments for the Fill Light.
     mc.text("Fill Light")
-    mc.floatSliderGrp("fillOne", label="Intensity", min=0, field=True, dc="adjustLookDevLightsIntensity()", cw3=(98, 75, 1))
-    mc.checkBox("fillShad", label="Turn On Shadows", onc="adjustLookDevLightsFillShadows()", ofc="adjustLookDevLightsFillShadows()")
-    mc.checkBox("fillDiff", label="Emit Diffuse", onc="adjustLookDevLightsFillDiffuse()", ofc="adjustLookDevLightsFillDiffuse()")
-    mc.checkBox("fillSpec", label="Emit Specular", onc="adjustLookDevLightsFillSpec()", ofc="adjustLookDevLightsFillSpec()")
+    mc.floatSliderGrp("fillOne", label="Intensity", min=0, field=True, dc=functools.partial(postControlValue, "fillOne"), cw3=(98, 75, 1))
+    mc.checkBox("fillShad", label="Turn On Shadows", cc=functools.partial(postControlValue, "fillShad"))
+    mc.checkBox("fillDiff", label="Emit Diffuse", cc=functools.partial(postControlValue, "fillDiff"))
+    mc.checkBox("fillSpec", label="Emit Specular", cc=functools.partial(postControlValue, "fillSpec"))
     
     # Header for the tool help section.
     mc.separator()
@@ -91,35 +108,174 @@ def lookDevWindow():
     # Separates the close button from the rest of the GUI.
     mc.separator()
     # Button for reseting the GUI.
-    mc.button(label="Reset Tool", command="resetUI()", p="c_layout")
+    mc.button(label="Reset Tool", command=resetUI, p="c_layout")
     # Closes the GUI.
-    mc.button(label="Close Tool", command="closeUI()", p="c_layout")
+    mc.button(label="Close Tool", command=closeUI, p="c_layout")
 
     # Shows the GUI.
     mc.showWindow()
 # This function allows the user to browse to their desired file location to load an HDR image.  It then displays the file path in the text field of the GUI.
-def browseBtnCmd():
+def browseBtnCmd(*args):
     # The code in this function has been adapted from "Maya Python for Games and Film" by Adam Mechtley and Ryan Trowbridge.
     # The original code can be found on page 230.
     # Creates an empty variable named filePath
     filePath = ""
     # Tells Maya to fill the filePath variable with the file information from the user.
     try: 
-    # Creates the file browser dialog.
-        filePath = mc.fileDialog2(ff=self.fileFilter, fileMode=1)
+    # Creates the file browser dialog.  It returns a list of the chosen files.
+        filePath = (mc.fileDialog2(fileFilter=hdrFileFilter, fileMode=1) or [""])[0]
     except: 
     # Creates an alternate browser dialog for older versions of Maya.
         filePath = mc.fileDialog(dm="*.hdr", mode=0)
     #display file path
     try: mc.textFieldButtonGrp("getFile", edit=True, text=(filePath))
     except: pass
+
+# The file filter of the HDR browser dialog.
+hdrFileFilter = "HDR Images (*.hdr *.pic *.exr);;All Files (*.*)"
+
+# This portion of the script lets the user pick the HDR file from a catalog of their HDR library.
+# The catalog is kept in the user's Maya folder, so the library is only walked once and later visits only read
+# the headers of new and changed files.
+hdrLibrary = {"catalog": None, "mipCache": None, "root": ""}
+
+# Returns the HDR catalog, loading it the first time it is needed.
+def getHdrCatalog():
+    if hdrLibrary["catalog"] is None:
+        hdrLibrary["catalog"] = hdrCatalog.EN_HdrCatalog(os.path.join(mc.internalVar(userAppDir=True), "hdrCatalog"))
+    return hdrLibrary["catalog"]
+
+# Returns the cache of preview versions of HDR images, which is kept next to the catalog.
+def getHdrMipCache():
+    if hdrLibrary["mipCache"] is None:
+        hdrLibrary["mipCache"] = hdrCatalog.EN_HdrMipCache(os.path.join(mc.internalVar(userAppDir=True), "hdrCatalog",
+                                                                        "mips"))
+    return hdrLibrary["mipCache"]
+
+# How sharp the preview HDR image is kept, as a fraction of the render's sharpness.  The IBL mostly lights the asset
+# and shows in soft reflections, which do not need the full sharpness of the render.
+hdrPreviewSharpness = 0.25
+
+# Returns the width the preview version of the HDR image needs, from the render width and the field of view of the
+# render camera.  Before the render camera is created, the field of view of the camera this tool creates is used.
+def previewHdrWidth():
+    renderWidth = mc.getAttr("defaultResolution.width") or 960
+    focalLength, aperture = 35.0, 1.0
+    if "Render_Cam" in lookDevNodes:
+        camera = lookDevNodes.get("Render_Cam")
+        focalLength = mc.getAttr(camera + ".focalLength") or focalLength
+        aperture = mc.getAttr(camera + ".horizontalFilmAperture") or aperture
+    # The film aperture is in inches and the focal length in millimeters.
+    fieldOfView = math.degrees(2.0*math.atan(aperture*25.4/(2.0*focalLength)))
+    return hdrReader.latLongWidthFor(renderWidth*hdrPreviewSharpness, fieldOfView)
+
+# Returns the HDR image the IBL uses for a path: the smallest preview version that is sharp enough when previews are
+# on, otherwise the path itself.  Images that have no preview versions, such as OpenEXR images, are used as they are.
+# Preview versions that are not cached yet are made when Maya is next idle, outside the build, and the full image is
+# used until then.  In batch mode there is no idle time, so they are made straight away.
+def hdrTexturePath(filePath):
+    if not filePath or not createdOptions.get("hdrPreview"):
+        return filePath
+    build = bool(mc.about(batch=True))
+    try:
+        texturePath = getHdrMipCache().levelFor(filePath, previewHdrWidth(), build)
+    except (IOError, ValueError):
+        return filePath
+    if texturePath is None:
+        hdrPreviewBuilds.post(filePath, True)
+        return filePath
+    return texturePath
+
+# Makes the preview versions of the HDR images posted by hdrTexturePath, then switches the IBL to its preview version
+# if it still uses one of the images.  Nothing is made once previews have been switched off.
+def buildHdrPreviews(pending):
+    if not createdOptions.get("hdrPreview"):
+        return
+    for filePath in pending:
+        try:
+            getHdrMipCache().levelFor(filePath, previewHdrWidth())
+        except (IOError, ValueError) as error:
+            mc.warning("Cannot make a preview of %s: %s" % (filePath, error))
+            continue
+        if filePath == createdOptions.get("hdrPath"):
+            applyHdrPath(filePath)
+
+# Collects the HDR images whose preview versions need making, so they are made once Maya is idle.
+hdrPreviewBuilds = EN_IdleCoalescer(buildHdrPreviews)
+
+# Switches the IBL between the preview version of the HDR image and the full image.
+def toggleHdrPreview(value):
+    createdOptions["hdrPreview"] = value
+    applyHdrPath(createdOptions.get("hdrPath", ""))
+
+# Lets the user pick the HDR library folder, refreshes the catalog of it and shows the images in it.
+def libraryBtnCmd(*args):
+    folder = mc.fileDialog2(fileMode=3, caption="HDR Library")
+    if not folder:
+        return
+    hdrLibrary["root"] = folder[0]
+    getHdrCatalog().refresh(folder[0])
+    hdrLibraryWindow()
+
+# Creates the window listing the images in the HDR library with their resolution.
+def hdrLibraryWindow():
+    if mc.window("hdrLibrary_win", ex=True):
+        mc.deleteUI("hdrLibrary_win", window=True)
+    mc.window("hdrLibrary_win", title="HDR Library", w=400)
+    mc.columnLayout(adj=True)
+    catalog = getHdrCatalog()
+    paths = catalog.images(root=hdrLibrary["root"])
+    mc.textScrollList("hdrLibraryList", numberOfRows=20, allowMultiSelection=False,
+                      append=["%s  (%dx%d)" % (os.path.relpath(path, hdrLibrary["root"]), catalog.entries[path]["width"],
+                                               catalog.entries[path]["height"]) for path in paths],
+                      selectCommand=functools.partial(pickLibraryImage, paths))
+    mc.showWindow()
+
+# Puts the image picked in the HDR library window into the HDRI file field.
+def pickLibraryImage(paths, *args):
+    index = mc.textScrollList("hdrLibraryList", query=True, selectIndexedItem=True)
+    if index:
+        mc.textFieldButtonGrp("getFile", edit=True, text=paths[index[0] - 1])
+
+# Returns whether a path is an HDR image that can be read, warning the user if it is not.
+# Only the image's header is read.  An empty path is valid and leaves the IBL without an image.
+def checkHdrPath(filePath):
+    if not filePath:
+        return True
+    try:
+        hdrReader.readHeader(filePath)
+    except (IOError, ValueError) as error:
+        mc.warning("Cannot use %s as the IBL image: %s" % (filePath, error))
+        return False
+    return True
+
 # Creates the environment.  Once created, allows the user to adjust settings and attributes.  This is the main chunk of the script.
-def createLookDev():
+def createLookDev(*args):
     # Create variables for the checkboxes to pull data from user input.
     threePoint = mc.checkBox("threeLight", query=True, value=True)
     ibl = mc.checkBox("hdrLight", query=True, value=True)
     cam = mc.checkBox("camCreate", query=True, value=True)
     backDrop = mc.checkBox("bdCreate", query=True, value=True)
+    hdrPreview = mc.checkBox("hdrPreview", query=True, value=True)
+    # Creates a variable that calls the results of the user input.
+    filePath = mc.textFieldButtonGrp("getFile", q=True, text=True)
+    # Builds in one undo step, without redrawing the viewports until it is done.
+    with EN_BuildContext("createLookDev"):
+        # Measures the selected asset before anything is created, so the new nodes are not measured with it.
+        placement = None
+        if mc.checkBox("autoPlace", query=True, value=True):
+            placement = boundsPlacement(assetBounds())
+        buildLookDev(threePoint, ibl, cam, backDrop, filePath, hdrPreview, placement)
+
+# Creates the chosen parts of the environment without the GUI, so it can be built from a script, a preset or a batch.
+# The placement is the anchor and size from boundsPlacement, and defaults to the layout around the origin.
+def buildLookDev(threePoint=True, ibl=False, cam=True, backDrop=True, filePath="", hdrPreview=False, placement=None):
+    # Remembers what was created, so the sliders know what to adjust without querying the check boxes.
+    createdOptions.update(threeLight=threePoint, hdrLight=ibl, camCreate=cam, bdCreate=backDrop, hdrPreview=hdrPreview)
+    # Works out where every part goes before creating any of them.
+    placement = lookDevPlacement(**(placement or {}))
+    createdOptions["placement"] = {"anchor": placement["anchor"], "size": placement["size"]}
+    createdOptions["hdrPath"] = filePath
 
     # The code for checking for the loading of mentalRay was adapted from "Creating Maya GUI for asset lighting" by Alex Khan on Creative Crash.
     # http://www.creativecrash.com/maya/tutorials/development-api/c/creating-maya-gui-for-asset-lighting
@@ -127,60 +283,14 @@ def createLookDev():
     if mc.pluginInfo("Mayatomr", query=True, loaded=True) != 1 :
         mc.loadPlugin( "Mayatomr" )
     if not mc.objExists('mentalrayGlobals'):
-        mc.mel.eval("miCreateDefaultNodes")
+        mel.eval("miCreateDefaultNodes")
         
     # Use those variables to create the look dev scene.
     # Create three point lighting set up.
     # Checks to see whether or not the user has selected the Three-point lighting option in the GUI.
     if threePoint == True:
-        # Create Key Light.  Set basic attributes to zero.
-        mc.directionalLight(name="KeyLight")
-        mc.setAttr("KeyLight.intensity",0)
-        mc.setAttr("KeyLightShape.useRayTraceShadows", 0)
-        mc.setAttr("KeyLightShape.emitDiffuse", 0)
-        mc.setAttr("KeyLightShape.emitSpecular", 0)
-        # Position Key Light
-        mc.move(10, 10, 12)
-        mc.rotate(-32.641, 39.888, 0)
-        # Place Key Light center of illumination at the origin.
-        mc.setAttr("KeyLight.centerOfIllumination", 18.57)
-        # Center rotation and scale points at the origin.
-        mc.select("KeyLight.rotatePivot")
-        mc.move(0,0,0)
-        mc.select("KeyLight.scalePivot")
-        mc.move(0,0,0)
-        # Create Rim Light.  Set basic attributes to zero.
-        mc.directionalLight(name="RimLight")
-        mc.setAttr("RimLight.intensity",0)
-        mc.setAttr("RimLightShape.useRayTraceShadows", 0)
-        mc.setAttr("RimLightShape.emitDiffuse", 0)
-        mc.setAttr("RimLightShape.emitSpecular", 0)
-        # Position Rim Light
-        mc.move(10, 9, -9)
-        mc.rotate(146.219, 48.013, -180)
-        # Place Rim Light illumination center at the origin.
-        mc.setAttr("RimLight.centerOfIllumination", 16.186)
-        # Center rotation and scale points at the origin.
-        mc.select("RimLight.rotatePivot")
-        mc.move(0,0,0)
-        mc.select("RimLight.scalePivot")
-        mc.move(0,0,0)
-        # Create Fill Light.  Set basic attributes to zero.
-        mc.directionalLight(name="FillLight")
-        mc.setAttr("FillLight.intensity",0)
-        mc.setAttr("FillLightShape.useRayTraceShadows", 0)
-        mc.setAttr("FillLightShape.emitDiffuse", 0)
-        mc.setAttr("FillLightShape.emitSpecular", 0)
-        # Position Fill Light.
-        mc.move(-12, 4, 5)
-        mc.rotate(-17.103, -67.38, 0)
-        # Place Fill Light illumination center at the origin.
-        mc.setAttr("FillLight.centerOfIllumination", 13.601)
-        # Center rotation and scale points at the origin.
-        mc.select("FillLight.rotatePivot")
-        mc.move(0,0,0)
-        mc.select("FillLight.scalePivot")
-        mc.move(0,0,0)
+        # Creates the key, rim and fill lights from the light table and groups them.
+        createThreePointLights(placement["lights"], pivot=placement["anchor"])
     # If option for creation of three-point lighting is not selected, print statement.
     else:
         print "Three-point lighting not selected"
@@ -194,23 +304,21 @@ def createLookDev():
     # Checks to see if IBL option was selected.
     if ibl == True:
         # Creates an IBL node.
-        mc.createNode("mentalrayIblShape", name="IblEnvironment")
+        iblNode = mc.createNode("mentalrayIblShape", name="IblEnvironment")
         # Connects the IBL node to the Mental Ray render globals.
-        mc.connectAttr("IblEnvironment.message",'mentalrayGlobals.imageBasedLighting',force=True)
+        mc.connectAttr(iblNode + ".message",'mentalrayGlobals.imageBasedLighting',force=True)
         # Sets the IBL to be visible in Final Gather
-        mc.setAttr("IblEnvironment.visibleInFinalGather", True)
+        mc.setAttr(iblNode + ".visibleInFinalGather", True)
         # Creates a file node for the HDR image.
-        mc.createNode('file', name= 'HdrFile')
+        hdrFile = mc.createNode('file', name= 'HdrFile')
         # Connects the file node to a place 2d node.
-        mc.createNode('place2dTexture', name='Place2dTxt')
+        place = mc.createNode('place2dTexture', name='Place2dTxt')
         # Connects the file node to the place2d node.
-        mc.connectAttr("HdrFile.uvCoord", "Place2dTxt.coverage")
-        # Creates a variable that calls the results of the user input.
-        filePath = mc.textFieldButtonGrp("getFile", q=True, text=True)
-        # Sets the file nodes texture/image input to the file path from the user.
-        mc.setAttr("HdrFile.fileTextureName", filePath, type= "string")
-        # Sets the IBL texture/image input to the file node's image attribute.
-        mc.setAttr("IblEnvironment.texture", mc.getAttr('HdrFile.fileTextureName'), type="string")
+        mc.connectAttr(hdrFile + ".uvCoord", place + ".coverage")
+        lookDevNodes.register("IblEnvironment", iblNode)
+        lookDevNodes.register("HdrFile", hdrFile)
+        # Sets the file node's and the IBL's texture/image input to the file path from the user.
+        applyHdrPath(filePath)
     # If IBL option was not selected, prints statement.
     else:
         print "No IBL selected"
@@ -218,9 +326,11 @@ def createLookDev():
     # Checks to see if render camera options was created.
     if cam == True:
         # Creates camera.
-        mc.camera(name="Render_Cam", displayResolution=True, dgm=True, horizontalFilmAperture=1.0, verticalFilmAperture=1.0, ff="fill")
+        camera = mc.camera(name="Render_Cam", displayResolution=True, dgm=True, horizontalFilmAperture=1.0, verticalFilmAperture=1.0, ff="fill")[0]
         # Positions camera.
-        mc.move(0, 5, 20)
+        mc.move(*(placement["camera"] + (camera,)))
+        lookDevNodes.register("Render_Cam", camera)
+        recordBasePose("Render_Cam", translate=placement["camera"])
     # If render camera option was not selected, prints statement.
     else:
         print "New camera not selected"
@@ -228,291 +338,502 @@ def createLookDev():
     # Checks to see if backdrop option was selected.
     if backDrop == True:
         # Creates the backdrop and positions it.
-        mc.nurbsPlane(name="BackDrop", v=5, w=15, lr=0.5)
-        mc.setAttr("BackDrop.rotateX", 90)
-        mc.setAttr("BackDrop.rotateZ", 90)
-        mc.setAttr("BackDrop.scaleY", 20)
-        mc.setAttr("BackDrop.scaleZ", 5)
-        mc.setAttr("BackDrop.translateZ", -10)
-        mc.select("BackDrop.cv[0:3][0]")
-        mc.xform(relative=True, translation=(45,0,0))
-        mc.select("BackDrop.cv[0:3][1]")
-        mc.xform(relative=True, translation=(9,-0.25,0))
-        mc.select("BackDrop")
+        plane = mc.nurbsPlane(name="BackDrop", v=5, w=15, lr=0.5)[0]
+        mc.setAttr(plane + ".rotateX", 90)
+        mc.setAttr(plane + ".rotateZ", 90)
+        mc.setAttr(plane + ".scaleY", 20)
+        mc.setAttr(plane + ".scaleZ", 5)
+        mc.setAttr(plane + ".translateZ", -10)
+        # Moves the CVs without selecting them, so building does not change the selection.
+        mc.xform(plane + ".cv[0:3][0]", relative=True, translation=(45,0,0))
+        mc.xform(plane + ".cv[0:3][1]", relative=True, translation=(9,-0.25,0))
         # Freezes backdrop transformations.
-        mc.makeIdentity(apply=True)
-        # Clears cv selections.
+        mc.makeIdentity(plane, apply=True)
+        # Freezing leaves the pivots where the plane was, so they are put back at the origin.  The backdrop then
+        # scales about the same point as the lights and camera, and stays on the floor as it grows.
+        mc.xform(plane, worldSpace=True, pivots=(0, 0, 0))
+        # Moves and sizes the backdrop to fit the asset.
+        if placement["size"] != 1.0 or placement["backDrop"] != (0, 0, 0):
+            mc.xform(plane, translation=placement["backDrop"], scale=(placement["size"],)*3)
+        lookDevNodes.register("BackDrop", plane)
+        recordBasePose("BackDrop", translate=placement["backDrop"], scale=(placement["size"],)*3)
+        # Clears the selection the new plane was given.
         mc.select(cl=True)
     # If backdrop option was not selected,  prints statement.
     else:
         print "Backdrop Not Selected"
-    # Groups the lights if three-point lighting was selected.
-    if threePoint == True:
-        mc.select("KeyLight", "RimLight", "FillLight")
-        mc.group(name="ThreePointLighting")
-    # If three-point lighting option was not selected, prints statement.  
-    else:
-        print "Three-point lighting not selected."
+
+# The three-point lighting set up as a table.  Each row is (light name, position, rotation, center of illumination,
+# shape attributes).  The lights are created in this order and positioned so they all point at the origin.
+# More lights, such as a kicker or a bounce, can be added as rows.
+threePointLights = [
+    ("KeyLight", (10, 10, 12), (-32.641, 39.888, 0), 18.57, {}),
+    ("RimLight", (10, 9, -9), (146.219, 48.013, -180), 16.186, {}),
+    ("FillLight", (-12, 4, 5), (-17.103, -67.38, 0), 13.601, {}),
+]
+# Shape attributes every light starts with, unless its row overrides them.  All lights start switched off.
+lightDefaults = {"intensity": 0, "useRayTraceShadows": 0, "emitDiffuse": 0, "emitSpecular": 0}
+# The values Maya gives a new directional light.  Attributes that already have these values are not set again.
+mayaLightDefaults = {"intensity": 1, "useRayTraceShadows": 0, "emitDiffuse": 1, "emitSpecular": 1}
+
+# This portion of the script places the set up around an asset.
+# The light table, the camera position and the backdrop are laid out for an asset about layoutSize units across
+# standing on the origin.  Another asset gets the same layout moved to the middle of its base and scaled by its size
+# over layoutSize, so the lights keep their angles and the camera, whose field of view does not change, frames the
+# asset the same way.
+layoutSize = 10.0
+cameraPosition = (0, 5, 20)
+
+# Returns the world space bounding box of the given nodes, or of the selection, as (minimum, maximum) corners.  With
+# nothing given or selected, the box is around all the geometry in the scene except the backdrop.  It is measured
+# with one bounding box query.  Returns None if there is nothing to measure.
+def assetBounds(nodes=None):
+    nodes = nodes or mc.ls(sl=True, long=True)
+    if not nodes:
+        nodes = mc.ls(geometry=True, long=True, noIntermediate=True) or []
+        if "BackDrop" in lookDevNodes:
+            backDrop = set(mc.listRelatives(lookDevNodes.get("BackDrop"), allDescendents=True, fullPath=True) or [])
+            nodes = [node for node in nodes if node not in backDrop]
+    if not nodes:
+        return None
+    box = mc.exactWorldBoundingBox(*nodes)
+    return tuple(box[:3]), tuple(box[3:])
+
+# Returns the placement for an asset's bounding box: the middle of the bottom of the box, and the size of the layout
+# that fits the asset.  No bounding box gives the layout around the origin.
+def boundsPlacement(bounds):
+    if bounds is None:
+        return {"anchor": (0, 0, 0), "size": 1.0}
+    low, high = bounds
+    extent = max(high[axis] - low[axis] for axis in range(3))
+    return {"anchor": ((low[0] + high[0])*0.5, low[1], (low[2] + high[2])*0.5),
+            "size": extent/layoutSize if extent > 0 else 1.0}
+
+# Works out the transforms of every part of the set up for a placement in one pass.  Returns the placement's anchor
+# and size, the light table with the lights moved and their centers of illumination scaled, the camera position and
+# the backdrop position, which is the anchor.
+def lookDevPlacement(anchor=(0, 0, 0), size=1.0):
+    anchor = tuple(anchor)
+    place = lambda position: tuple(anchor[axis] + position[axis]*size for axis in range(3))
+    lights = [(name, place(position), rotation, centerOfIllumination*size, attributes)
+              for name, position, rotation, centerOfIllumination, attributes in threePointLights]
+    return {"anchor": anchor, "size": size, "lights": lights, "camera": place(cameraPosition), "backDrop": anchor}
+
+# Creates the lights in a light table and groups them.  Each light is placed with one xform call and its pivots with
+# another, and only the attributes that differ from a new light are set, so nothing is selected and moved.
+# The pivots of the lights and the group are put at the pivot, which is the point the lights aim at.
+# The lights, their shapes and the group are registered in lookDevNodes under their names in the table, so they
+# are found even if Maya had to rename them.  Returns the group.
+def createThreePointLights(lights=None, groupName="ThreePointLighting", pivot=(0, 0, 0)):
+    lights = lights or threePointLights
+    transforms = []
+    for name, position, rotation, centerOfIllumination, attributes in lights:
+        shape = mc.directionalLight(name=name)
+        transform = mc.listRelatives(shape, parent=True)[0]
+        # Positions the light and puts its rotate and scale pivots at the point it aims at.
+        mc.xform(transform, translation=position, rotation=rotation)
+        mc.xform(transform, worldSpace=True, pivots=pivot)
+        # Places the light's center of illumination at the point it aims at.
+        mc.setAttr(shape + ".centerOfIllumination", centerOfIllumination)
+        values = dict(lightDefaults)
+        values.update(attributes)
+        for attribute, value in sorted(values.items()):
+            if mayaLightDefaults.get(attribute) != value:
+                mc.setAttr(shape + "." + attribute, value)
+            boundValues[(name + "Shape", attribute)] = value
+        lookDevNodes.register(name, transform)
+        lookDevNodes.register(name + "Shape", shape)
+        recordBasePose(name, translate=position, rotate=rotation)
+        transforms.append(transform)
+    group = mc.group(transforms, name=groupName)
+    # The position slider turns the group around its pivot.
+    if tuple(pivot) != (0, 0, 0):
+        mc.xform(group, worldSpace=True, pivots=pivot)
+    lookDevNodes.register(groupName, group)
+    recordBasePose(groupName)
+    # Grouping changed the lights' full paths.
+    lookDevNodes.invalidate()
+    return group
+
+# The nodes created by the tool, keyed by their names in the tool: KeyLight, KeyLightShape, ThreePointLighting,
+# Render_Cam, BackDrop and so on.  The sliders find the nodes through this instead of by name.
+lookDevNodes = EN_NodeRegistry()
+
+# The transforms of the created nodes as they were built, keyed by their names in the tool.  Each is a dictionary of translate,
+# rotate and scale.  The sliders set transforms from these and the slider values alone, so the result of an update
+# never depends on the updates before it, and updates can be skipped or coalesced.
+basePose = {}
+
+# Records the transform a node was built with.
+def recordBasePose(node, translate=(0, 0, 0), rotate=(0, 0, 0), scale=(1, 1, 1)):
+    basePose[node] = {"translate": tuple(translate), "rotate": tuple(rotate), "scale": tuple(scale)}
+    return basePose[node]
+
+# Returns the transform a node was built with.  Nodes that were not recorded are taken to have been built at the origin.
+def getBasePose(node):
+    return basePose.get(node) or recordBasePose(node)
+
+# The check box values used to create the environment, keyed by check box name.  The sliders read these instead of
+# querying the check boxes on every drag.
+createdOptions = {}
+
+# Returns whether an option was used to create the environment.  Before anything has been created this is the check
+# box value, which is then remembered.
+def createdOption(name):
+    if name not in createdOptions:
+        createdOptions[name] = mc.checkBox(name, query=True, value=True)
+    return createdOptions[name]
+
+# Sliders fire their drag command for every mouse move, and check boxes their change command on every click.  Each
+# one posts its value here, and the latest value of each control is applied once the next time Maya is idle.
+# The coalescer counts the events received and the updates applied.
+def postControlValue(control, value, *args):
+    controlUpdates.post(control, value)
+
+# Applies the latest value of each control that changed since the last idle cycle.  If a node's cached path has gone
+# stale, for example because it was renamed or reparented, the paths are resolved again and the values reapplied.
+# Nodes that have been deleted are forgotten and their controls skipped.  If the whole set up is gone, for example
+# after a new scene, the look development state is reset instead.
+def applyControlValues(values):
+    try:
+        applyControls(values)
+    except (RuntimeError, ValueError):
+        lookDevNodes.invalidate()
+        missing = lookDevNodes.prune()
+        if not lookDevNodes.uuids:
+            print "The look development set up is no longer in the scene"
+            resetLookDevState()
+            return
+        if missing:
+            print "Skipping deleted look development nodes: %s" % ", ".join(sorted(missing))
+        applyControls(values)
+
+# Applies control values through the control's applier function or its attribute bindings.
+def applyControls(values):
+    controlValues.update(values)
+    for control, value in values.items():
+        if control in controlAppliers:
+            controlAppliers[control](value)
+    applyBindings(values)
+
+controlUpdates = EN_IdleCoalescer(applyControlValues)
+
+# The latest value applied for each control, keyed by control name.  Presets save these.
+controlValues = {}
+
+# Sets the HDR image used by the file node and the IBL.  A path that is not a readable HDR image is left out.
+# The path is remembered as given, and the IBL uses its preview version when previews are on.
+def applyHdrPath(filePath):
+    if not checkHdrPath(filePath):
+        filePath = ""
+    createdOptions["hdrPath"] = filePath
+    if "HdrFile" in lookDevNodes:
+        texturePath = hdrTexturePath(filePath)
+        mc.setAttr(lookDevNodes.require("HdrFile") + ".fileTextureName", texturePath, type="string")
+        mc.setAttr(lookDevNodes.require("IblEnvironment") + ".texture", texturePath, type="string")
+
 # Creates a function for adjusting the environment scale.   
-def adjustEnvironmentScale():
-    # Create variables for the user input options.
-    threePointScl = mc.checkBox("threeLight", query=True, value=True)
-    camAdj = mc.checkBox("camCreate", query=True, value=True)
-    backDropAdj = mc.checkBox("bdCreate", query=True, value=True)
-    scaleEnv = mc.floatSliderGrp("sceneScale", query=True, value=True)
-    
-    # Scale the lights.
+def adjustEnvironmentScale(*args):
+    applyEnvironmentScale(mc.floatSliderGrp("sceneScale", query=True, value=True))
+
+# Sets the scale of the lights, backdrop and camera that were created to their built scale times the slider value.
+def applyEnvironmentScale(scaleEnv):
+    targets = []
     # Checks to see if user selected the creation of three-point lighting.
-    if threePointScl == True:
-        # If selected, creates selects the lights and scales them using the user input.
-        mc.select("KeyLight")
-        mc.scale(scaleEnv, scaleEnv, scaleEnv)
-        mc.select("FillLight")
-        mc.scale(scaleEnv, scaleEnv, scaleEnv)
-        mc.select("RimLight")
-        mc.scale(scaleEnv, scaleEnv, scaleEnv)
-    # If not selected, prints statement.
-    else:
-        print "Three-point lighting was not selected"
-    # Clear selections.
-    mc.select(cl=True)
-    # Scale the backdrop. 
+    if createdOption("threeLight"):
+        targets.extend(["KeyLight", "FillLight", "RimLight"])
     # Checks to see if user selected the backdrop to be created.
-    if backDropAdj == True:
-        # If backdrop creation was selected, selects the backdrop and scales it using the user input. 
-        mc.select("BackDrop")
-        mc.scale(scaleEnv, scaleEnv, scaleEnv)
-    # If backdrop creation was not selected, prints statement.
-    else:
-        print "Backdrop Not Selected"
-    # Clear selections.
-    mc.select(cl=True)
-    # Scale the camera.
+    if createdOption("bdCreate"):
+        targets.append("BackDrop")
     # Checks to see if user selected the creation of a new render camera.
-    if camAdj == True:
-        # If new render camera was created, selects the camera and scales it using user input.
-        mc.select("Render_Cam1")
-        mc.scale(scaleEnv, scaleEnv, scaleEnv)
-    # If render camera was not selected to be created, prints statement.
-    else: 
-        print "Render camera was not created"
-    # Clear selections.
-    mc.select(cl=True)
+    if createdOption("camCreate"):
+        targets.append("Render_Cam")
+    # If nothing was created, prints statement.
+    if not targets:
+        print "Nothing was created to scale"
+    for target in [target for target in targets if target in lookDevNodes]:
+        mc.setAttr(lookDevNodes.require(target) + ".scale", *[value*scaleEnv for value in getBasePose(target)["scale"]])
+
 # Function for adjusting the angle of the lights.   
-def adjustEnvironmentAngle():
-    # Variables for pulling the user input data.
-    threePointAng = mc.checkBox("threeLight", query=True, value=True)
-    angle = mc.floatSliderGrp("lightAngle", query=True, value=True)
-    # To adjust the angle of the lights.
+def adjustEnvironmentAngle(*args):
+    applyEnvironmentAngle(mc.floatSliderGrp("lightAngle", query=True, value=True))
+
+# Tilts the lights by the angle around their own x axes, starting from the rotation they were built with.
+# The lights use the xyz rotate order, so tilting around the object's x axis only changes rotateX.
+def applyEnvironmentAngle(angle):
     # Checks to see if create three-point lighting was selected.
-    if threePointAng == True:
-        # If selected, rotates the lights using user input.
-        mc.select("KeyLight")
-        mc.rotate(-angle, 0, 0, os=True, r=True)
-        mc.select("FillLight")
-        mc.rotate(-angle, 0, 0, os=True, r=True)
-        mc.select("RimLight")
-        mc.rotate(-angle, 0, 0, os=True, r=True)
+    if createdOption("threeLight"):
+        # If selected, sets the light rotations using user input.
+        for light in [light for light in ["KeyLight", "FillLight", "RimLight"] if light in lookDevNodes]:
+            mc.setAttr(lookDevNodes.require(light) + ".rotateX", getBasePose(light)["rotate"][0] - angle)
     # If not selected, prints statement.
     else:
         print "Three-point lighting was not selected"
-    # Clear the selections.
-    mc.select(cl=True)
+
 # Function for adjusting the rotation of the lights around the center axis.
-def adjustEnvironmentPosition():
-    # Variables for pulling user data from above.
-    threePointPos = mc.checkBox("threeLight", query=True, value=True)
-    rotation = mc.floatSliderGrp("position", query=True, value=True)
-    # To adjust the  rotation of the lights around the axis.
-    # Checks to see if create three-point lighting was selected.
-    if threePointPos == True:
-        # IF selected, rotates the whole light group around the scene origin.
-        mc.select("ThreePointLighting")
-        mc.rotate(0, rotation, 0)
-    # If not selected, prints statement.
-    else:
-        print "Three-point lighting was not selected"
-    # Clears selections.  
-    mc.select(cl=True)
-    
-# Function for adjusting the individual attributes of the lights.
-def adjustLookDevLightsIntensity():
-    # Create variables for the user input options.
-    threePointAdj = mc.checkBox("threeLight", query=True, value=True)
-    # Variable for the key light.
-    keyIntense = mc.floatSliderGrp("keyOne", q=True, value=True)
-    # Variable for the rim light.
-    rimIntense = mc.floatSliderGrp("rimOne", q=True, value=True)
-    # Variable for the fill light.
-    fillIntense = mc.floatSliderGrp("fillOne", q=True, value=True)
+def adjustEnvironmentPosition(*args):
+    applyEnvironmentPosition(mc.floatSliderGrp("position", query=True, value=True))
+
+# Rotates the whole light group around the scene origin, starting from the rotation it was built with.
+def applyEnvironmentPosition(rotation):
     # Checks to see if create three-point lighting was selected.
-    if threePointAdj == True:
-        # If selected, adjusts the light intensities based on user input.
-        mc.setAttr("KeyLight.intensity", keyIntense)
-        mc.setAttr("RimLight.intensity", rimIntense)
-        mc.setAttr("FillLight.intensity", fillIntense)
+    if createdOption("threeLight"):
+        if "ThreePointLighting" in lookDevNodes:
+            mc.setAttr(lookDevNodes.require("ThreePointLighting") + ".rotateY", getBasePose("ThreePointLighting")["rotate"][1] + rotation)
     # If not selected, prints statement.
     else:
         print "Three-point lighting was not selected"
-# Function for adjusting the ray trace shadow attribute of the key light.
-def adjustLookDevLightsKeyShadows():
-    # Variables for pulling user input.
-    threePointShad = mc.checkBox("threeLight", query =True, value = True)
-    keyOpts1 = mc.checkBox("keyShad", q=True, value=True)
-    # Checks to see if create three-point lighting was selected.
-    if threePointShad == True:
-        # If selected, checks to see if the show ray trace shadows option was selected.  
-        if keyOpts1 == True:
-            # If selected, turns on ray trace shadows for the key light.
-            mc.setAttr("KeyLightShape.useRayTraceShadows", 1)
-        # If not selected, turns off ray trace shadows for the key light.
-        else:
-            mc.setAttr("KeyLightShape.useRayTraceShadows", 0)
-    # IF three point lighting not selected, prints statement.  
-    else:
-        print "Three-point lighting was not selected"
-# Function for adjusting the emit diffuse attribute of the key light.   
-def adjustLookDevLightsKeyDiffuse():
-    # Creates variables for pulling user data.
-    threePointDif = mc.checkBox("threeLight", query=True, value=True)
-    keyOpts2 = mc.checkBox("keyDiff", q=True, value=True)
-    # Checks to see if create three-point lighting was selected.
-    if threePointDif == True:
-        # If selected, checks to see if the emit diffuse option was selected.  
-        if keyOpts2 == True:
-            # If selected, turns on emit diffuse for the key light.
-            mc.setAttr("KeyLightShape.emitDiffuse", 1)
-        # If not selected, turns off emit diffuse for the key light.
-        else:
-            mc.setAttr("KeyLightShape.emitDiffuse", 0)
-    # IF three point lighting not selected, prints statement. 
-    else:
-        print "Three-point lighting was not selected"
-# Function for adjusting the emit specular attribute of the key light. 
-def adjustLookDevLightsKeySpec():
-    # Creates variables for pulling user data.
-    threePointSpec = mc.checkBox("threeLight", query =True, value = True)
-    keyOpts3 = mc.checkBox("keySpec", q=True, value=True)
-    # Checks to see if create three-point lighting was selected.
-    if threePointSpec == True:
-        # If selected, checks to see if the emit specular option was selected
-        if keyOpts3 == True:
-            # If selected, turns on emit specular for the key light.
-            mc.setAttr("KeyLightShape.emitSpecular", 1)
-        # If not selected, turns off emit specular for the key light.
-        else:
-            mc.setAttr("KeyLightShape.emitSpecular", 0)
-    # IF three point lighting not selected, prints statement.
-    else:
-        print "Three-point lighting was not selected"
-# Function for adjusting the ray trace shadow attribute of the rim light.    
-def adjustLookDevLightsRimShadows():
-    # Creates variables for pulling user data.
-    threePointShad2 = mc.checkBox("threeLight", query =True, value = True)
-    rimOpts1 = mc.checkBox("rimShad", q=True, value=True)
-    # Checks to see if create three-point lighting was selected.
-    if threePointShad2 == True:
-        # If selected, checks to see if the show ray trace shadows option was selected.
-        if rimOpts1 == True:
-            # If selected, turns on ray trace shadows for the rim light.
-            mc.setAttr("RimLightShape.useRayTraceShadows", 1)
-        # If not selected, turns off ray trace shadows for the rim light.
-        else:
-            mc.setAttr("RimLightShape.useRayTraceShadows", 0)
-    # IF three point lighting not selected, prints statement.
-    else:
-        print "Three-point lighting was not selected"
-# Function for adjusting the emit diffuse attribute of the rim light.        
-def adjustLookDevLightsRimDiffuse():
-    # Creates variables for pulling user data.
-    threePointDif2 = mc.checkBox("threeLight", query=True, value=True)
-    rimOpts2 = mc.checkBox("rimDiff", q=True, value=True)
-    # Checks to see if create three-point lighting was selected.
-    if threePointDif2 == True:
-        # If selected, checks to see if the emit diffuse option was selected.
-        if rimOpts2 == True:
-            # If selected, turns on emit diffuse for the rim light.
-            mc.setAttr("RimLightShape.emitDiffuse", 1)
-        # If not selected, turns off emit diffuse for the key light.
-        else:
-            mc.setAttr("RimLightShape.emitDiffuse", 0)
-    # IF three point lighting not selected, prints statement.
-    else:
-        print "Three-point lighting was not selected"
-# Function for adjusting the emit specular attribute of the rim light.         
-def adjustLookDevLightsRimSpec():
-    # Creates variables for pulling user data.
-    threePointSpec2 = mc.checkBox("threeLight", query =True, value = True)
-    rimOpts3 = mc.checkBox("rimSpec", q=True, value=True)
-    # Checks to see if create three-point lighting was selected.
-    if threePointSpec2 == True:
-        # If selected, checks to see if the emit specular option was selected
-        if rimOpts3 == True:
-            # If selected, turns on emit specular for the rim light.
-            mc.setAttr("RimLightShape.emitSpecular", 1)
-        # If not selected, turns off emit specular for the key light.
-        else:
-            mc.setAttr("RimLightShape.emitSpecular", 0)
-    # IF three point lighting not selected, prints statement.
-    else:
-        print "Three-point lighting was not selected"
-# Function for adjusting the ray trace shadow attribute of the fill light.       
-def adjustLookDevLightsFillShadows():
-    # Creates variables for pulling user data.
-    threePointShad3 = mc.checkBox("threeLight", query =True, value = True)
-    fillOpts1 = mc.checkBox("fillShad", q=True, value=True)
-    # Checks to see if create three-point lighting was selected.
-    if threePointShad3 == True:
-        # If selected, checks to see if the show ray trace shadows option was selected.
-        if fillOpts1 == True:
-            # If selected, turns on ray trace shadows for the fill light.
-            mc.setAttr("FillLightShape.useRayTraceShadows", 1)
-        # If not selected, turns off ray trace shadows for the rim light.
-        else:
-            mc.setAttr("FillLightShape.useRayTraceShadows", 0)
-    # IF three point lighting not selected, prints statement.
-    else:
-        print "Three-point lighting was not selected"
-# Function for adjusting the emit diffuse attribute of the fill light.         
-def adjustLookDevLightsFillDiffuse():
-    # Creates variables for pulling user data
-    threePointDif3 = mc.checkBox("threeLight", query=True, value=True)
-    fillOpts2 = mc.checkBox("fillDiff", q=True, value=True)
-    # Checks to see if create three-point lighting was selected.
-    if threePointDif3 == True:
-        # If selected, checks to see if the emit diffuse option was selected.
-        if fillOpts2 == True:
-            # If selected, turns on emit diffuse for the rim light.
-            mc.setAttr("FillLightShape.emitDiffuse", 1)
-        # If not selected, turns off emit diffuse for the key light.
-        else:
-            mc.setAttr("FillLightShape.emitDiffuse", 0)
-    # IF three point lighting not selected, prints statement.
-    else:
-        print "Three-point lighting was not selected"
-# Function for adjusting the emit specular attribute of the fill light.    
-def adjustLookDevLightsFillSpec():
-    # Creates variables for pulling user data
-    threePointSpec3 = mc.checkBox("threeLight", query =True, value = True)
-    fillOpts3 = mc.checkBox("fillSpec", q=True, value=True)
+
+# The controls that set a node attribute directly, as a table.  Each row is (control, node key in lookDevNodes,
+# attribute).  More light attributes, such as color, samples or shadow rays, only need a control and a row here.
+lightBindings = []
+for light, prefix in (("KeyLight", "key"), ("RimLight", "rim"), ("FillLight", "fill")):
+    lightBindings.extend([(prefix + "One", light + "Shape", "intensity"),
+                          (prefix + "Shad", light + "Shape", "useRayTraceShadows"),
+                          (prefix + "Diff", light + "Shape", "emitDiffuse"),
+                          (prefix + "Spec", light + "Shape", "emitSpecular")])
+
+# The value last written to each bound attribute, keyed by (node key, attribute).  Values that are already set are
+# not written again.
+boundValues = {}
+
+# Writes the bound attributes of the given controls, keyed by control name, and returns the number of attributes
+# written.  Only values that differ from the last ones written are set.
+def applyBindings(values):
+    bindings = [binding for binding in lightBindings if binding[0] in values]
+    if not bindings:
+        return 0
     # Checks to see if create three-point lighting was selected.
-    if threePointSpec3 == True:
-        # If selected, checks to see if the emit specular option was selected
-        if fillOpts3 == True:
-            # If selected, turns on emit specular for the fill light.
-            mc.setAttr("FillLightShape.emitSpecular", 1)
-        # If not selected, turns off emit specular for the fill light.
-        else:
-            mc.setAttr("FillLightShape.emitSpecular", 0)
-    # IF three point lighting not selected, prints statement.
-    else:
+    if not createdOption("threeLight"):
         print "Three-point lighting was not selected"
+        return 0
+    written = 0
+    for control, key, attribute in bindings:
+        value = values[control]
+        if key in lookDevNodes and boundValues.get((key, attribute)) != value:
+            mc.setAttr(lookDevNodes.require(key) + "." + attribute, value)
+            boundValues[(key, attribute)] = value
+            written += 1
+    return written
+
+# Reads every bound control and writes the attributes that changed.
+def adjustLookDevLights(*args):
+    values = {}
+    for control, key, attribute in lightBindings:
+        if control not in values:
+            if mc.floatSliderGrp(control, exists=True):
+                values[control] = mc.floatSliderGrp(control, query=True, value=True)
+            else:
+                values[control] = mc.checkBox(control, query=True, value=True)
+    return applyBindings(values)
+
+# The function that applies each environment slider's value.
+controlAppliers = {"sceneScale": applyEnvironmentScale, "lightAngle": applyEnvironmentAngle,
+                   "position": applyEnvironmentPosition}
+
+# This portion of the script saves the look development set up as a preset and restores it.
+# A preset is a small JSON file holding which parts of the set up exist, the HDR image, where the set up was placed,
+# the transforms the parts were built with and the value of every control.  The sliders set transforms from the built
+# transforms and the control values alone, so these describe the light transforms and attributes completely.  Every
+# control is saved, so restoring a preset gives the same set up whatever was loaded before it.
+presetVersion = 1
+# The registry key of the node each part of the set up creates, keyed by the option that creates it.
+presetParts = {"threeLight": "ThreePointLighting", "hdrLight": "IblEnvironment", "camCreate": "Render_Cam",
+               "bdCreate": "BackDrop"}
+# The value of every control when the GUI opens.  Presets hold every control, with these values for the ones that were
+# never touched, and restoring a preset that lacks a control resets it to this value.
+controlDefaults = dict([("sceneScale", 1.0), ("lightAngle", 0.0), ("position", 0.0)] +
+                       [(control, 0.0 if attribute == "intensity" else False)
+                        for control, key, attribute in lightBindings])
+
+# Returns the current set up as a dictionary that can be saved as JSON.
+def getLookDevState():
+    return {"version": presetVersion,
+            "options": dict((option, bool(option in createdOptions and createdOptions[option])) for option in presetParts),
+            "hdrPath": createdOptions.get("hdrPath", ""),
+            "hdrPreview": bool(createdOptions.get("hdrPreview")),
+            "placement": createdOptions.get("placement"),
+            "poses": basePose,
+            "controls": dict(controlDefaults, **controlValues)}
+
+# Saves the current set up to a preset file.
+def saveLookDevPreset(path):
+    with open(path, "w") as presetFile:
+        json.dump(getLookDevState(), presetFile, separators=(",", ":"), sort_keys=True)
+
+# Restores a set up from a preset file.
+def loadLookDevPreset(path):
+    with open(path) as presetFile:
+        state = json.load(presetFile)
+    if state.get("version") != presetVersion:
+        raise ValueError("%s is not a version %d look development preset" % (path, presetVersion))
+    restoreLookDevState(state)
+
+# Restores a set up in one pass.  Parts the preset has that are not in the scene yet are built, transforms that differ
+# from the ones the parts were built with are set, and then all the control values are applied together, which only
+# writes the attributes that change.
+def restoreLookDevState(state):
+    options = state["options"]
+    missing = dict((option, bool(options.get(option)) and presetParts[option] not in lookDevNodes) for option in presetParts)
+    if any(missing.values()):
+        buildLookDev(missing["threeLight"], missing["hdrLight"], missing["camCreate"], missing["bdCreate"],
+                     state.get("hdrPath", ""), state.get("hdrPreview", False), state.get("placement"))
+    # Parts already in the scene stay registered even if the preset does not have them, so the sliders still drive them.
+    createdOptions.update((option, bool(options.get(option)) or presetParts[option] in lookDevNodes)
+                          for option in presetParts)
+    if (state.get("hdrPath", ""), state.get("hdrPreview", False)) != (createdOptions.get("hdrPath"),
+                                                                     createdOptions.get("hdrPreview")):
+        createdOptions["hdrPreview"] = state.get("hdrPreview", False)
+        applyHdrPath(state.get("hdrPath", ""))
+    for key, pose in state.get("poses", {}).items():
+        pose = dict((attribute, tuple(values)) for attribute, values in pose.items())
+        if key in lookDevNodes and getBasePose(key) != pose:
+            for attribute in ("translate", "rotate", "scale"):
+                mc.setAttr(lookDevNodes.require(key) + "." + attribute, *pose[attribute])
+            basePose[key] = pose
+    # Controls the preset does not have go back to their defaults, so the result does not depend on earlier presets.
+    controls = dict(controlDefaults, **state.get("controls", {}))
+    applyControls(controls)
+    syncLookDevWindow(controls)
+
+# Sets the GUI's controls to the given values, if the GUI is open.
+def syncLookDevWindow(values):
+    if not mc.window("lookDev_win", exists=True):
+        return
+    for control, value in values.items():
+        if mc.floatSliderGrp(control, exists=True):
+            mc.floatSliderGrp(control, edit=True, value=value)
+        elif mc.checkBox(control, exists=True):
+            mc.checkBox(control, edit=True, value=value)
+
+# Lets the user pick a file and saves the current set up to it as a preset.
+def savePresetBtnCmd(*args):
+    path = mc.fileDialog2(fileFilter="LookDev Presets (*.json)", fileMode=0)
+    if path:
+        saveLookDevPreset(path[0])
+
+# Lets the user pick a preset file and restores it.
+def loadPresetBtnCmd(*args):
+    path = mc.fileDialog2(fileFilter="LookDev Presets (*.json)", fileMode=1)
+    if path:
+        loadLookDevPreset(path[0])
+
+# Forgets everything the tool knows about the set up in the current scene, for example before a new scene is opened.
+def resetLookDevState():
+    lookDevNodes.clear()
+    basePose.clear()
+    boundValues.clear()
+    createdOptions.clear()
+    controlValues.clear()
+
+
+# This portion of the script sets up look development scenes for many assets at once, without the GUI.
+# The set up is described by a spec in the same form as a preset: the parts to create, the HDR image and the control
+# values.  Presets saved from the GUI can be used as specs.
+defaultLookDevSpec = {"version": presetVersion,
+                      "options": {"threeLight": True, "hdrLight": False, "camCreate": True, "bdCreate": True},
+                      "hdrPath": "", "hdrPreview": False, "poses": {}, "controls": {}}
+
+# Sets up and saves a chunk of assets in a worker.  Each task is (index, asset path, output path).  With autoPlace set, the
+# set up is fitted to the geometry in each asset, and the transforms saved in the spec are left out.  Returns, for each
+# asset, (index, output path, render job, load seconds, setup seconds, save seconds, error).  The render job is a command line
+# that renders the saved scene through the set up's camera.  An asset that fails does not stop the others.  Its render
+# job is None, the stages it did not finish take no time, and the error is the message of what went wrong.  The error
+# is None for assets that were set up.
+def processLookDevChunk(tasks, spec, fileType="mayaAscii", autoPlace=False):
+    import timeit
+    results = []
+    for index, assetPath, outputPath in tasks:
+        times = [0.0, 0.0, 0.0]
+        try:
+            startTime = timeit.default_timer()
+            mc.file(assetPath, open=True, force=True)
+            resetLookDevState()
+            times[0] = timeit.default_timer() - startTime
+            startTime = timeit.default_timer()
+            if autoPlace:
+                restoreLookDevState(dict(spec, poses={}, placement=boundsPlacement(assetBounds())))
+            else:
+                restoreLookDevState(spec)
+            times[1] = timeit.default_timer() - startTime
+            startTime = timeit.default_timer()
+            mc.file(rename=outputPath)
+            mc.file(save=True, type=fileType)
+            times[2] = timeit.default_timer() - startTime
+        except Exception as error:
+            results.append((index, outputPath, None) + tuple(times) + ("%s: %s" % (assetPath, error),))
+            continue
+        camera = lookDevNodes.get("Render_Cam") or "persp"
+        job = 'Render -r mr -cam "%s" -rd "%s" "%s"' % (camera, os.path.dirname(outputPath), outputPath)
+        results.append((index, outputPath, job) + tuple(times) + (None,))
+    return results
+
+# Returns the output path of each asset.  The folders the assets are in are mirrored in the output folder, below the
+# folder they all share, so assets with the same file name in different folders do not overwrite each other.
+def batchOutputPaths(assetPaths, outputFolder, extension=".ma"):
+    folders = [os.path.dirname(os.path.abspath(assetPath)) for assetPath in assetPaths]
+    common = os.path.commonprefix([folder.split(os.sep) for folder in folders])
+    root = os.sep.join(common) or os.sep
+    return [os.path.normpath(os.path.join(outputFolder, os.path.relpath(folder, root), "%s_lookDev%s"
+                                          % (os.path.splitext(os.path.basename(assetPath))[0], extension)))
+            for folder, assetPath in zip(folders, assetPaths)]
+
+# Opens each asset file, builds the set up described by the spec in it and saves it as a new scene in the output
+# folder.  The spec is a dictionary or the path of a preset file, and defaults to three-point lighting, a camera and
+# a backdrop.  The assets are split across worker processes started by runWorkers.  Run it from mayapy or Maya, or set
+# useStandIn to build against mayaStandIn.  With renderJobs set, a renderJobs.txt file with one render command per
+# scene is written to the output folder too.  With autoPlace set, the lights, camera and backdrop are fitted to each
+# asset's geometry, so no asset needs adjusting by hand.  Prints assets/sec and the time spent loading, setting up and
+# saving, and returns the results of processLookDevChunk for every asset, in the order of assetPaths and without the
+# index.  Assets that fail keep their errors in the results and are left out of the render jobs.
+def createLookDevBatch(assetPaths, outputFolder, spec=None, workers=None, useStandIn=False, fileType="mayaAscii",
+                       renderJobs=False, autoPlace=False):
+    import multiprocessing
+    import timeit
+    if isinstance(spec, basestring):
+        with open(spec) as presetFile:
+            spec = json.load(presetFile)
+    spec = spec or defaultLookDevSpec
+    extension = ".mb" if fileType == "mayaBinary" else ".ma"
+    tasks = zip(range(len(assetPaths)), assetPaths, batchOutputPaths(assetPaths, outputFolder, extension))
+    for outputPath in set(task[2] for task in tasks):
+        if not os.path.isdir(os.path.dirname(outputPath)):
+            os.makedirs(os.path.dirname(outputPath))
+    workers = workers or multiprocessing.cpu_count()
+    startTime = timeit.default_timer()
+    # Splits the assets into one chunk per worker, so each worker only starts up once.
+    chunks = [chunk for chunk in [tasks[index::workers] for index in range(workers)] if chunk]
+    chunkResults = runWorkers("lookDev_environment", "processLookDevChunk", chunks, useStandIn, spec=spec,
+                              fileType=fileType, autoPlace=autoPlace)
+    elapsed = timeit.default_timer() - startTime
+    # The chunks interleave the assets, so the results are put back in the order they were given by their task index.
+    results = [result[1:] for result in sorted(result for chunk in chunkResults for result in chunk)]
+    if renderJobs:
+        with open(os.path.join(outputFolder, "renderJobs.txt"), "w") as jobFile:
+            jobFile.writelines(result[1] + "\n" for result in results if result[1] is not None)
+    count = max(len(results), 1)
+    print "%d assets with %d workers: %.1f assets/sec" % (len(results), workers, len(results)/elapsed)
+    failed = [result[5] for result in results if result[5] is not None]
+    if failed:
+        print "    %d assets failed:" % len(failed)
+        for error in failed:
+            print "        " + error
+    for index, stage in ((2, "load"), (3, "setup"), (4, "save")):
+        total = sum(result[index] for result in results)
+        print "    %s: %.3f sec total, %.2f ms per asset" % (stage, total, total/count*1000.0)
+    return results
+
 # Function to reset the GUI.  Does not clear scene.
-def resetUI():
+def resetUI(*args):
     lookDevWindow()
 # Function to close the GUI.
-def closeUI():
+def closeUI(*args):
     mc.deleteUI("lookDev_win")    
 
-# Calls the showWindow function.
-lookDevWindow()
\ No newline at end of file
+# Opens the GUI.
+def main():
+    lookDevWindow()
+
+# Calls the showWindow function when the script is run directly, for example from the script editor.  Importing it does not.
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,630 @@
+import sys
+import math
+import uuid
+import types
+import fnmatch
+
+'''
+This module provides a stand-in for maya.cmds so the tools can be run and timed without Maya.
+Every command called on the stand-in is counted.  The commands the tools use to build things (createNode, the poly
+primitives, joint, select, group, parent, scale, setAttr, connectAttr, setKeyframe and so on) also keep a small
+in-memory scene, so the tools can read back what they built.  Commands it does not simulate just return None.
+The few API classes the tools use to write animation curves are stood in for too, against the same scene.
+
+To run one of the tools headless:
+    import mayaStandIn
+    cmds = mayaStandIn.install()
+    import oscillate
+'''
+
+# The node types ls lists as geometry.
+geometryTypes = ("mesh", "nurbsSurface", "nurbsCurve", "subdiv")
+
+# Creates the recording stand-in class.  Any command name can be called on it.
+class EN_RecordingCmds(object):
+    # Initializes the call counters, the scene message callbacks and the in-memory scene.
+    def __init__(self):
+        self.callCounts = {}
+        self.sceneCallbacks = []
+        self.resetScene()
+
+    # Empties the in-memory scene.  Call counts are kept.
+    def resetScene(self):
+        # Node types, keyed by node name.
+        self.nodes = {}
+        # UUIDs of the nodes, keyed by node name, and the other way round.
+        self.uuids = {}
+        self.nodesByUuid = {}
+        # Parent of each DAG node, keyed by node name.  Top level nodes have None.
+        self.parents = {}
+        # World space positions of joints.
+        self.worldPositions = {}
+        self.attrs = {}
+        self.selection = []
+        self.connections = {}
+        self.keys = {}
+        self.sceneName = ""
+        self.nameCounters = {}
+        # Commands passed to evalDeferred, waiting for runDeferred.
+        self.deferred = []
+
+    # Returns a recording function for any command that has not been looked up yet.
+    def __getattr__(self, name):
+        # Leaves private and special names alone so copy/pickle still behave.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        # Looks for a handler that simulates the command.  Commands without a handler just return None.
+        handler = getattr(type(self), "cmd_" + name, None)
+        counts = self.callCounts
+        def command(*args, **kwargs):
+            counts[name] = counts.get(name, 0) + 1
+            if handler is not None:
+                return handler(self, *args, **kwargs)
+        # Stores the function on the instance so later calls skip __getattr__.
+        self.__dict__[name] = command
+        return command
+
+    # Returns the total number of commands called since the last reset.
+    def totalCalls(self):
+        return sum(self.callCounts.values())
+
+    # Clears the call counters.
+    def resetCounts(self):
+        self.callCounts.clear()
+
+    # Queues a command to run when Maya is next idle.  Call runDeferred to run the queue.
+    def cmd_evalDeferred(self, command, **kwargs):
+        self.deferred.append(command)
+
+    # Runs the commands queued by evalDeferred, as Maya would on its next idle cycle.
+    def runDeferred(self):
+        deferred, self.deferred = self.deferred, []
+        for command in deferred:
+            command()
+
+    # Stores an attribute value.  Multiple values (translate, scale) are stored as a tuple.
+    def cmd_setAttr(self, plug, *values, **kwargs):
+        if len(values) == 1:
+            self.attrs[plug] = values[0]
+        else:
+            self.attrs[plug] = tuple(values)
+
+    # Adds an attribute to a node, storing its default value.
+    def cmd_addAttr(self, node, **kwargs):
+        self.attrs["%s.%s" % (node, kwargs.get("longName") or kwargs.get("ln"))] = kwargs.get("defaultValue", 0)
+
+    # Removes an attribute from a node.
+    def cmd_deleteAttr(self, plug, **kwargs):
+        self.attrs.pop(plug, None)
+
+    # Returns a stored attribute value, or 0 if the attribute was never set.
+    def cmd_getAttr(self, plug, **kwargs):
+        return self.attrs.get(plug, 0)
+
+    # Returns the current selection, the nodes of a type, the geometry shapes, or the given names or UUIDs that exist.
+    # With uuid set it returns the UUIDs of the given nodes instead.  Names in the stand-in are unique, so long names
+    # are the same as short names.  Names with a "*" are matched against the nodes, or against the plugs of the nodes
+    # if they have a ".", and objectsOnly returns the nodes of the matched plugs.
+    def cmd_ls(self, *args, **kwargs):
+        if kwargs.get("sl") or kwargs.get("selection"):
+            return list(self.selection)
+        if kwargs.get("geometry") or kwargs.get("g"):
+            return sorted(node for node, current in self.nodes.items() if current in geometryTypes)
+        nodeType = kwargs.get("type")
+        if nodeType is not None:
+            return [node for node, current in self.nodes.items() if current == nodeType]
+        if kwargs.get("uuid"):
+            return [self.uuids[name] for name in self.targets(args) if name in self.uuids]
+        names = []
+        for name in self.targets(args):
+            if "*" in name:
+                plugs = [plug for plug in self.attrs if plug.split(".")[0] in self.nodes] if "." in name else self.nodes
+                matches = sorted(fnmatch.filter(plugs, name))
+                if kwargs.get("objectsOnly") or kwargs.get("o"):
+                    matches = [match.split(".")[0] for match in matches]
+                names.extend(matches)
+            elif name in self.nodesByUuid:
+                names.append(self.nodesByUuid[name])
+            elif self.cmd_objExists(name):
+                names.append(name)
+        if kwargs.get("assemblies"):
+            names = [name for name in names if name in self.parents and self.parents[name] is None]
+        return names
+
+    # Returns a name that is not used yet.  A trailing "#" is replaced with the first free number.
+    def uniqueName(self, name):
+        if not name.endswith("#") and name not in self.nodes:
+            return name
+        base = name.rstrip("#")
+        # Starts from the last number given out for the base name, so naming many copies stays fast.
+        index = self.nameCounters.get(base, 1)
+        while base + str(index) in self.nodes:
+            index += 1
+        self.nameCounters[base] = index
+        return base + str(index)
+
+    # Adds a node to the scene and returns its name.  DAG nodes are given a parent, which may be None.
+    def addNode(self, name, nodeType, parent=None, dag=False):
+        name = self.uniqueName(name)
+        self.nodes[name] = nodeType
+        self.uuids[name] = str(uuid.uuid4()).upper()
+        self.nodesByUuid[self.uuids[name]] = name
+        if dag:
+            self.parents[name] = parent
+        return name
+
+    # Returns the selection, or the given objects if there are any.  Lists of names are flattened.
+    def targets(self, args):
+        names = []
+        for arg in args:
+            if isinstance(arg, (list, tuple)):
+                names.extend(arg)
+            else:
+                names.append(arg)
+        return names or list(self.selection)
+
+    # Creates a node of the given type.  A trailing "#" in the name is replaced with a number to keep it unique.
+    def cmd_createNode(self, nodeType, name=None, **kwargs):
+        name = name or kwargs.get("n") or nodeType + "#"
+        parent = kwargs.get("parent", kwargs.get("p"))
+        dag = nodeType in ("transform", "joint") or parent is not None
+        return self.addNode(name, nodeType, parent, dag)
+
+    # Creates a transform and its shape for a poly primitive command and selects the transform.
+    # Returns the transform and the creation node, like the real commands.
+    def createPrimitive(self, shapeName, kwargs):
+        transform = self.addNode(kwargs.get("name") or kwargs.get("n") or "p%s#" % shapeName, "transform", None, True)
+        self.addNode(transform + "Shape", "mesh", transform, True)
+        creator = self.addNode("poly%s#" % shapeName, "poly%s" % shapeName)
+        self.selection = [transform]
+        return [transform, creator]
+
+    def cmd_polyCube(self, **kwargs):
+        return self.createPrimitive("Cube", kwargs)
+
+    def cmd_polyCone(self, **kwargs):
+        return self.createPrimitive("Cone", kwargs)
+
+    def cmd_polyCylinder(self, **kwargs):
+        return self.createPrimitive("Cylinder", kwargs)
+
+    def cmd_polySphere(self, **kwargs):
+        return self.createPrimitive("Sphere", kwargs)
+
+    # Creates a directional light's transform and shape and selects the transform.  Returns the shape.
+    def cmd_directionalLight(self, **kwargs):
+        transform = self.addNode(kwargs.get("name") or kwargs.get("n") or "directionalLight#", "transform", None, True)
+        shape = self.addNode(transform + "Shape", "directionalLight", transform, True)
+        self.selection = [transform]
+        return shape
+
+    # Creates a camera and selects it.  Like Maya, a number is added to the name.  Returns the transform and shape.
+    def cmd_camera(self, **kwargs):
+        transform = self.addNode((kwargs.get("name") or kwargs.get("n") or "camera") + "#", "transform", None, True)
+        shape = self.addNode(transform + "Shape", "camera", transform, True)
+        self.selection = [transform]
+        return [transform, shape]
+
+    # Creates a NURBS plane and selects it.  Returns the transform and the creation node.
+    def cmd_nurbsPlane(self, **kwargs):
+        transform = self.addNode(kwargs.get("name") or kwargs.get("n") or "nurbsPlane#", "transform", None, True)
+        self.addNode(transform + "Shape", "nurbsSurface", transform, True)
+        creator = self.addNode("makeNurbPlane#", "makeNurbPlane")
+        self.selection = [transform]
+        return [transform, creator]
+
+    # Creates a joint under the selected joint or transform and selects it, or edits an existing joint's position.
+    # Positions are in world space unless relative is set, in which case they are relative to the parent.
+    def cmd_joint(self, *args, **kwargs):
+        position = kwargs.get("position", kwargs.get("p"))
+        if kwargs.get("edit") or kwargs.get("e"):
+            if position is not None:
+                self.worldPositions[args[0]] = tuple(position)
+            return None
+        parent = None
+        if self.selection and self.nodes.get(self.selection[0]) in ("joint", "transform"):
+            parent = self.selection[0]
+        joint = self.addNode(kwargs.get("name") or kwargs.get("n") or "joint#", "joint", parent, True)
+        position = tuple(position or (0.0, 0.0, 0.0))
+        if (kwargs.get("relative") or kwargs.get("r")) and parent in self.worldPositions:
+            position = tuple(a + b for a, b in zip(self.worldPositions[parent], position))
+        self.worldPositions[joint] = position
+        self.selection = [joint]
+        return joint
+
+    # Changes the selection.  Selecting everything walks every DAG node in the scene, like Maya does.
+    def cmd_select(self, *args, **kwargs):
+        if kwargs.get("clear") or kwargs.get("cl"):
+            self.selection = []
+        elif kwargs.get("all"):
+            self.selection = [node for node in self.parents]
+        elif kwargs.get("add"):
+            self.selection.extend(self.targets(args))
+        else:
+            self.selection = self.targets(args) if args else []
+
+    # Groups the selection, or the given objects, under a new transform and selects it.
+    def cmd_group(self, *args, **kwargs):
+        members = [] if kwargs.get("empty") or kwargs.get("em") else self.targets(args)
+        group = self.addNode(kwargs.get("name") or kwargs.get("n") or "group#", "transform",
+                             kwargs.get("parent", kwargs.get("p")), True)
+        memberSet = set(members)
+        # Only moves the members whose parent is not also being grouped, so hierarchies stay intact.
+        for member in members:
+            if self.parents.get(member) not in memberSet:
+                self.parents[member] = group
+        self.selection = [group]
+        return group
+
+    # Parents the objects under the last object given, or to the world.
+    def cmd_parent(self, *args, **kwargs):
+        names = self.targets(args)
+        if kwargs.get("world") or kwargs.get("w"):
+            parent = None
+        else:
+            parent = names.pop()
+        for name in names:
+            self.parents[name] = parent
+        return names
+
+    # Sets the scale of the selection, or of the given objects.
+    def cmd_scale(self, x, y, z, *args, **kwargs):
+        for target in self.targets(args):
+            self.attrs[target + ".scale"] = (x, y, z)
+
+    # Deletes the given objects, or the selection, together with their descendants.
+    def cmd_delete(self, *args, **kwargs):
+        doomed = set(self.targets(args))
+        # Collects the descendants of the deleted nodes.
+        changed = True
+        while changed:
+            changed = False
+            for node, parent in self.parents.items():
+                if parent in doomed and node not in doomed:
+                    doomed.add(node)
+                    changed = True
+        for node in doomed:
+            self.nodesByUuid.pop(self.uuids.pop(node, None), None)
+            self.nodes.pop(node, None)
+            self.parents.pop(node, None)
+            self.worldPositions.pop(node, None)
+        for plug in [plug for plug in self.attrs if plug.split(".")[0] in doomed]:
+            del self.attrs[plug]
+        self.selection = [node for node in self.selection if node not in doomed]
+
+    # Returns the children, descendants or parent of a node, optionally only those of one type.
+    def cmd_listRelatives(self, node, **kwargs):
+        if kwargs.get("parent") or kwargs.get("p"):
+            parent = self.parents.get(node)
+            return [parent] if parent else None
+        if kwargs.get("allDescendents") or kwargs.get("ad"):
+            result = self.descendants(node)
+        else:
+            result = [child for child, parent in self.parents.items() if parent == node]
+        nodeType = kwargs.get("type")
+        if nodeType is not None:
+            result = [child for child in result if self.nodes.get(child) == nodeType]
+        return result or None
+
+    # Returns the world space bounding box of the given objects, or the selection, and their descendants as
+    # [xmin, ymin, zmin, xmax, ymax, zmax].  The stand-in only knows node positions, so the box is around those.
+    def cmd_exactWorldBoundingBox(self, *args, **kwargs):
+        nodes = set()
+        for node in self.targets(args):
+            nodes.update([node] + self.descendants(node))
+        points = [self.worldPositions[node] for node in nodes if node in self.worldPositions]
+        if not points:
+            return [0.0]*6
+        return [min(point[axis] for point in points) for axis in range(3)] + \
+               [max(point[axis] for point in points) for axis in range(3)]
+
+    # Returns every descendant of a node, parents before their children.
+    def descendants(self, node):
+        children = {}
+        for child, parent in self.parents.items():
+            children.setdefault(parent, []).append(child)
+        result = []
+        pending = [node]
+        while pending:
+            current = sorted(children.get(pending.pop(0), []))
+            result.extend(current)
+            pending.extend(current)
+        return result
+
+    # Copies the given objects, or the selection, together with their descendants and selects the copies.
+    # Copied nodes are given new unique names.  Returns the copies of the given objects followed by the copies of
+    # their descendants, or only the former with returnRootsOnly.
+    def cmd_duplicate(self, *args, **kwargs):
+        roots = []
+        copies = []
+        for target in self.targets(args):
+            names = {}
+            for node in [target] + self.descendants(target):
+                parent = self.parents.get(node)
+                names[node] = self.addNode(node, self.nodes[node], names.get(parent, parent), node in self.parents)
+                if node in self.worldPositions:
+                    self.worldPositions[names[node]] = self.worldPositions[node]
+                copies.append(names[node])
+            roots.append(names[target])
+        self.selection = list(roots)
+        if kwargs.get("returnRootsOnly") or kwargs.get("rr"):
+            return roots
+        return roots + [copy for copy in copies if copy not in roots]
+
+    # Renames a node and returns its new name.
+    def cmd_rename(self, node, newName, **kwargs):
+        newName = self.uniqueName(newName)
+        self.nodes[newName] = self.nodes.pop(node)
+        self.uuids[newName] = self.uuids.pop(node)
+        self.nodesByUuid[self.uuids[newName]] = newName
+        if node in self.parents:
+            self.parents[newName] = self.parents.pop(node)
+        if node in self.worldPositions:
+            self.worldPositions[newName] = self.worldPositions.pop(node)
+        for child, parent in self.parents.items():
+            if parent == node:
+                self.parents[child] = newName
+        self.selection = [newName if name == node else name for name in self.selection]
+        return newName
+
+    # Records a connection.  Each destination plug has one source.
+    def cmd_connectAttr(self, source, destination, **kwargs):
+        self.connections[destination] = source
+
+    # Records a key.  Keys are stored per curve or plug as [value, inAngle, outAngle, inTangentType, outTangentType].
+    def cmd_setKeyframe(self, target, time=0, value=0.0, **kwargs):
+        self.keys.setdefault(target, {})[time] = [value, 0.0, 0.0, kwargs.get("inTangentType", "auto"),
+                                                  kwargs.get("outTangentType", "auto")]
+
+    # Records tangent angles and types for the keys in the given time range.
+    def cmd_keyTangent(self, target, time=(0, 0), **kwargs):
+        if kwargs.get("edit") or kwargs.get("e"):
+            for keyTime, key in self.keys.get(target, {}).items():
+                if time[0] <= keyTime <= time[1]:
+                    key[1] = kwargs.get("inAngle", key[1])
+                    key[2] = kwargs.get("outAngle", key[2])
+                    key[3] = kwargs.get("inTangentType", key[3])
+                    key[4] = kwargs.get("outTangentType", key[4])
+
+    # Starts a new scene, opens, renames, saves, exports or imports it.  Saved scenes are written as one line per node.
+    # Exporting the selection writes the selected nodes and their descendants.
+    def cmd_file(self, *args, **kwargs):
+        if kwargs.get("new"):
+            self.resetScene()
+            return ""
+        if kwargs.get("exportSelected") or kwargs.get("es"):
+            exported = set()
+            for node in self.selection:
+                exported.update([node] + self.descendants(node))
+            self.writeScene(args[0], exported)
+            return args[0]
+        if kwargs.get("i") or kwargs.get("import"):
+            return self.readScene(args[0])
+        if kwargs.get("open") or kwargs.get("o"):
+            self.resetScene()
+            self.readScene(args[0])
+            self.sceneName = args[0]
+            return self.sceneName
+        if kwargs.get("rename") or kwargs.get("rn"):
+            self.sceneName = kwargs.get("rename") or kwargs.get("rn")
+            return self.sceneName
+        if kwargs.get("save") or kwargs.get("s"):
+            for message, callback, clientData in list(self.sceneCallbacks):
+                if message == MSceneMessage.kBeforeSave:
+                    callback(clientData)
+            self.writeScene(self.sceneName, self.nodes)
+            return self.sceneName
+        return self.sceneName
+
+    # Writes the given nodes to a file as "type name parent x y z" lines.
+    def writeScene(self, path, nodes):
+        with open(path, "w") as sceneFile:
+            for node in sorted(nodes):
+                position = self.worldPositions.get(node, (0.0, 0.0, 0.0))
+                sceneFile.write("%s %s %s %g %g %g\n" % ((self.nodes[node], node, self.parents.get(node)) + tuple(position)))
+
+    # Adds the nodes written by writeScene to the scene and returns their new names.  Nodes whose parent is not in
+    # the file are added at the top of the scene.
+    def readScene(self, path):
+        with open(path) as sceneFile:
+            records = [line.split() for line in sceneFile if line.strip()]
+        # Adds parents before their children, so children can be given their parent's new name.
+        parents = dict((record[1], record[2]) for record in records)
+        depth = lambda name: 1 + depth(parents[name]) if parents.get(name) in parents else 0
+        names = {}
+        for nodeType, name, parent, x, y, z in sorted(records, key=lambda record: depth(record[1])):
+            names[name] = self.addNode(name, nodeType, names.get(parent), parent != "None" or nodeType in ("transform", "joint"))
+            # Joints always have a position.  Other nodes only keep one if it is not the origin, so a group does not
+            # add the origin to the bounding box of the geometry under it.
+            if nodeType == "joint" or (x, y, z) != ("0", "0", "0"):
+                self.worldPositions[names[name]] = (float(x), float(y), float(z))
+        return [names[record[1]] for record in records]
+
+    # Reports whether a node exists or anything has been stored under the given name.
+    def cmd_objExists(self, name):
+        if name in self.nodes:
+            return True
+        prefix = name + "."
+        for plug in self.attrs:
+            if plug == name or plug.startswith(prefix):
+                return True
+        return False
+
+
+# This portion of the script stands in for the few classes of the Maya Python API 2.0 the tools use to write animation
+# curves.  They read and write the scene of the stand-in that was installed last.  Angles are in degrees in the UI and
+# radians in the API, and distances are in centimetres in both, as in a default Maya scene.
+apiCmds = None
+
+# Function set type constants.
+class MFn(object):
+    kAnimCurve = 7
+
+# A node, by name.
+class MObject(object):
+    def __init__(self, name=None):
+        self.name = name
+
+    def isNull(self):
+        return self.name is None
+
+    def hasFn(self, fnType):
+        return fnType == MFn.kAnimCurve and apiCmds.nodes.get(self.name, "").startswith("animCurve")
+
+# A plug, by name.  A null plug has no name.
+class MPlug(object):
+    def __init__(self, name=None):
+        self.name = name
+
+    @property
+    def isNull(self):
+        return self.name is None
+
+    def node(self):
+        return MObject(self.name.split(".")[0])
+
+    # Returns the plug connected into this one, or a null plug.
+    def source(self):
+        return MPlug(apiCmds.connections.get(self.name))
+
+# A list of nodes or plugs, by name.
+class MSelectionList(object):
+    def __init__(self):
+        self.names = []
+
+    def add(self, name):
+        self.names.append(name)
+        return self
+
+    def getPlug(self, index):
+        return MPlug(self.names[index])
+
+    def getDependNode(self, index):
+        return MObject(self.names[index])
+
+# A time in frames.
+class MTime(object):
+    def __init__(self, value=0.0, unit=None):
+        self.value = value
+
+    @staticmethod
+    def uiUnit():
+        return None
+
+# An angle in radians.
+class MAngle(object):
+    def __init__(self, value=0.0, unit=None):
+        self.value = value
+
+    def asDegrees(self):
+        return math.degrees(self.value)
+
+    @staticmethod
+    def uiToInternal(value):
+        return math.radians(value)
+
+# Distances are in centimetres in the UI and in the API.
+class MDistance(object):
+    @staticmethod
+    def uiToInternal(value):
+        return value
+
+# Writes keys to the animation curves of the stand-in.  Keys are stored as setKeyframe and keyTangent store them, in
+# UI units.  Each addKeys call is counted like a command, since it writes a whole curve at once.
+class MFnAnimCurve(object):
+    kAnimCurveTA = 0
+    kAnimCurveTL = 1
+    kAnimCurveTU = 3
+    kTangentFixed = 1
+    kTangentLinear = 2
+    tangentNames = {kTangentFixed: "fixed", kTangentLinear: "linear"}
+
+    def __init__(self, node=None):
+        self.name = None if node is None else node.name
+
+    def setObject(self, node):
+        self.name = node.name
+
+    @property
+    def animCurveType(self):
+        return {"animCurveTA": self.kAnimCurveTA, "animCurveTL": self.kAnimCurveTL}.get(apiCmds.nodes[self.name],
+                                                                                      self.kAnimCurveTU)
+
+    # Returns the curve type for an attribute from its name.
+    def timedAnimCurveTypeForPlug(self, plug):
+        attribute = plug.name.split(".")[-1]
+        if attribute.startswith("rotate"):
+            return self.kAnimCurveTA
+        if attribute.startswith("translate"):
+            return self.kAnimCurveTL
+        return self.kAnimCurveTU
+
+    # Converts a value in internal units back to UI units.
+    def toUi(self, value):
+        return math.degrees(value) if self.animCurveType == self.kAnimCurveTA else value
+
+    # Adds keys at the given times, replacing the keys already in their range.
+    def addKeys(self, times, values, tangentInType=kTangentFixed, tangentOutType=kTangentFixed,
+                keepExistingKeys=False, change=None):
+        apiCmds.callCounts["addKeys"] = apiCmds.callCounts.get("addKeys", 0) + 1
+        keys = apiCmds.keys.setdefault(self.name, {})
+        frames = [time.value for time in times]
+        if not keepExistingKeys and frames:
+            for frame in [frame for frame in keys if min(frames) <= frame <= max(frames)]:
+                del keys[frame]
+        for frame, value in zip(frames, values):
+            keys[frame] = [self.toUi(value), 0.0, 0.0, self.tangentNames[tangentInType],
+                           self.tangentNames[tangentOutType]]
+
+    # Returns the index of the key at a time, or None.
+    def find(self, time):
+        frames = sorted(apiCmds.keys.get(self.name, {}))
+        return frames.index(time.value) if time.value in frames else None
+
+    # Sets the in or out tangent angle of the key at an index.
+    def setAngle(self, index, angle, isInTangent, change=None):
+        keys = apiCmds.keys[self.name]
+        keys[sorted(keys)[index]][1 if isInTangent else 2] = angle.asDegrees()
+
+
+# Scene message callbacks.  The stand-in calls the before save callbacks when a scene is saved.
+class MSceneMessage(object):
+    kBeforeSave = 7
+
+    @staticmethod
+    def addCallback(message, callback, clientData=None):
+        apiCmds.sceneCallbacks.append((message, callback, clientData))
+        return len(apiCmds.sceneCallbacks) - 1
+
+
+# Registers a stand-in under maya.cmds and maya.mel so "import maya.cmds as mc" picks it up.  The API classes above
+# are registered under maya.api.OpenMaya and maya.api.OpenMayaAnim.
+def install(cmds=None):
+    global apiCmds
+    if cmds is None:
+        cmds = EN_RecordingCmds()
+    apiCmds = cmds
+    # Creates the maya package and the mel module.
+    maya = types.ModuleType("maya")
+    mel = types.ModuleType("maya.mel")
+    # Routes mel.eval through the stand-in so it is counted like any other command.
+    mel.eval = lambda *args, **kwargs: cmds.eval(*args, **kwargs)
+    maya.cmds = cmds
+    maya.mel = mel
+    # Creates the API modules.
+    api = types.ModuleType("maya.api")
+    openMaya = types.ModuleType("maya.api.OpenMaya")
+    openMayaAnim = types.ModuleType("maya.api.OpenMayaAnim")
+    for apiClass in (MFn, MObject, MPlug, MSelectionList, MTime, MAngle, MDistance, MSceneMessage):
+        setattr(openMaya, apiClass.__name__, apiClass)
+    openMayaAnim.MFnAnimCurve = MFnAnimCurve
+    api.OpenMaya = openMaya
+    api.OpenMayaAnim = openMayaAnim
+    maya.api = api
+    sys.modules["maya"] = maya
+    sys.modules["maya.cmds"] = cmds
+    sys.modules["maya.mel"] = mel
+    sys.modules["maya.api"] = api
+    sys.modules["maya.api.OpenMaya"] = openMaya
+    sys.modules["maya.api.OpenMayaAnim"] = openMayaAnim
+    return cmds
@@ -1,126 +1,20 @@
-import maya.cmds as mc
+# The base window class is shared with the other tools.  Maya is only imported the first time a command is used.
+from toolCore import EN_BaseUIWindow, lazyImport
 import math
+import bisect
+import random
+import collections
+mc = lazyImport("maya.cmds")
+# The API is used to write baked curves, which takes one call per curve instead of one command per key.
+om = lazyImport("maya.api.OpenMaya")
+oma = lazyImport("maya.api.OpenMayaAnim")
+# NumPy is optional.  When it is available the batch evaluator runs as one vectorized pass.  It is only imported when used.
+numpy = lazyImport("numpy", optional=True)
 
 # This script allows the user to create a polygon primitive and then specify how the object will oscillate.
 
 
 
-# Creates the custom window class called EN_BaseUIWindow.
-class EN_BaseUIWindow(object):
-    @classmethod
-    def showUI(cls):
-        win=cls()
-        win.create()
-        return win
-    # Initializes the handle, title, and size attributes for the window class.  
-    def __init__(self):
-        self.window = "en_baseuiwindow"
-        self.title = "Base GUI Window"
-        self.size = (600, 400)
-        self.supportsToolAction = False
-        self.actionName = "Create and Close"
-    # Function to draw the window
-    def create(self):
-        # Checks to see if this window has already been created.  If it has, it deletes the window.
-        if mc.window(self.window, exists=True):
-            mc.deleteUI(self.window, window=True)
-        # Creates the window using the already initialized attributes as well as the menuBar attribute from below.
-        self.window = mc.window(self.window, title=self.title, wh=self.size, menuBar = True)
-        # Establishes themain layout of the GUI.
-        self.mainForm = mc.formLayout(numberOfDivisions=100)
-        # Calls the cmmonMenu function created below.  
-        self.commonMenu()
-        # Calls the button creation function that is created below.
-        self.commonButtons()
-        # Creates a central pane in the display.
-        self.optionsBorder = mc.tabLayout(scrollable=True, tabsVisible = False, height = 1)
-        # Nests the pane within the main form layout.
-        mc.formLayout(self.mainForm, e=True, attachForm = (
-            # Pins the top edge to the top of the UI with a padding of 0 pixels.
-            [self.optionsBorder, 'top', 0], 
-            # Pins the left edge of pane to the left of the UI with a padding of 2 pixels.
-            [self.optionsBorder, 'left', 2],
-            # Pins the right edge of the pane to the right of the UI with a padding of 2 pixels.
-            [self.optionsBorder, 'right', 2]),
-            # Pins the bottom edge of the pane to the top edge of the buttons.
-            attachControl = ([self.optionsBorder, 'bottom', 5, self.createBtn]))
-        # Allows the panel to scale with the main UI.
-        self.optionsForm = mc.formLayout(numberOfDivisions=100)
-        # Calls the display option function from below.  
-        self.displayOptions()
-        # Shows (displays) the window.
-        mc.showWindow()
-    
-    # Adds menu items to the window.
-    def commonMenu(self):
-        # Creates a drop down menu labeled "Edit".
-        self.editMenu = mc.menu(label="Edit")
-        # Creates the option to either save settings or reset the settings.  This is in the drop down menu "Edit".
-        self.editMenuSave = mc.menuItem(label = "Save Settings")
-        self.editMenuReset = mc.menuItem(label = "Reset Settings")
-        # Creates another drop down menu for the user to get help.  Labels it "Help".
-        self.helpMenu = mc.menu(label = "Help")
-        # Creates an option to get help on the menu/script.  
-        self.helpMenuItem = mc.menuItem(label = "Help on %s" %self.title)
-
-    # Function for the creation of the command buttons.
-    def commonButtons(self):
-        # Creates a button size parameter with a padding of 18 pixels.  The width is the size of the UI width minus the padding
-        # divided by three.  The height is 26 pixels.  
-        self.commonBtnSize = ((self.size[0]-18)/3, 26)
-        # Establishes the layout of the buttons.  Sets them into a row, with three buttons in the row.  Also establishes their size.
-        
-        # Creates the "create and close" button.
-        self.actionBtn = mc.button(label = self.actionName, height = self.commonBtnSize[1], command = self.actionBtnCmd)
-        # Creates the "create" button.
-        self.createBtn = mc.button(label = "Create", height = self.commonBtnSize[1], command = self.createBtnCmd)
-        # Creates the "close" button.
-        self.closeBtn = mc.button(label = "Close", height = self.commonBtnSize[1], command = self.closeBtnCmd)
-        # Dictates how the buttons scale when the user scales the UI.  
-            # First sets the main form to edit mode.
-        mc.formLayout(self.mainForm, e=True, attachForm=(
-            # Then takes each button, specifies the edge to adjust, and then specifies the value to adjust by.
-            # Pins the action button to the left of the UI with a padding of 5 pixels.
-            [self.actionBtn, 'left', 5],
-            # Pins the action button to the bottom of the UI with a padding of 5 pixels.
-            [self.actionBtn, 'bottom', 5],
-            # Pins the create button to the bottom of the UI with a padding of 5 pixels.
-            [self.createBtn, 'bottom', 5],
-            # Pins the close botton to the bottom of the UI with a padding of 5 pixels.
-            [self.closeBtn, 'bottom', 5],
-            # Pins the close button to the right of the UI with a padding of 5 pixels. 
-            [self.closeBtn, 'right', 5]),
-            # Pins buttons relative to the coordinates specified in the create(self) function according to the
-            # numberOfDivisions flag in the mainForm command.
-            attachPosition = ([self.actionBtn, 'right', 1, 33], [self.closeBtn, 'left', 0, 67]),
-            # Pins the middle button to the outer two buttons.  Allows it to scale along with the other two buttons.
-            attachControl = ([self.createBtn, 'left', 4, self.actionBtn], [self.createBtn, 'right', 4, self.closeBtn]),
-            # Makes sure that the the top edges of the buttons scale according to the above parameters.  
-            attachNone = ([self.actionBtn, 'top'], [self.createBtn, 'top'], [self.closeBtn, 'top']))
-        
-    # Function for the help menu goes here.  This will load a help text file explaining the options of the GUI.  
-    
-    # Place holder commands for the menu items
-    def editMenuSaveCmd(self, *args): 
-        pass
-    def editMenuResetCmd(self, *args): 
-        pass
-
-    # Creates function for the create and close button.  When user clicks button, action happens and UI closes.
-    def actionBtnCmd(self, *args):
-        self.createBtnCmd()
-        self.closeBtnCmd()
-    # Creates a function for the create button.  When user clicks button, UI creates something.
-    def createBtnCmd(self, *args):
-        pass
-    # Creates a function for the close button.  When user clicks button, UI closes.
-    def closeBtnCmd(self, *args):
-        mc.deleteUI(self.window, window=True)
-    # Creates a display options function.  This is a placeholder
-    def displayOptions(self):
-        pass
-    
-
 
 # This portion of the script allows the user to create a geometric primitive and then specify how it wants it to move.
 # It follows the module example expression but adds the ability to choose your object.  It also changes the sin function to a cos function.
@@ -162,8 +56,23 @@ class EN_ModuleThirteenWindow(EN_BaseUIWindow):
         self.time = mc.floatField(minValue = 0.001, value = 1)
         # Creates a label for the type of oscillation.
         self.labelFive=mc.text(label="Type of Oscillation")
-        # Creates a radio button group that allows the user to specify the type of oscillation the object will do.
-        self.oscillate=mc.radioButtonGrp(labelArray2=['sin', 'cos'], numberOfRadioButtons=2, select=1)
+        # Creates a drop down menu that allows the user to specify the waveform the object will follow.
+        self.oscillate=mc.optionMenu()
+        for waveform in waveformNames:
+            mc.menuItem(label=waveform)
+        # Creates a label for the oscillation mode.
+        self.labelSix=mc.text(label="Oscillation Mode")
+        # Creates a radio button group that chooses between a live expression, keys baked over a frame range,
+        # and a network of utility nodes that can be evaluated in parallel.
+        self.mode=mc.radioButtonGrp(labelArray3=['Expression', 'Bake to Keys', 'Node Network'], numberOfRadioButtons=3, select=1)
+        # Creates a label for the bake frame range.
+        self.labelSeven=mc.text(label="Bake Start and End Frame")
+        # Creates the start and end frame fields.
+        self.bakeRange=mc.intFieldGrp(numberOfFields=2, value1=1, value2=120)
+        # Creates a label for the bake tolerance.
+        self.labelEight=mc.text(label="Bake Tolerance")
+        # Creates the tolerance field.  Keys are removed as long as the curve stays within this distance of the formula.
+        self.tolerance=mc.floatField(minValue = 0, value = 0.001, precision = 4)
         # Creates a new column layout for the notes.  Makes it collapsable and gives it a label of "Notes".
         self.xformGrp = mc.frameLayout(label="Notes", collapsable=True)
         # Creates the notes text field.
@@ -171,24 +80,30 @@ class EN_ModuleThirteenWindow(EN_BaseUIWindow):
                                 "First select the type of object you wish to create.\n" + 
                                 "Next, enter the attribute you wish to be effected.\n" +
                                 "Third, enter the values for the maximum and minimum values you wish to effect as well as the number of seconds per oscillation.\n" +
-                                "Finally, select whether you want the object to oscillate using a sin or cos function.",
+                                "Then, select the waveform the object will follow: sin, cos, triangle, square, sawtooth or noise.\n" +
+                                "Finally, choose an expression, bake the oscillation to keys over a frame range, or build it from utility nodes.  Baked keys are thinned out as long as the curve stays within the tolerance.  Node networks do not use expressions, so they do not force the scene to evaluate serially.  Expressions only support sin and cos; other waveforms are built as node networks.",
                                 edit = False, ed= False, width = 400, height = 200)
                                
        
         
         
+    # Returns the controls whose values are saved by "Save Settings".
+    def settingsControls(self):
+        return {"objType": (mc.radioButtonGrp, self.objType, "select"),
+                "attribute": (mc.textField, self.attribute, "text"),
+                "max": (mc.floatField, self.max, "value"),
+                "min": (mc.floatField, self.min, "value"),
+                "time": (mc.floatField, self.time, "value"),
+                "oscillate": (mc.optionMenu, self.oscillate, "value"),
+                "mode": (mc.radioButtonGrp, self.mode, "select"),
+                "bakeStart": (mc.intFieldGrp, self.bakeRange, "value1"),
+                "bakeEnd": (mc.intFieldGrp, self.bakeRange, "value2"),
+                "tolerance": (mc.floatField, self.tolerance, "value")}
+
     # This is the function that the create button will execute when clicked.  
     def createBtnCmd(self, *args):
-        # Creates a function for the radio button group.
-        self.objIndAsCmd = {1:mc.polyCube, 2:mc.polyCone, 3:mc.polyCylinder, 4:mc.polySphere}
         # Creates the object variable for the create function.
         objIndex = mc.radioButtonGrp(self.objType, query = True, select = True)
-        # Creates a variable for the new object to be created based on the above array and objIndex variable.
-        newObject = self.objIndAsCmd[objIndex]()
-       
-        # Following section creates necessary variables for the expression.
-        # Creates a variable to select the previously created object.
-        sel = mc.ls(sl=True)
         # Creates the attribute variable using the user input from the GUI.
         att = mc.textField(self.attribute, query = True, text = True)
         # Creates the minimum value variable using the user input from the GUI.
@@ -197,40 +112,539 @@ class EN_ModuleThirteenWindow(EN_BaseUIWindow):
         maximum = mc.floatField(self.max, query = True, value = True)
         # Creates the time period variable using the user input from the GUI.
         period = mc.floatField(self.time, query = True, value = True)
-        # Creates the variable for the type of oscillation radio group.
-        oscType = mc.radioButtonGrp(self.oscillate, query = True, select = True)
-        # Creates the speed variable for which the created object will travel at.
-        speed = 6.28/period
-        # Creates the random variable.  It is created as 'ran' because random is a pre-defined function in python.
-        ran = (maximum - minimum)/2.0
-        # Creates the start variable.
-        start = minimum + ran
-        
-       
-        # Creates the expression that will drive the script.
-        # objectName.attributeName = sin(time*speed) * range + start.
-        # Creates the expression for the cos oscillation.
-        expressionTextCos = (sel[0] + "." + str(att)
-                          + " = cos(time * " + str(speed)
-                          + " ) * " + str(ran) + " + "
-                          + str(start) + ";")
-        
-        # Creates the expression for sin
-        expressionTextSin = (sel[0] + "." + str(att)
-                          + " = sin(time * " + str(speed)
-                          + " ) * " + str(ran) + " + "
-                          + str(start) + ";")
-        # Calls the expression.
-        if oscType == 1:
-            mc.expression(string=expressionTextSin)
-            print "ExpressionSin has sucessfully run."
-        elif oscType == 2:
-            mc.expression(string=expressionTextCos)
-            print "ExpressionCos has successfully run."
+        # Creates the variable for the waveform drop down menu.
+        oscType = mc.optionMenu(self.oscillate, query = True, value = True)
+        # Creates the variable for the oscillation mode radio group.
+        mode = mc.radioButtonGrp(self.mode, query = True, select = True)
+        # Creates the variables for the bake options.
+        startFrame = mc.intFieldGrp(self.bakeRange, query = True, value1 = True)
+        endFrame = mc.intFieldGrp(self.bakeRange, query = True, value2 = True)
+        tolerance = mc.floatField(self.tolerance, query = True, value = True)
+        # Creates the object and its oscillation from the values.
+        createOscillator(primitiveTypes[objIndex - 1], str(att), minimum, maximum, period, oscType,
+                         oscillationModes[mode - 1], startFrame, endFrame, tolerance)
+
+
+
+# Primitive types and oscillation modes in the order of the radio buttons.
+primitiveTypes = ["cube", "cone", "cylinder", "sphere"]
+oscillationModes = ["expression", "bake", "nodes"]
+
+# Creates a primitive and makes the given attribute oscillate, without the GUI.
+# mode is "expression", "bake" or "nodes".  The frame range and tolerance are only used when baking.
+# Returns the new object.
+def createOscillator(objType, att, minimum, maximum, period, oscType="sin", mode="expression",
+                     startFrame=1, endFrame=120, tolerance=0.001):
+    # Creates the object using the command for its type, looked up by name.
+    newObject = getattr(mc, "poly" + objType.capitalize())()[0]
+    # Bakes the oscillation to keys instead of creating an expression.
+    if mode == "bake":
+        batch = EN_OscillatorBatch([(newObject, att, minimum, maximum, period, oscType, 0.0)])
+        keyCount = batch.bake(startFrame, endFrame, sceneFps(), tolerance)
+        print "Baked %d keys." % keyCount
+        return newObject
+    # Chooses between the expression and the utility node network.
+    backend = "nodes" if mode == "nodes" else "expression"
+    # Expressions can only use the sin and cos functions, so other waveforms are built as node networks.
+    if backend == "expression" and oscType not in ("sin", "cos"):
+        print "Expressions only support sin and cos.  Building a node network for %s instead." % oscType
+        backend = "nodes"
+    # Connects the attribute to the shared expression or node network for its waveform, period and range.
+    # Objects with the same settings reuse the same nodes instead of getting new ones each.
+    oscillatorCache.connect(newObject + "." + att, oscType, minimum, maximum, period, backend)
+    print "Oscillation (%s) has successfully run." % oscType
+    return newObject
+
+
+# Converts the minimum, maximum and period from the GUI into the values used by the oscillation formula.
+# objectName.attributeName = sin(time*speed) * range + start.
+def oscillationValues(minimum, maximum, period):
+    # Creates the speed variable for which the created object will travel at.
+    speed = 6.28/period
+    # Creates the random variable.  It is created as 'ran' because random is a pre-defined function in python.
+    ran = (maximum - minimum)/2.0
+    # Creates the start variable.
+    start = minimum + ran
+    return speed, ran, start
+
+# Builds the expression text for one oscillating attribute.
+def oscillationExpression(plug, oscType, speed, ran, start):
+    return (plug + " = " + oscType + "(time * " + str(speed)
+            + " ) * " + str(ran) + " + "
+            + str(start) + ";")
+
+
+# This portion of the script shares one oscillator between every attribute with the same waveform, period and range.
+# Each unique signature gets either a network node with an "output" attribute driven by an expression,
+# or a network of utility nodes (see createNodeNetwork), and further attributes with that signature
+# are connected to the existing output.
+class EN_OscillatorCache(object):
+    # Initializes the cache.  Only the most recently used signatures are kept.
+    def __init__(self, maxSize=64):
+        self.maxSize = maxSize
+        self.nodes = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    # Connects the plug to the oscillator node for its signature, creating the node if needed.
+    # Returns the oscillator node.
+    def connect(self, plug, oscType, minimum, maximum, period, backend="expression"):
+        # The node network bakes the scene frame rate into its curve, so it is part of the signature.
+        fps = sceneFps() if backend == "nodes" else None
+        # Rounds the values so settings that only differ by float noise share a node.
+        key = (backend, fps, oscType, round(period, 6), round(minimum, 6), round(maximum, 6))
+        node = self.nodes.pop(key, None)
+        # Checks the node is still in the scene, since it may have been deleted or a new scene opened.
+        if node is not None and mc.objExists(node):
+            self.hits += 1
         else:
-            print "Expression didn't properly execute."
+            self.misses += 1
+            if backend == "nodes":
+                node = self.createNodeNetwork(oscType, minimum, maximum, period, fps)
+            else:
+                node = self.createNode(oscType, minimum, maximum, period)
+        # Marks the signature as the most recently used and evicts the least recently used ones.
+        # Evicted nodes stay in the scene and keep driving their attributes; they are just not reused.
+        self.nodes[key] = node
+        while len(self.nodes) > self.maxSize:
+            self.nodes.popitem(last=False)
+        mc.connectAttr(node + ".output", plug, force=True)
+        return node
+
+    # Creates the network node and the expression that drives its output.
+    def createNode(self, oscType, minimum, maximum, period):
+        node = mc.createNode("network", name="oscillator_%s#" % oscType)
+        mc.addAttr(node, longName="output", attributeType="double")
+        speed, ran, start = oscillationValues(minimum, maximum, period)
+        mc.expression(string=oscillationExpression(node + ".output", oscType, speed, ran, start), name=node + "_expression")
+        return node
+
+    # Creates the oscillator out of native nodes instead of an expression, so the evaluation manager can run it in parallel.
+    # One period of the unit waveform is stored as an animation curve that cycles forever and acts as a lookup table.
+    # For sin and cos every key has the exact slope of the waveform as a fixed tangent, so the curve matches the formula
+    # closely between keys.  The other waveforms are keyed from their lookup tables with linear tangents.
+    # A multDoubleLinear then scales the curve by the range and an addDoubleLinear adds the start value.
+    # Returns the addDoubleLinear node, whose output carries the oscillation.
+    def createNodeNetwork(self, oscType, minimum, maximum, period, fps=24.0):
+        speed, ran, start = oscillationValues(minimum, maximum, period)
+        # Works out the length of one cycle.  speed is 6.28/period, so it is very slightly longer than period.
+        cycle = 2*math.pi/speed
+        phase = math.pi/2.0 if oscType == "cos" else 0.0
+        # Creates the lookup curve and keys one period of the unit waveform in one call, like a baked curve.
+        curve = mc.createNode("animCurveTU", name="oscillator_%s_curve#" % oscType)
+        if oscType in ("sin", "cos"):
+            times = [cycle*index/networkSamples for index in range(networkSamples + 1)]
+            addCurveKeys(curve, [time*fps for time in times], [math.sin(time*speed + phase) for time in times],
+                         [speed*math.cos(time*speed + phase) for time in times])
+        else:
+            values = waveformTable(oscType, linearNetworkSamples)
+            addCurveKeys(curve, [cycle*index/linearNetworkSamples*fps for index in range(len(values))], values)
+        mc.setInfinity(curve, preInfinite="cycle", postInfinite="cycle")
+        mc.connectAttr("time1.outTime", curve + ".input")
+        # Scales the waveform by the range.
+        scale = mc.createNode("multDoubleLinear", name="oscillator_%s_range#" % oscType)
+        mc.connectAttr(curve + ".output", scale + ".input1")
+        mc.setAttr(scale + ".input2", ran)
+        # Offsets the waveform by the start value.
+        offset = mc.createNode("addDoubleLinear", name="oscillator_%s#" % oscType)
+        mc.connectAttr(scale + ".output", offset + ".input1")
+        mc.setAttr(offset + ".input2", start)
+        return offset
+
+    # Forgets every cached node.
+    def clear(self):
+        self.nodes.clear()
+
+# Number of keys per period in the lookup curve of a node network.
+networkSamples = 16
+# Number of keys per period for waveforms that are keyed with linear tangents.
+linearNetworkSamples = 64
+
+# Creates the cache used by the create button.
+oscillatorCache = EN_OscillatorCache()
+
+
+# This portion of the script evaluates the node networks built by createNodeNetwork without Maya.
+# It reads the nodes, connections, attributes and keys recorded by the mayaStandIn stand-in
+# and supports the node types the networks use.
+class EN_NodeNetworkSimulator(object):
+    # Initializes the simulator with a stand-in that the network was built with.
+    def __init__(self, cmds, fps=24.0):
+        self.cmds = cmds
+        self.fps = float(fps)
+        self.evaluations = 0
+
+    # Returns the value of a plug at the given time in seconds.
+    def evaluate(self, plug, time):
+        self.evaluations += 1
+        node, attr = plug.split(".", 1)
+        nodeType = self.cmds.nodes.get(node)
+        if nodeType == "time" or node == "time1":
+            return time*self.fps
+        if nodeType == "multDoubleLinear":
+            return self.input(node + ".input1", time)*self.input(node + ".input2", time)
+        if nodeType == "addDoubleLinear":
+            return self.input(node + ".input1", time) + self.input(node + ".input2", time)
+        if nodeType is not None and nodeType.startswith("animCurve"):
+            return self.evaluateCurve(node, self.input(node + ".input", time))
+        raise ValueError("Cannot simulate %s (%s)" % (plug, nodeType))
+
+    # Returns the value flowing into a plug: the connected source if there is one, otherwise the stored value.
+    def input(self, plug, time):
+        source = self.cmds.connections.get(plug)
+        if source is not None:
+            return self.evaluate(source, time)
+        return self.cmds.attrs.get(plug, 0.0)
+
+    # Evaluates an animation curve with cycling infinity and fixed tangents at the given frame.
+    def evaluateCurve(self, curve, frame):
+        keys = self.cmds.keys[curve]
+        frames = sorted(keys)
+        first = frames[0]
+        length = frames[-1] - first
+        # Wraps the frame into the keyed range, since the curve cycles before and after its keys.
+        frame = first + (frame - first) % length
+        index = max(bisect.bisect_right(frames, frame) - 1, 0)
+        if index >= len(frames) - 1:
+            return keys[frames[-1]][0]
+        startFrame = frames[index]
+        endFrame = frames[index + 1]
+        startValue, startInAngle, startAngle, startInType, startOutType = keys[startFrame]
+        endValue, endAngle, endOutAngle, endInType, endOutType = keys[endFrame]
+        weight = (frame - startFrame)/float(endFrame - startFrame)
+        # Interpolates in a straight line when either side of the span uses linear tangents.
+        if startOutType == "linear" or endInType == "linear":
+            return startValue + (endValue - startValue)*weight
+        # Converts the tangent angles (against seconds) into slopes per frame.
+        return hermitePoint(startValue, math.tan(math.radians(startAngle))/self.fps,
+                            endValue, math.tan(math.radians(endAngle))/self.fps,
+                            endFrame - startFrame, weight)
+
+
+# This portion of the script evaluates many oscillating attributes in one pass, to bake them to animation curves.
+# The curves are evaluated by Maya like any other animation, so they play back, render in batch and run in background
+# evaluation.  The batch can also preview the oscillation without baking, by setting the values whenever the time
+# changes, but that only runs in an interactive session and leaves nothing in the scene, so it is not a replacement
+# for the expressions and node networks.  Each record is (object, attribute, minimum, maximum, period, waveform,
+# phase), with the phase in radians and the waveform one of waveformNames.
+class EN_OscillatorBatch(object):
+    # Packs the records into flat arrays so each frame is evaluated in one pass.
+    # Every waveform is read from the lookup tables, so records with different waveforms still share one pass.
+    def __init__(self, records, resolution=None):
+        self.resolution = resolution or tableResolution
+        self.table, self.slopeTable = combinedWaveformTable(self.resolution)
+        self.plugs = []
+        self.waveforms = []
+        self.job = None
+        speeds = []
+        ranges = []
+        starts = []
+        phases = []
+        offsets = []
+        for obj, att, minimum, maximum, period, waveform, phase in records:
+            if waveform not in waveformNames:
+                raise ValueError("Unknown waveform: %s" % waveform)
+            speed, ran, start = oscillationValues(minimum, maximum, period)
+            self.plugs.append(obj + "." + att)
+            self.waveforms.append(waveform)
+            # Converts the speed and phase from radians to cycles so they index straight into the tables.
+            speeds.append(speed/(2*math.pi))
+            phases.append(phase/(2*math.pi))
+            ranges.append(ran)
+            starts.append(start)
+            # Finds where the waveform's table starts in the combined table.
+            offsets.append(waveformNames.index(waveform)*(self.resolution + 1))
+        if numpy is not None:
+            self.speeds = numpy.array(speeds)
+            self.ranges = numpy.array(ranges)
+            self.starts = numpy.array(starts)
+            self.phases = numpy.array(phases)
+            self.offsets = numpy.array(offsets, dtype=int)
+        else:
+            self.speeds = speeds
+            self.ranges = ranges
+            self.starts = starts
+            self.phases = phases
+            self.offsets = offsets
+
+    # Returns the value of every oscillator at the given time in seconds.
+    def evaluate(self, time):
+        if numpy is not None:
+            cycles = time*self.speeds + self.phases
+            return sampleTable(self.table, self.offsets, cycles, self.resolution)*self.ranges + self.starts
+        cycles = [time*speed + phase for speed, phase in zip(self.speeds, self.phases)]
+        return [value*ran + start for value, ran, start in
+                zip(sampleTable(self.table, self.offsets, cycles, self.resolution), self.ranges, self.starts)]
+
+    # Returns the values of every oscillator at each of the given times in seconds, one sequence per oscillator.
+    # With derivative=True it returns the rate of change per second instead.
+    def evaluateRange(self, times, derivative=False):
+        table = self.slopeTable if derivative else self.table
+        if numpy is not None:
+            cycles = numpy.outer(self.speeds, numpy.asarray(times, dtype=float)) + self.phases[:, None]
+            values = sampleTable(table, self.offsets[:, None], cycles, self.resolution)
+            if derivative:
+                # The table slopes are per cycle, so they are scaled by the cycles per second as well as the range.
+                return values*(self.ranges*self.speeds)[:, None]
+            return values*self.ranges[:, None] + self.starts[:, None]
+        rows = []
+        for speed, ran, start, phase, offset in zip(self.speeds, self.ranges, self.starts, self.phases, self.offsets):
+            values = sampleTable(table, [offset]*len(times), [time*speed + phase for time in times], self.resolution)
+            if derivative:
+                rows.append([value*ran*speed for value in values])
+            else:
+                rows.append([value*ran + start for value in values])
+        return rows
+
+    # Samples every oscillator once per frame over the frame range and writes the samples as keys.
+    # Keys the curve does not need to stay within the tolerance are dropped before anything is written.
+    # Smooth waveforms get the slope of the waveform as a fixed tangent on every key; the others use linear keys.
+    # Each curve is written by writeCurveKeys.  Returns the number of keys written.
+    def bake(self, startFrame, endFrame, fps=24.0, tolerance=0.001):
+        frames = range(int(startFrame), int(endFrame) + 1)
+        times = [frame/float(fps) for frame in frames]
+        samples = self.evaluateRange(times)
+        slopes = self.evaluateRange(times, derivative=True)
+        keyCount = 0
+        for plug, waveform, values, rates in zip(self.plugs, self.waveforms, samples, slopes):
+            if waveform not in smoothWaveforms:
+                kept = reduceKeys(values, tolerance)
+                writeCurveKeys(plug, [frames[index] for index in kept], [values[index] for index in kept])
+            else:
+                # Converts the slopes from per second to per frame for the key reduction.
+                kept = reduceKeys(values, tolerance, [rate/fps for rate in rates])
+                writeCurveKeys(plug, [frames[index] for index in kept], [values[index] for index in kept],
+                               [rates[index] for index in kept])
+            keyCount += len(kept)
+        return keyCount
+
+    # Evaluates the oscillators at the given frame and sets the values, for the preview.  Values set this way are not
+    # keyed, so they are lost on the next time change unless the preview is running.
+    def applyFrame(self, frame, fps=24.0):
+        setAttr = mc.setAttr
+        for plug, value in zip(self.plugs, self.evaluate(frame/float(fps))):
+            setAttr(plug, float(value))
+
+    # Applies the oscillators at the current scene time.  Used as the preview's timeChanged callback.
+    def applyCurrentTime(self, *args):
+        self.applyFrame(mc.currentTime(query=True), sceneFps())
+
+    # Starts previewing the oscillation with one timeChanged callback that sets every oscillator in the batch, so
+    # settings can be tried without baking.  The callback does not run in batch mode or background evaluation and is
+    # not saved with the scene, so bake the batch once the settings are right.  Returns the script job.
+    def startPreview(self):
+        if mc.about(batch=True):
+            raise RuntimeError("The oscillation preview needs an interactive session.  Bake the oscillators instead.")
+        self.stopPreview()
+        self.job = mc.scriptJob(event=["timeChanged", self.applyCurrentTime], killWithScene=True)
+        self.applyCurrentTime()
+        return self.job
+
+    # Stops the preview by removing its timeChanged callback.
+    def stopPreview(self):
+        if self.job is not None:
+            mc.scriptJob(kill=self.job, force=True)
+            self.job = None
+
+
+# Writes the keys of one attribute.  Values and slopes per second are in the attribute's UI units.  With slopes every
+# key gets a fixed tangent along its slope, otherwise linear tangents.  An attribute that has no curve yet gets a new
+# one, created and connected with commands and filled by addCurveKeys in one call.  Undo deletes that curve with its
+# keys, but redo only brings back the empty curve, since the API call is not on the undo queue.  Keys on a curve the
+# attribute already has are written with setKeyframe and keyTangent instead, so undo puts back the keys they replace.
+def writeCurveKeys(plug, frames, values, slopes=None):
+    selection = om.MSelectionList()
+    selection.add(plug)
+    attributePlug = selection.getPlug(0)
+    source = attributePlug.source()
+    if not source.isNull and source.node().hasFn(om.MFn.kAnimCurve):
+        setCurveKeys(plug, frames, values, slopes)
+        return
+    curveType = oma.MFnAnimCurve().timedAnimCurveTypeForPlug(attributePlug)
+    nodeType = {oma.MFnAnimCurve.kAnimCurveTA: "animCurveTA",
+                oma.MFnAnimCurve.kAnimCurveTL: "animCurveTL"}.get(curveType, "animCurveTU")
+    curve = mc.createNode(nodeType, name=plug.split("|")[-1].replace(".", "_"))
+    mc.connectAttr(curve + ".output", plug)
+    addCurveKeys(curve, frames, values, slopes)
+
+# Adds keys to an animation curve node in one addKeys call, instead of a setKeyframe and a keyTangent command per key.
+# Only use it on curves created in the same undo step, since the API call itself cannot be undone.
+def addCurveKeys(curve, frames, values, slopes=None):
+    selection = om.MSelectionList()
+    selection.add(curve)
+    curveFn = oma.MFnAnimCurve(selection.getDependNode(0))
+    # The API works in internal units, which are radians for angles and centimetres for distances.
+    toInternal = {oma.MFnAnimCurve.kAnimCurveTA: om.MAngle.uiToInternal,
+                  oma.MFnAnimCurve.kAnimCurveTL: om.MDistance.uiToInternal}.get(curveFn.animCurveType, float)
+    tangentType = oma.MFnAnimCurve.kTangentLinear if slopes is None else oma.MFnAnimCurve.kTangentFixed
+    unit = om.MTime.uiUnit()
+    times = [om.MTime(frame, unit) for frame in frames]
+    curveFn.addKeys(times, [toInternal(float(value)) for value in values], tangentType, tangentType)
+    if slopes is not None:
+        # Tangent angles are measured against time in seconds.
+        for time, slope in zip(times, slopes):
+            index = curveFn.find(time)
+            angle = om.MAngle(math.atan(toInternal(float(slope))))
+            curveFn.setAngle(index, angle, True)
+            curveFn.setAngle(index, angle, False)
+
+# Writes keys one command at a time, which can be undone and redone.  Takes the same arguments as writeCurveKeys.
+def setCurveKeys(target, frames, values, slopes=None):
+    for index, frame in enumerate(frames):
+        if slopes is None:
+            mc.setKeyframe(target, time=frame, value=float(values[index]),
+                           inTangentType="linear", outTangentType="linear")
+            continue
+        mc.setKeyframe(target, time=frame, value=float(values[index]))
+        # Maya measures tangent angles in degrees against time in seconds.
+        angle = math.degrees(math.atan(slopes[index]))
+        mc.keyTangent(target, edit=True, time=(frame, frame), inAngle=angle, outAngle=angle,
+                      inTangentType="fixed", outTangentType="fixed")
+
+# Returns the indices of the samples that must be kept as keys so that the curve between them
+# stays within the tolerance of every sample.  The samples are assumed to be one frame apart.
+# With slopes (per frame) the curve between keys is a Hermite spline using those slopes as tangents,
+# which is how fixed-tangent keys interpolate.  Without slopes it is a straight line.
+def reduceKeys(values, tolerance, slopes=None):
+    last = len(values) - 1
+    if last < 1:
+        return range(len(values))
+    keep = [0, last]
+    # Splits each span at its worst sample until every span is within the tolerance.
+    spans = [(0, last)]
+    while spans:
+        first, end = spans.pop()
+        if end - first < 2:
+            continue
+        errors = [abs(values[index] - value)
+                  for index, value in zip(range(first + 1, end), interpolateSpan(values, slopes, first, end))]
+        worstError = max(errors)
+        if worstError > tolerance:
+            worst = first + 1 + errors.index(worstError)
+            keep.append(worst)
+            spans.append((first, worst))
+            spans.append((worst, end))
+    keep.sort()
+    return keep
+
+# Returns the interpolated values for the frames strictly between two keys.
+def interpolateSpan(values, slopes, first, end):
+    length = float(end - first)
+    startValue = values[first]
+    endValue = values[end]
+    if slopes is None:
+        step = (endValue - startValue)/length
+        return [startValue + step*(index - first) for index in range(first + 1, end)]
+    return [hermitePoint(startValue, slopes[first], endValue, slopes[end], length, (index - first)/length)
+            for index in range(first + 1, end)]
+
+# Returns a point on a Hermite spline between two keys.
+# The slopes are per frame, length is the number of frames between the keys and s runs from 0 to 1.
+def hermitePoint(startValue, startSlope, endValue, endSlope, length, s):
+    s2 = s*s
+    s3 = s2*s
+    return ((2*s3 - 3*s2 + 1)*startValue + (s3 - 2*s2 + s)*startSlope*length
+            + (3*s2 - 2*s3)*endValue + (s3 - s2)*endSlope*length)
+
+
+# Frames per second for Maya's named time units.
+timeUnitFps = {"game": 15.0, "film": 24.0, "pal": 25.0, "ntsc": 30.0, "show": 48.0, "palf": 50.0, "ntscf": 60.0}
+
+# Returns the frames per second of the current scene.  Falls back to 24 for units not in the table above.
+def sceneFps():
+    unit = mc.currentUnit(query=True, time=True)
+    if unit and unit.endswith("fps"):
+        return float(unit[:-3])
+    return timeUnitFps.get(unit, 24.0)
+
+
+# This portion of the script precomputes one period of each waveform as a lookup table.
+# Evaluating and baking read the tables with linear interpolation instead of computing the waveform for every sample.
+# Tables are indexed by the position in the cycle, so one table serves every period and frame rate.
+waveformNames = ["sin", "cos", "triangle", "square", "sawtooth", "noise"]
+# Waveforms that are smooth enough to be keyed with fixed tangents.  The others are keyed with linear tangents.
+smoothWaveforms = ("sin", "cos", "noise")
+# Number of table entries per period.
+tableResolution = 1024
+# Random control points for the noise waveform.  The seed keeps the noise the same between sessions.
+noiseGenerator = random.Random(13)
+noisePoints = [noiseGenerator.uniform(-1.0, 1.0) for i in range(8)]
+# Memoized tables, keyed by waveform and resolution.
+waveformTables = {}
+combinedWaveformTables = {}
+
+# Returns the value of a waveform at the given point in its cycle, from 0 to 1.  Every waveform runs from -1 to 1
+# and, apart from cos and noise, starts at 0 and rises like sin.
+def waveformValue(waveform, cycle):
+    cycle = cycle % 1.0
+    if waveform == "sin":
+        return math.sin(2*math.pi*cycle)
+    if waveform == "cos":
+        return math.cos(2*math.pi*cycle)
+    if waveform == "triangle":
+        return abs(((cycle + 0.75) % 1.0)*4.0 - 2.0) - 1.0
+    if waveform == "square":
+        return 1.0 if cycle < 0.5 else -1.0
+    if waveform == "sawtooth":
+        return ((cycle + 0.5) % 1.0)*2.0 - 1.0
+    if waveform == "noise":
+        # Blends between the control points with a cosine curve so the noise is smooth and loops.
+        position = cycle*len(noisePoints)
+        index = int(position)
+        weight = (1.0 - math.cos(math.pi*(position - index)))/2.0
+        return noisePoints[index]*(1.0 - weight) + noisePoints[(index + 1) % len(noisePoints)]*weight
+    raise ValueError("Unknown waveform: %s" % waveform)
+
+# Returns one period of a waveform sampled at the given resolution.  The table has one extra entry that repeats the
+# first, so interpolating past the last sample needs no wrap.  Tables are only computed once per waveform and resolution.
+def waveformTable(waveform, resolution=tableResolution):
+    key = (waveform, resolution)
+    if key not in waveformTables:
+        waveformTables[key] = [waveformValue(waveform, index/float(resolution)) for index in range(resolution + 1)]
+    return waveformTables[key]
+
+# Returns the tables of every waveform joined end to end, together with the matching table of slopes per cycle.
+def combinedWaveformTable(resolution=tableResolution):
+    if resolution not in combinedWaveformTables:
+        values = []
+        slopes = []
+        for waveform in waveformNames:
+            table = waveformTable(waveform, resolution)
+            values.extend(table)
+            # Takes the slope from the neighbouring samples, wrapping around the period.
+            slope = [(table[(index + 1) % resolution] - table[(index - 1) % resolution])*resolution/2.0
+                     for index in range(resolution)]
+            slopes.extend(slope + slope[:1])
+        if numpy is not None:
+            values = numpy.array(values)
+            slopes = numpy.array(slopes)
+        combinedWaveformTables[resolution] = (values, slopes)
+    return combinedWaveformTables[resolution]
+
+# Reads the table at the given positions in the cycle, interpolating between neighbouring entries.
+# offsets give where each waveform's table starts in a combined table.
+def sampleTable(table, offsets, cycles, resolution=tableResolution):
+    if numpy is not None:
+        positions = (numpy.asarray(cycles) % 1.0)*resolution
+        indices = positions.astype(int)
+        weights = positions - indices
+        indices = indices + offsets
+        return table[indices]*(1.0 - weights) + table[indices + 1]*weights
+    values = []
+    for offset, cycle in zip(offsets, cycles):
+        position = (cycle % 1.0)*resolution
+        index = int(position)
+        weight = position - index
+        index += offset
+        values.append(table[index]*(1.0 - weight) + table[index + 1]*weight)
+    return values
+
+
+# Opens the GUI.
+def main():
+    return EN_ModuleThirteenWindow.showUI()
+
+#  Calls the GUI when the script is run directly, for example from the script editor.  Importing it does not.
+if __name__ == "__main__":
+    main()
 
-        
-        
-#  Calls the GUI.
-EN_ModuleThirteenWindow.showUI()
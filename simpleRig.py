@@ -1,129 +1,25 @@
-import maya.cmds as mc
-import math
+# The base window class is shared with the other tools.  Maya is only imported the first time a command is used.
+from toolCore import EN_BaseUIWindow, EN_IdleCoalescer, lazyImport, runWorkers
+import os
+import sys
+import mmap
+import array
+import struct
+import functools
+import hashlib
+import collections
+mc = lazyImport("maya.cmds")
+# The API is used to delete the skeleton templates before the scene is saved, which no script job event allows.
+om = lazyImport("maya.api.OpenMaya")
+# NumPy is optional.  When it is available joint positions are computed as one matrix product.
+numpy = lazyImport("numpy", optional=True)
 
 #This script creates a GUI that allows the user to create a basic bipedal skeleton and then scale it uniformly.
 #It also allows the user to scale individual parts of the skeleton.  
 
 
 
-# Creates the custom window class called EN_BaseUIWindow.
-class EN_BaseUIWindow(object):
-    @classmethod
-    def showUI(cls):
-        win=cls()
-        win.create()
-        return win
-    # Initializes the handle, title, and size attributes for the window class.  
-    def __init__(self):
-        self.window = "en_baseuiwindow"
-        self.title = "Base GUI Window"
-        self.size = (600, 400)
-        self.supportsToolAction = False
-        self.actionName = "Create and Close"
-    # Function to draw the window
-    def create(self):
-        # Checks to see if this window has already been created.  If it has, it deletes the window.
-        if mc.window(self.window, exists=True):
-            mc.deleteUI(self.window, window=True)
-        # Creates the window using the already initialized attributes as well as the menuBar attribute from below.
-        self.window = mc.window(self.window, title=self.title, wh=self.size, menuBar = True)
-        # Establishes themain layout of the GUI.
-        self.mainForm = mc.formLayout(numberOfDivisions=100)
-        # Calls the cmmonMenu function created below.  
-        self.commonMenu()
-        # Calls the button creation function that is created below.
-        self.commonButtons()
-        # Creates a central pane in the display.
-        self.optionsBorder = mc.tabLayout(scrollable=True, tabsVisible = False, height = 1)
-        # Nests the pane within the main form layout.
-        mc.formLayout(self.mainForm, e=True, attachForm = (
-            # Pins the top edge to the top of the UI with a padding of 0 pixels.
-            [self.optionsBorder, 'top', 0], 
-            # Pins the left edge of pane to the left of the UI with a padding of 2 pixels.
-            [self.optionsBorder, 'left', 2],
-            # Pins the right edge of the pane to the right of the UI with a padding of 2 pixels.
-            [self.optionsBorder, 'right', 2]),
-            # Pins the bottom edge of the pane to the top edge of the buttons.
-            attachControl = ([self.optionsBorder, 'bottom', 5, self.createBtn]))
-        # Allows the panel to scale with the main UI.
-        self.optionsForm = mc.formLayout(numberOfDivisions=100)
-        # Calls the display option function from below.  
-        self.displayOptions()
-        # Shows (displays) the window.
-        mc.showWindow()
-    
-    # Adds menu items to the window.
-    def commonMenu(self):
-        # Creates a drop down menu labeled "Edit".
-        self.editMenu = mc.menu(label="Edit")
-        # Creates the option to either save settings or reset the settings.  This is in the drop down menu "Edit".
-        self.editMenuSave = mc.menuItem(label = "Save Settings")
-        self.editMenuReset = mc.menuItem(label = "Reset Settings")
-        # Creates another drop down menu for the user to get help.  Labels it "Help".
-        self.helpMenu = mc.menu(label = "Help")
-        # Creates an option to get help on the menu/script.  
-        self.helpMenuItem = mc.menuItem(label = "Help on %s" %self.title)
-
-    # Function for the creation of the command buttons.
-    def commonButtons(self):
-        # Creates a button size parameter with a padding of 18 pixels.  The width is the size of the UI width minus the padding
-        # divided by three.  The height is 26 pixels.  
-        self.commonBtnSize = ((self.size[0]-18)/3, 26)
-        # Establishes the layout of the buttons.  Sets them into a row, with three buttons in the row.  Also establishes their size.
-        
-        # Creates the "create and close" button.
-        self.actionBtn = mc.button(label = self.actionName, height = self.commonBtnSize[1], command = self.actionBtnCmd)
-        # Creates the "create" button.
-        self.createBtn = mc.button(label = "Create", height = self.commonBtnSize[1], command = self.createBtnCmd)
-        # Creates the "close" button.
-        self.closeBtn = mc.button(label = "Close", height = self.commonBtnSize[1], command = self.closeBtnCmd)
-        # Dictates how the buttons scale when the user scales the UI.  
-            # First sets the main form to edit mode.
-        mc.formLayout(self.mainForm, e=True, attachForm=(
-            # Then takes each button, specifies the edge to adjust, and then specifies the value to adjust by.
-            # Pins the action button to the left of the UI with a padding of 5 pixels.
-            [self.actionBtn, 'left', 5],
-            # Pins the action button to the bottom of the UI with a padding of 5 pixels.
-            [self.actionBtn, 'bottom', 5],
-            # Pins the create button to the bottom of the UI with a padding of 5 pixels.
-            [self.createBtn, 'bottom', 5],
-            # Pins the close botton to the bottom of the UI with a padding of 5 pixels.
-            [self.closeBtn, 'bottom', 5],
-            # Pins the close button to the right of the UI with a padding of 5 pixels. 
-            [self.closeBtn, 'right', 5]),
-            # Pins buttons relative to the coordinates specified in the create(self) function according to the
-            # numberOfDivisions flag in the mainForm command.
-            attachPosition = ([self.actionBtn, 'right', 1, 33], [self.closeBtn, 'left', 0, 67]),
-            # Pins the middle button to the outer two buttons.  Allows it to scale along with the other two buttons.
-            attachControl = ([self.createBtn, 'left', 4, self.actionBtn], [self.createBtn, 'right', 4, self.closeBtn]),
-            # Makes sure that the the top edges of the buttons scale according to the above parameters.  
-            attachNone = ([self.actionBtn, 'top'], [self.createBtn, 'top'], [self.closeBtn, 'top']))
-        
-    # Function for the help menu goes here.  This will load a help text file explaining the options of the GUI.  
-    
-    # Place holder commands for the menu items
-    def editMenuSaveCmd(self, *args): 
-        pass
-    def editMenuResetCmd(self, *args): 
-        pass
-
-    # Creates function for the create and close button.  When user clicks button, action happens and UI closes.
-    def actionBtnCmd(self, *args):
-        self.createBtnCmd()
-        self.closeBtnCmd()
-    # Creates a function for the create button.  When user clicks button, UI creates something.
-    def createBtnCmd(self, *args):
-        pass
-    # Creates a function for the close button.  When user clicks button, UI closes.
-    def closeBtnCmd(self, *args):
-        mc.deleteUI(self.window, window=True)
-    # Creates a display options function.  This is a placeholder
-    def displayOptions(self):
-        pass
-    
-
-
-# This portion of the script allows the user to create a basic bipedal skeleton using the base window class from above.
+# This portion of the script allows the user to create a basic bipedal skeleton using the base window class from toolCore.
 
 #  Establishes the new window class based on the base GUI window class.
 class EN_ModuleElevenWindow(EN_BaseUIWindow):
@@ -160,6 +56,38 @@ class EN_ModuleElevenWindow(EN_BaseUIWindow):
         self.foot = mc.floatSliderGrp(label = "Foot Size", field = True, minValue = 1, value = 1)
         # Creates the overall scale slider group.
         self.scale = mc.floatSliderGrp(label = "Overall Sekeleton Size", field = True, minValue = 1, value = 1)
+        # Creates a check box that turns on the live preview.  While it is on, dragging a slider moves the joints
+        # of a preview skeleton that depend on that slider.  It starts off, so dragging only adds a skeleton to the
+        # scene when the user asks for one.
+        self.preview = mc.checkBox(label = "Live Preview", value = False)
+        self.previewSkeleton = None
+        # Connects each slider to the preview.
+        self.sliders = dict(zip(skeletonParameters, [self.neck, self.torso, self.shoulder, self.arms, self.armFor,
+                                                     self.hips, self.legs, self.legShin, self.foot, self.scale]))
+        for parameter, slider in self.sliders.items():
+            mc.floatSliderGrp(slider, e = True, dragCommand = functools.partial(self.sliderDragCmd, parameter),
+                              changeCommand = functools.partial(self.sliderDragCmd, parameter))
+
+    # Returns the sliders whose values are saved by "Save Settings".
+    def settingsControls(self):
+        return dict((parameter, (mc.floatSliderGrp, slider, "value")) for parameter, slider in self.sliders.items())
+
+    # Deletes the preview skeleton if the window is closed without creating it, then closes the window.
+    def closeBtnCmd(self, *args):
+        if self.previewSkeleton is not None:
+            self.previewSkeleton.discard()
+            self.previewSkeleton = None
+        EN_BaseUIWindow.closeBtnCmd(self, *args)
+
+    # This is the function the sliders call while they are dragged.  It passes the new value on to the preview.
+    def sliderDragCmd(self, parameter, value, *args):
+        if not mc.checkBox(self.preview, q = True, value = True):
+            return
+        # Creates the preview skeleton from the current slider values the first time a slider is dragged.
+        if self.previewSkeleton is None:
+            self.previewSkeleton = EN_SkeletonPreview([mc.floatSliderGrp(self.sliders[name], q = True, value = True)
+                                                       for name in skeletonParameters])
+        self.previewSkeleton.set(parameter, value)
         
     # This is the function that the create button will execute when clicked.  
     def createBtnCmd(self, *args):
@@ -185,68 +113,488 @@ class EN_ModuleElevenWindow(EN_BaseUIWindow):
         overallSize = mc.floatSliderGrp(self.scale, q = True, value = True)
         
         
-        # This part creates the skeleton.
-        # Creates the center hip joint
-        hip = mc.joint()
-        # Creates the chest joint and positions it using the torsoLength input.
-        chest = mc.joint(position = (0,torsoLength,0))
-        # Creates the neck joint using the neckLength input to position it.
-        mc.joint(position = (0,(neckLength+torsoLength),0))
-        # Creates the head joint two units above the neck joint.
-        mc.joint(position = (0,(neckLength+2)+torsoLength,0))
-        # Selects the chest joint.
-        mc.select(chest)
-        # Creates the right shoulder using the inverse of the shoulder width input.  Sets it equal to the chest height minus 1.
-        mc.joint(position=(-shoulderWidth, torsoLength-1, 0))
-        # Creates the right upper arm
-        mc.joint(position = (-shoulderWidth - 1, -armLength, 0))
-        # Creates the right forearm via the wrist as a viarable.
-        mc.joint(position = (-shoulderWidth -1, (-armLength +-foreArmLength), 0))
-        # Creates the right hand.
-        mc.joint(relative=True, position = (0,-2,0))
-        # Selects the chest joint.
-        mc.select(chest)
-        # Creates the left shoulder joint.
-        mc.joint(position=(shoulderWidth, torsoLength-1, 0))
-        # Creates the left upper arm.
-        mc.joint(position = (shoulderWidth + 1, -armLength, 0))
-        # Creates the left forearm.
-        mc.joint(position = (shoulderWidth + 1, (-armLength +-foreArmLength), 0))
-        # Creates the left hand.
-        mc.joint(relative=True, position = (0,-2,0))
-        # Creates the right hip joint.
-        mc.select(hip)
-        mc.joint(position = (-hipWidth, -2, 0))
-        # Creates the right thigh.
-        mc.joint(position = (-hipWidth, -legLength, 0))
-        # Creates the right shin.
-        mc.joint(position = (-hipWidth, (-legLength +- shinLength), 0))
-        # Creates the right heel.
-        mc.joint(relative=True, position=(0, -2, 0))
-        # Creates the right foot.
-        mc.joint(relative=True, position=(-footSize, -1, 0))
-        # Creates the left hip joint.
-        mc.select(hip)
-        mc.joint(position = (hipWidth, -2, 0))
-        # Creates the left thigh.
-        mc.joint(position = (hipWidth, -legLength, 0))
-        # Creates the left shin.
-        mc.joint(position = (hipWidth, (-legLength +- shinLength), 0))
-        # Creates the left heel.
-        mc.joint(relative=True, position=(0, -2, 0))
-        # Creates the left foot.
-        mc.joint(relative=True, position=(footSize, -1, 0))
-        
-        # Scales the overall size of the skeleton based on user input.
-        # Selects all of the joints.
-        mc.select(all=True)
-        # Groups the joints into one group
-        mc.group(absolute=True)
-        # Scales the group based on user input.
-        mc.scale(overallSize, overallSize, overallSize)
-        
-       
-        
-        
-#  Calls the GUI.
-EN_ModuleElevenWindow.showUI()
+        # Keeps the preview skeleton as the created one, since it already matches the sliders.
+        if self.previewSkeleton is not None and self.previewSkeleton.exists():
+            self.previewSkeleton.release()
+            self.previewSkeleton = None
+            return
+        # Creates the skeleton from the values.  Values that have been used before copy the cached skeleton.
+        skeletonTemplates.create([neckLength, torsoLength, shoulderWidth, armLength, foreArmLength,
+                                  hipWidth, legLength, shinLength, footSize, overallSize])
+
+
+
+# Names of the skeleton values in the order createSkeleton takes them.
+skeletonParameters = ["neckLength", "torsoLength", "shoulderWidth", "armLength", "foreArmLength",
+                      "hipWidth", "legLength", "shinLength", "footSize", "overallSize"]
+
+# This portion of the script describes the skeleton as a table instead of a sequence of joint commands.
+# Each row is (joint name, parent name, constant position, coefficients).  A joint's world position is the constant
+# plus each skeleton value times its coefficients, so every position can be computed from the values in one pass.
+# Parents must come before their children.  Only the centre and the left side are written out.  The right side is
+# derived from the left by mirrorJointTable.
+bipedJointTable = [
+    # Spine and head.
+    ("C_hip", None, (0, 0, 0), {}),
+    ("C_chest", "C_hip", (0, 0, 0), {"torsoLength": (0, 1, 0)}),
+    ("C_neck", "C_chest", (0, 0, 0), {"torsoLength": (0, 1, 0), "neckLength": (0, 1, 0)}),
+    ("C_head", "C_neck", (0, 2, 0), {"torsoLength": (0, 1, 0), "neckLength": (0, 1, 0)}),
+    # Left arm.
+    ("L_shoulder", "C_chest", (0, -1, 0), {"shoulderWidth": (1, 0, 0), "torsoLength": (0, 1, 0)}),
+    ("L_upperArm", "L_shoulder", (1, 0, 0), {"shoulderWidth": (1, 0, 0), "armLength": (0, -1, 0)}),
+    ("L_foreArm", "L_upperArm", (1, 0, 0), {"shoulderWidth": (1, 0, 0), "armLength": (0, -1, 0), "foreArmLength": (0, -1, 0)}),
+    ("L_hand", "L_foreArm", (1, -2, 0), {"shoulderWidth": (1, 0, 0), "armLength": (0, -1, 0), "foreArmLength": (0, -1, 0)}),
+    # Left leg.
+    ("L_hip", "C_hip", (0, -2, 0), {"hipWidth": (1, 0, 0)}),
+    ("L_thigh", "L_hip", (0, 0, 0), {"hipWidth": (1, 0, 0), "legLength": (0, -1, 0)}),
+    ("L_shin", "L_thigh", (0, 0, 0), {"hipWidth": (1, 0, 0), "legLength": (0, -1, 0), "shinLength": (0, -1, 0)}),
+    ("L_heel", "L_shin", (0, -2, 0), {"hipWidth": (1, 0, 0), "legLength": (0, -1, 0), "shinLength": (0, -1, 0)}),
+    ("L_foot", "L_heel", (0, -3, 0), {"hipWidth": (1, 0, 0), "legLength": (0, -1, 0), "shinLength": (0, -1, 0), "footSize": (1, 0, 0)}),
+]
+
+# Name prefixes of the joints that are mirrored, and the prefix each mirrored joint is given.
+mirrorNameRules = [("L_", "R_")]
+
+# Returns the mirrored name of a joint, or None if the name does not match any of the mirror rules.
+def mirroredName(name, rules=None):
+    for prefix, mirrorPrefix in rules or mirrorNameRules:
+        if name is not None and name.startswith(prefix):
+            return mirrorPrefix + name[len(prefix):]
+    return None
+
+# Returns the rows for the other side of a joint table, and the index of the row each one was mirrored from.
+# Mirrored joints get the mirrored name and parent, and their positions are reflected across x.  Joints whose parent
+# is not mirrored, like the shoulders, stay parented to the same centre joint.
+def mirrorJointTable(table, rules=None):
+    reflect = lambda vector: (-vector[0], vector[1], vector[2])
+    rows = []
+    sources = []
+    for index, (name, parent, constant, coefficients) in enumerate(table):
+        mirrorName = mirroredName(name, rules)
+        if mirrorName is None:
+            continue
+        rows.append((mirrorName, mirroredName(parent, rules) or parent, reflect(constant),
+                     dict((parameter, reflect(vector)) for parameter, vector in coefficients.items())))
+        sources.append(index)
+    return rows, sources
+
+# Returns a copy of a joint table with a chain of joints added under an existing joint, for fingers, toes, tails
+# and so on.  Each joint is placed at an offset from the one before it.  Each offset is either an (x, y, z) constant
+# or a (constant, coefficients) pair, so a segment can also grow with the skeleton values.  Chains on the left side
+# are mirrored like the rest of the table.
+def addJointChain(table, names, parent, offsets):
+    rows = dict((row[0], row) for row in table)
+    constant, coefficients = rows[parent][2], rows[parent][3]
+    chain = []
+    for name, offset in zip(names, offsets):
+        offsetCoefficients = {}
+        if len(offset) == 2:
+            offset, offsetCoefficients = offset
+        constant = tuple(a + b for a, b in zip(constant, offset))
+        coefficients = dict(coefficients)
+        for parameter, vector in offsetCoefficients.items():
+            coefficients[parameter] = tuple(a + b for a, b in zip(coefficients.get(parameter, (0, 0, 0)), vector))
+        chain.append((name, parent, constant, coefficients))
+        parent = name
+    return list(table) + chain
+
+# Compiled joint tables, keyed by the id of the table.  The table is kept alongside so the id stays valid.
+compiledJointTables = {}
+
+# Converts a joint table into its joint names, the index of each joint's parent (-1 for the root), the matrix
+# that maps skeleton values to positions and the mirror sources.  The names and parents cover the whole skeleton:
+# the rows of the table followed by their mirrored rows.  The matrix only covers the rows of the table, with one row
+# per joint coordinate and one column per skeleton value, plus a last column of constants.  The mirrored positions
+# are reflected copies of the positions at the mirror source indices.  Each table is only compiled once.
+def compileJointTable(table=None):
+    table = table or bipedJointTable
+    if id(table) in compiledJointTables:
+        return compiledJointTables[id(table)][1]
+    mirrorRows, mirrorSources = mirrorJointTable(table)
+    names = [row[0] for row in table + mirrorRows]
+    parents = [names.index(parent) if parent is not None else -1 for name, parent, constant, coefficients in table + mirrorRows]
+    matrix = []
+    for name, parent, constant, coefficients in table:
+        for axis in range(3):
+            matrix.append([coefficients.get(parameter, (0, 0, 0))[axis] for parameter in skeletonParameters]
+                          + [constant[axis]])
+    if numpy is not None:
+        matrix = numpy.array(matrix, dtype=float)
+    compiled = (names, parents, matrix, mirrorSources)
+    compiledJointTables[id(table)] = (table, compiled)
+    return compiled
+
+# Returns the world positions of every joint for each row of skeleton values, in one pass over all the rows.
+# Each row holds the values in the order of skeletonParameters.  The result has one list of (x, y, z) per row.
+# Only one side is computed from the values.  The other side is reflected from it.
+def computeJointPositions(valueRows, table=None):
+    names, parents, matrix, mirrorSources = compileJointTable(table)
+    if numpy is not None:
+        rows = numpy.asarray(valueRows, dtype=float)
+        # Adds the column of ones that picks up the constants.
+        rows = numpy.hstack([rows, numpy.ones((len(rows), 1))])
+        positions = numpy.dot(rows, matrix.T).reshape(len(rows), len(matrix)//3, 3)
+        # Reflects the mirror sources across x for every row at once.
+        mirrored = positions[:, mirrorSources]*numpy.array([-1.0, 1.0, 1.0])
+        return numpy.concatenate([positions, mirrored], axis=1)
+    positions = []
+    for row in valueRows:
+        row = list(row) + [1.0]
+        coordinates = [sum(weight*value for weight, value in zip(matrixRow, row)) for matrixRow in matrix]
+        joints = [tuple(coordinates[index:index + 3]) for index in range(0, len(coordinates), 3)]
+        positions.append(joints + [(-joints[index][0], joints[index][1], joints[index][2]) for index in mirrorSources])
+    return positions
+
+# Creates the joints from their names, parent indices and world positions.  The table order means each joint is
+# usually the child of the one before it, so the parent only has to be selected where the hierarchy branches.
+# The root is created under parent, or at the top of the scene.  Returns the names of the created joints.
+def buildJoints(names, parents, positions, parent=None):
+    if parent is None:
+        mc.select(clear=True)
+    else:
+        mc.select(parent)
+    created = []
+    for index, (name, parentIndex, position) in enumerate(zip(names, parents, positions)):
+        if parentIndex != index - 1:
+            mc.select(created[parentIndex])
+        created.append(mc.joint(name=name, position=tuple(float(value) for value in position)))
+    return created
+
+# Creates the skeleton without the GUI, so it can be built from a script or timed headless.
+def createSkeleton(neckLength=1.0, torsoLength=1.0, shoulderWidth=1.0, armLength=1.0, foreArmLength=1.0,
+                   hipWidth=1.0, legLength=1.0, shinLength=1.0, footSize=1.0, overallSize=1.0, table=None):
+    # Computes every joint position from the values.
+    values = [neckLength, torsoLength, shoulderWidth, armLength, foreArmLength,
+              hipWidth, legLength, shinLength, footSize, overallSize]
+    positions = computeJointPositions([values], table)[0]
+    return buildSkeleton(positions, overallSize, table)
+
+# Creates the skeleton from joint positions that have already been computed and scales it.  The positions must be
+# in the order of the joint table's compiled names, or of the joint names and parent indices given as joints.
+# Returns the hip joint, which is the root of the skeleton.
+def buildSkeleton(positions, overallSize=1.0, table=None, joints=None):
+    names, parents = joints or compileJointTable(table)[:2]
+    # Creates an empty group for the skeleton to live under.  Only this group is scaled, so building a skeleton
+    # never touches the rest of the scene and costs the same however big the scene is.
+    root = mc.group(empty=True, name="skeletonRoot#")
+    # Creates the joints under the group.
+    hip = buildJoints(names, parents, positions, root)[0]
+    # Scales the group based on user input.
+    mc.scale(overallSize, overallSize, overallSize, root)
+    # Returns the hip joint, which is the root of the skeleton.
+    return hip
+
+# Returns the indices of the joints each skeleton value moves, keyed by the value's name.  A joint depends on a value
+# when its row of the joint table has a coefficient for it, and mirrored joints depend on what their source does.
+# The overall size does not move any joints, since it is applied by scaling the skeleton's root group.
+def jointDependencies(table=None):
+    names, parents, matrix, mirrorSources = compileJointTable(table)
+    count = len(matrix)//3
+    dependencies = {}
+    for column, parameter in enumerate(skeletonParameters):
+        joints = [joint for joint in range(count) if any(matrix[joint*3 + axis][column] for axis in range(3))]
+        mirrored = [count + index for index, source in enumerate(mirrorSources) if source in joints]
+        dependencies[parameter] = joints + mirrored
+    return dependencies
+
+# Creates the skeleton preview class.  The preview builds one skeleton and then moves only the joints that depend on
+# each changed value, for example only the shins, heels and feet when the shin length changes.  Changes are posted
+# through an idle coalescer, so however fast a slider is dragged the scene is updated at most once per idle cycle.
+class EN_SkeletonPreview(object):
+    # Initializes the preview from a row of skeleton values.  The skeleton is built on the first update.
+    def __init__(self, values=None, table=None):
+        self.values = list(values or [1.0]*len(skeletonParameters))
+        self.table = table
+        self.dependencies = jointDependencies(table)
+        self.coalescer = EN_IdleCoalescer(self.apply)
+        self.root = None
+        self.joints = []
+        # Counts the joints moved, to show how much less work an update does than a rebuild.
+        self.jointMoves = 0
+
+    # Posts a new value.  The scene is updated the next time Maya is idle.
+    def set(self, parameter, value):
+        self.coalescer.post(parameter, value)
+
+    # Reports whether the preview skeleton is in the scene.
+    def exists(self):
+        return self.root is not None and mc.objExists(self.root)
+
+    # Applies the latest values to the preview skeleton, building it if it is not in the scene.
+    def apply(self, changes):
+        for parameter, value in changes.items():
+            self.values[skeletonParameters.index(parameter)] = value
+        overallSize = self.values[skeletonParameters.index("overallSize")]
+        positions = computeJointPositions([self.values], self.table)[0]
+        if not self.exists():
+            names, parents, matrix, mirrorSources = compileJointTable(self.table)
+            self.root = mc.group(empty=True, name="skeletonRoot#")
+            self.joints = buildJoints(names, parents, positions, self.root)
+            mc.scale(overallSize, overallSize, overallSize, self.root)
+            return
+        # Scales the root group first, so the joints moved below are placed under the scale they end up with.
+        if "overallSize" in changes:
+            mc.scale(overallSize, overallSize, overallSize, self.root)
+        # Moves each affected joint on its own, without moving its children.  Joint positions are in world space,
+        # so they are scaled by the root group's scale.
+        affected = sorted(set(joint for parameter in changes for joint in self.dependencies[parameter]))
+        for joint in affected:
+            mc.joint(self.joints[joint], edit=True, component=True,
+                     position=tuple(float(value)*overallSize for value in positions[joint]))
+        self.jointMoves += len(affected)
+
+    # Drops any waiting changes and deletes the preview skeleton.
+    def discard(self):
+        self.coalescer.pending.clear()
+        if self.exists():
+            mc.delete(self.root)
+        self.root = None
+        self.joints = []
+
+    # Applies any waiting changes and lets go of the preview skeleton, leaving it in the scene.
+    # Returns the hip joint, which is the root of the skeleton.
+    def release(self):
+        self.coalescer.flush()
+        hip = self.joints[0] if self.joints else None
+        self.root = None
+        self.joints = []
+        return hip
+
+
+# This portion of the script keeps skeletons that have already been built so repeat requests can be copied.
+# Creates the template cache class.  A template is a hidden skeleton built at overall size 1.  Requests with the same
+# values, rounded to the cache's precision, duplicate the template and only scale the copy, instead of rebuilding
+# the joints.  Templates are built from the rounded values, so every request with the same key gets the same skeleton.
+# When a folder is given, templates are also exported there and imported by later sessions.  Templates are deleted
+# just before the scene is saved, so they never end up in the user's files, and are built again when next needed.
+# They are tagged with a skeletonTemplate attribute, so a node of the same name in another scene is never copied.
+class EN_SkeletonTemplateCache(object):
+    # Initializes the cache.  Only the most recently used templates are kept.
+    def __init__(self, maxSize=16, precision=2, folder=None, table=None):
+        self.maxSize = maxSize
+        self.precision = precision
+        self.folder = folder
+        self.table = table
+        self.templates = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # The callback that deletes the templates before a save.  It is added the first time the cache is used.
+        self.saveCallback = None
+
+    # Returns the cache key for a row of skeleton values.  The overall size is applied to each copy, so it is left out.
+    def key(self, values):
+        scaleIndex = skeletonParameters.index("overallSize")
+        return tuple(round(value, self.precision) for index, value in enumerate(values) if index != scaleIndex)
+
+    # Returns the skeleton values a template is built from: the rounded values of the key at overall size 1.
+    def keyValues(self, key):
+        values = list(key)
+        values.insert(skeletonParameters.index("overallSize"), 1.0)
+        return values
+
+    # Creates a skeleton for a row of skeleton values, in the order of skeletonParameters.
+    # Returns the hip joint, which is the root of the skeleton.
+    def create(self, values):
+        if self.saveCallback is None:
+            self.saveCallback = om.MSceneMessage.addCallback(om.MSceneMessage.kBeforeSave, self.removeTemplates)
+        key = self.key(values)
+        template = self.templates.pop(key, None)
+        # Checks the template is still in the scene, since it may have been deleted or a new scene opened.
+        if template is not None and mc.objExists(template + ".skeletonTemplate"):
+            self.hits += 1
+        else:
+            self.misses += 1
+            template = self.loadTemplate(key) or self.buildTemplate(key)
+        # Marks the template as the most recently used and deletes the least recently used ones from the scene.
+        self.templates[key] = template
+        while len(self.templates) > self.maxSize:
+            evicted = self.templates.popitem(last=False)[1]
+            if mc.objExists(evicted):
+                mc.delete(evicted)
+        # Copies the template and scales the copy based on user input.
+        root = mc.duplicate(template, returnRootsOnly=True)[0]
+        root = mc.rename(root, "skeletonRoot#")
+        mc.deleteAttr(root + ".skeletonTemplate")
+        mc.setAttr(root + ".visibility", 1)
+        overallSize = values[skeletonParameters.index("overallSize")]
+        mc.scale(overallSize, overallSize, overallSize, root)
+        return mc.listRelatives(root, children=True, type="joint", fullPath=True)[0]
+
+    # Builds a hidden template from the key's values and exports it if the cache has a folder.
+    def buildTemplate(self, key):
+        names, parents, matrix, mirrorSources = compileJointTable(self.table)
+        positions = computeJointPositions([self.keyValues(key)], self.table)[0]
+        template = mc.group(empty=True, name="skeletonTemplate#")
+        buildJoints(names, parents, positions, template)
+        mc.setAttr(template + ".visibility", 0)
+        mc.addAttr(template, longName="skeletonTemplate", attributeType="bool", defaultValue=True)
+        if self.folder is not None:
+            mc.select(template)
+            mc.file(self.templatePath(key), exportSelected=True, type="mayaAscii", force=True)
+        return template
+
+    # Imports the template for a key from the cache folder.  Returns None if it has not been exported.
+    def loadTemplate(self, key):
+        if self.folder is None or not os.path.exists(self.templatePath(key)):
+            return None
+        nodes = mc.file(self.templatePath(key), i=True, returnNewNodes=True)
+        template = mc.ls(nodes, assemblies=True)[0]
+        # Tags templates exported before they were tagged.
+        if not mc.attributeQuery("skeletonTemplate", node=template, exists=True):
+            mc.addAttr(template, longName="skeletonTemplate", attributeType="bool", defaultValue=True)
+        return template
+
+    # Returns the file a template is exported to.  The file is named after a hash of its key.
+    def templatePath(self, key):
+        return os.path.join(self.folder, "skeletonTemplate_%s.ma" % hashlib.md5(repr(key)).hexdigest()[:16])
+
+    # Forgets every template.  The templates are left in the scene.
+    def clear(self):
+        self.templates.clear()
+
+    # Deletes the templates from the scene and forgets them.  Called before the scene is saved.
+    def removeTemplates(self, *args):
+        templates = [template for template in self.templates.values() if mc.objExists(template + ".skeletonTemplate")]
+        if templates:
+            mc.delete(templates)
+        self.clear()
+
+# The template cache used by the GUI.
+skeletonTemplates = EN_SkeletonTemplateCache()
+
+
+# This portion of the script saves skeletons to a binary file that other programs, such as a game engine or crowd
+# simulator, can read without Maya.  A file holds any number of skeletons that share one joint hierarchy.
+# All values are little endian.  The layout is:
+#     header     magic "ENSK", version (uint16), reserved (uint16), joint count, skeleton count and name bytes (uint32)
+#     names      the joint names, each followed by a zero byte, padded with zeros to a multiple of four bytes
+#     parents    the index of each joint's parent, -1 for the root (int32 per joint)
+#     skeletons  one record per skeleton: the overall size followed by the x, y, z of every joint (float32)
+# The records start on a four byte boundary and are all the same size, so the file can be memory mapped and read as
+# one float32 array with a row per skeleton.
+skeletonFileHeader = struct.Struct("<4sHHIII")
+skeletonFileMagic = "ENSK"
+skeletonFileVersion = 1
+
+# Writes skeletons to a binary skeleton file.  positions holds a list of (x, y, z) per joint for each skeleton,
+# and scales holds the overall size of each skeleton.
+def writeSkeletonFile(path, names, parents, positions, scales):
+    nameBlock = "".join(name + "\0" for name in names)
+    nameBlock += "\0"*(-len(nameBlock) % 4)
+    with open(path, "wb") as skeletonFile:
+        skeletonFile.write(skeletonFileHeader.pack(skeletonFileMagic, skeletonFileVersion, 0, len(names),
+                                                   len(scales), len(nameBlock)))
+        skeletonFile.write(nameBlock)
+        skeletonFile.write(struct.pack("<%di" % len(parents), *parents))
+        if numpy is not None:
+            records = numpy.hstack([numpy.asarray(scales, dtype=float).reshape(-1, 1),
+                                    numpy.asarray(positions, dtype=float).reshape(len(scales), -1)])
+            skeletonFile.write(records.astype("<f4").tostring())
+            return
+        records = array.array("f")
+        for scale, skeleton in zip(scales, positions):
+            records.append(scale)
+            for position in skeleton:
+                records.extend(position)
+        if sys.byteorder == "big":
+            records.byteswap()
+        skeletonFile.write(records.tostring())
+
+# Computes the skeletons for rows of skeleton values in one pass and writes them to a binary skeleton file.
+def exportSkeletons(path, valueRows, table=None):
+    names, parents, matrix, mirrorSources = compileJointTable(table)
+    scales = [row[skeletonParameters.index("overallSize")] for row in valueRows]
+    writeSkeletonFile(path, names, parents, computeJointPositions(valueRows, table), scales)
+
+# Reads a binary skeleton file.  Returns the joint names, the parent indices, the overall size of each skeleton and
+# the joint positions of each skeleton.  With NumPy the sizes and positions are views of the memory mapped file,
+# with positions shaped (skeletons, joints, 3), so only the parts that are used are read from disk.
+# Without NumPy the records are read as one array and the positions are a list of (x, y, z) per joint per skeleton.
+def readSkeletonFile(path):
+    with open(path, "rb") as skeletonFile:
+        data = mmap.mmap(skeletonFile.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, reserved, jointCount, skeletonCount, nameBytes = skeletonFileHeader.unpack_from(data)
+    if magic != skeletonFileMagic or version != skeletonFileVersion:
+        raise ValueError("%s is not a version %d skeleton file" % (path, skeletonFileVersion))
+    offset = skeletonFileHeader.size
+    names = data[offset:offset + nameBytes].rstrip("\0").split("\0")
+    offset += nameBytes
+    parents = list(struct.unpack_from("<%di" % jointCount, data, offset))
+    offset += 4*jointCount
+    stride = 1 + 3*jointCount
+    if numpy is not None:
+        records = numpy.frombuffer(data, dtype="<f4", count=skeletonCount*stride, offset=offset)
+        records = records.reshape(skeletonCount, stride)
+        return names, parents, records[:, 0], records[:, 1:].reshape(skeletonCount, jointCount, 3)
+    records = array.array("f")
+    records.fromstring(data[offset:offset + 4*skeletonCount*stride])
+    data.close()
+    if sys.byteorder == "big":
+        records.byteswap()
+    scales = records[::stride]
+    # Groups each skeleton's values into (x, y, z) tuples without a Python loop per joint.
+    positions = [zip(*[iter(records[index*stride + 1:(index + 1)*stride])]*3) for index in range(skeletonCount)]
+    return names, parents, scales, positions
+
+# Builds skeletons from a binary skeleton file, every one of them or only those at the given indices.
+# Returns the hip joint of each skeleton.
+def importSkeletons(path, indices=None):
+    names, parents, scales, positions = readSkeletonFile(path)
+    if indices is None:
+        indices = range(len(scales))
+    return [buildSkeleton(positions[index], float(scales[index]), joints=(names, parents)) for index in indices]
+
+
+# This portion of the script builds many skeleton variants for crowds and saves each one to its own file.
+# Reads a table of skeleton values from a CSV file with a header row of skeletonParameters names.
+# Columns that are missing default to 1.  Returns one row of values per variant.
+def loadVariantTable(path):
+    import csv
+    rows = []
+    with open(path, "rb") as csvFile:
+        for record in csv.DictReader(csvFile):
+            rows.append([float(record.get(parameter) or 1.0) for parameter in skeletonParameters])
+    return rows
+
+# Builds and saves a chunk of variants in a worker.  Each task is (path, joint positions, overall size).
+# Returns the saved paths.
+def buildVariantChunk(tasks, fileType="mayaAscii"):
+    paths = []
+    for path, positions, overallSize in tasks:
+        mc.file(new=True, force=True)
+        buildSkeleton(positions, overallSize)
+        mc.file(rename=path)
+        paths.append(mc.file(save=True, type=fileType))
+    return paths
+
+# Builds one skeleton per row of values and saves each to its own file in the output folder.
+# The joint positions of every variant are computed in one pass before any are built, and the builds are split
+# across worker processes started by runWorkers.  Run it from mayapy or Maya, or set useStandIn to build against
+# mayaStandIn.
+# Returns the saved paths.
+def createCrowdVariants(valueRows, outputFolder, workers=None, useStandIn=False, fileType="mayaAscii"):
+    import multiprocessing
+    valueRows = [list(row) for row in valueRows]
+    positions = computeJointPositions(valueRows)
+    if numpy is not None:
+        positions = positions.tolist()
+    extension = ".mb" if fileType == "mayaBinary" else ".ma"
+    tasks = [(os.path.join(outputFolder, "skeletonVariant%05d%s" % (index, extension)), variant,
+              row[skeletonParameters.index("overallSize")])
+             for index, (row, variant) in enumerate(zip(valueRows, positions))]
+    workers = workers or multiprocessing.cpu_count()
+    # Splits the variants into one chunk per worker, so each worker only starts up once.
+    chunks = [tasks[index::workers] for index in range(workers)]
+    results = runWorkers("simpleRig", "buildVariantChunk", [chunk for chunk in chunks if chunk], useStandIn,
+                         fileType=fileType)
+    return sorted(path for chunk in results for path in chunk)
+
+
+# Opens the GUI.
+def main():
+    return EN_ModuleElevenWindow.showUI()
+
+#  Calls the GUI when the script is run directly, for example from the script editor.  Importing it does not.
+if __name__ == "__main__":
+    main()
+
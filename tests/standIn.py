@@ -0,0 +1,10 @@
+# Installs the Maya stand-in for the tests.  The tools keep the maya.cmds they first use, so every test module shares
+# one stand-in and empties its scene between tests instead of installing a new one.
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import mayaStandIn
+
+cmds = sys.modules.get("maya.cmds")
+if not isinstance(cmds, mayaStandIn.EN_RecordingCmds):
+    cmds = mayaStandIn.install()
@@ -0,0 +1,109 @@
+import io
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import standIn
+import hdrReader
+
+
+# Tests writing and reading Radiance scanlines and files.
+class EN_RadianceTests(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.generator = random.Random(11)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    # Returns the four channels of a scanline that mixes runs of every length with stretches of random values.
+    def randomChannels(self, width):
+        channels = []
+        for channel in range(4):
+            values = bytearray()
+            while len(values) < width:
+                if self.generator.random() < 0.5:
+                    values.extend([self.generator.randrange(256)]*self.generator.randint(1, 300))
+                else:
+                    values.extend(self.generator.randrange(256) for index in range(self.generator.randint(1, 300)))
+            channels.append(values[:width])
+        return channels
+
+    # Writes a scanline and reads it back.
+    def roundTrip(self, channels, flat=False):
+        imageFile = io.BytesIO()
+        hdrReader.writeScanline(imageFile, channels, flat)
+        imageFile.seek(0)
+        channels = hdrReader.readRadianceScanline(imageFile, len(channels[0]))
+        self.assertEqual(imageFile.read(), b"")
+        return channels
+
+    # Run length encoded scanlines come back as they were written, including runs and stretches longer than one
+    # encoded block holds.
+    def testRunLengthRoundTrip(self):
+        for width in (8, 9, 127, 128, 129, 255, 1000, 0x7fff):
+            channels = self.randomChannels(width)
+            self.assertEqual(self.roundTrip(channels), channels)
+        for value in (0, 1, 128, 255):
+            channels = [bytearray([value]*300) for channel in range(4)]
+            self.assertEqual(self.roundTrip(channels), channels)
+        channels = [bytearray(index % 256 for index in range(300)) for channel in range(4)]
+        self.assertEqual(self.roundTrip(channels), channels)
+
+    # Flat scanlines come back as they were written.
+    def testFlatRoundTrip(self):
+        for width in (1, 7, 100):
+            channels = self.randomChannels(width)
+            # A pixel of 1, 1, 1 would be read as an old style run, so none are written.
+            channels[0] = bytearray(value or 2 for value in channels[0])
+            self.assertEqual(self.roundTrip(channels, flat=True), channels)
+
+    # Old style runs repeat the pixel before them, with each run in a row counting in the next byte up.
+    def testOldStyleRuns(self):
+        imageFile = io.BytesIO(bytearray([9, 8, 7, 130, 1, 1, 1, 2, 1, 1, 1, 1, 5, 6, 7, 129]))
+        channels = hdrReader.readRadianceScanline(imageFile, 260)
+        self.assertEqual(channels[0], bytearray([9]*259 + [5]))
+        self.assertEqual(channels[3], bytearray([130]*259 + [129]))
+
+    # Writes a file from floating point colors and reads it back within the precision of RGBE.
+    def testFileRoundTrip(self):
+        path = os.path.join(self.folder, "image.hdr")
+        width, height = 40, 6
+        rows = [[(self.generator.uniform(0, 100), self.generator.uniform(0, 1), 0.0) for column in range(width)]
+                for row in range(height)]
+        rows[2] = [(0.0, 0.0, 0.0)]*width
+        hdrReader.writeRadiance(path, width, height, rows)
+        header = hdrReader.readHeader(path)
+        self.assertEqual((header["format"], header["width"], header["height"]), ("radiance", width, height))
+        read = [hdrReader.scanlineToFloat(scanline) for scanline in hdrReader.iterScanlines(path)]
+        self.assertEqual(len(read), height)
+        for row, readRow in zip(rows, read):
+            for color, readColor in zip(row, readRow):
+                brightest = max(color)
+                for channel in range(3):
+                    self.assertAlmostEqual(float(readColor[channel]), color[channel], delta=brightest/128.0)
+
+    # A file cut short anywhere in its pixels raises a ValueError instead of returning a partial image or hanging.
+    def testTruncatedFile(self):
+        for flat in (False, True):
+            path = os.path.join(self.folder, "image.hdr")
+            hdrReader.writeTestImage(path, 64, 4, flat)
+            with open(path, "rb") as imageFile:
+                data = imageFile.read()
+            offset = hdrReader.readHeader(path)["offset"]
+            for end in range(offset, len(data), 7):
+                with open(path, "wb") as imageFile:
+                    imageFile.write(data[:end])
+                with self.assertRaises(ValueError) as raised:
+                    list(hdrReader.iterScanlines(path))
+                self.assertEqual(str(raised.exception), "Radiance file ends early")
+
+    # A run count of zero would never fill the scanline, so it is refused.
+    def testZeroRunCount(self):
+        imageFile = io.BytesIO(bytearray([2, 2, 0, 8, 0]))
+        self.assertRaises(ValueError, hdrReader.readRadianceScanline, imageFile, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
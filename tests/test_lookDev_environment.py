@@ -0,0 +1,143 @@
+import os
+import shutil
+import tempfile
+import unittest
+from standIn import cmds
+import hdrCatalog
+import hdrReader
+import lookDev_environment
+
+
+# Tests the look development set up against the stand-in scene.
+class EN_LookDevTests(unittest.TestCase):
+    def setUp(self):
+        cmds.resetScene()
+        lookDev_environment.resetLookDevState()
+        lookDev_environment.buildLookDev(True, False, True, True)
+
+    # Drags sliders after a light has been deleted.  The light is forgotten and the rest of the set up still follows.
+    def testDragAfterDelete(self):
+        cmds.delete(lookDev_environment.lookDevNodes.get("KeyLight"))
+        lookDev_environment.lookDevNodes.invalidate()
+        lookDev_environment.postControlValue("sceneScale", 2.0)
+        lookDev_environment.postControlValue("keyOne", 0.5)
+        lookDev_environment.postControlValue("rimOne", 0.75)
+        cmds.runDeferred()
+        self.assertNotIn("KeyLight", lookDev_environment.lookDevNodes)
+        self.assertNotIn("KeyLightShape", lookDev_environment.lookDevNodes)
+        fill = lookDev_environment.lookDevNodes.get("FillLight")
+        self.assertEqual(cmds.getAttr(fill + ".scale"),
+                         tuple(value*2.0 for value in lookDev_environment.getBasePose("FillLight")["scale"]))
+        self.assertEqual(cmds.getAttr(lookDev_environment.lookDevNodes.get("RimLightShape") + ".intensity"), 0.75)
+
+    # Loads a preset without three-point lighting into a scene that has the lights.  They stay driven by the sliders.
+    def testPresetWithoutLightsKeepsLights(self):
+        state = dict(lookDev_environment.defaultLookDevSpec, options={"threeLight": False, "hdrLight": False,
+                                                                      "camCreate": True, "bdCreate": True})
+        lookDev_environment.restoreLookDevState(state)
+        self.assertTrue(lookDev_environment.createdOption("threeLight"))
+        lookDev_environment.postControlValue("keyOne", 0.6)
+        cmds.runDeferred()
+        self.assertEqual(cmds.getAttr(lookDev_environment.lookDevNodes.get("KeyLightShape") + ".intensity"), 0.6)
+
+    # Saves a tuned set up as a preset and loads it into a new scene.  The parts, poses and controls come back.
+    def testPresetRoundTrip(self):
+        lookDev_environment.applyControlValues({"sceneScale": 1.5, "lightAngle": 4.0, "keyOne": 0.8,
+                                                "rimShad": True})
+        state = lookDev_environment.getLookDevState()
+        cmds.resetScene()
+        lookDev_environment.resetLookDevState()
+        lookDev_environment.restoreLookDevState(state)
+        self.assertEqual(lookDev_environment.getLookDevState(), state)
+        nodes = lookDev_environment.lookDevNodes
+        self.assertEqual(cmds.getAttr(nodes.get("KeyLightShape") + ".intensity"), 0.8)
+        self.assertEqual(cmds.getAttr(nodes.get("RimLightShape") + ".useRayTraceShadows"), True)
+        self.assertEqual(cmds.getAttr(nodes.get("BackDrop") + ".scale"),
+                         tuple(value*1.5 for value in lookDev_environment.getBasePose("BackDrop")["scale"]))
+
+    # Drags a slider after a new scene.  The look development state is reset instead of raising.
+    def testDragAfterNewScene(self):
+        cmds.file(new=True, force=True)
+        lookDev_environment.postControlValue("sceneScale", 2.0)
+        cmds.runDeferred()
+        self.assertFalse(lookDev_environment.lookDevNodes.uuids)
+
+
+# Tests the preview versions of the IBL's HDR image.
+class EN_HdrPreviewTests(unittest.TestCase):
+    def setUp(self):
+        cmds.resetScene()
+        lookDev_environment.resetLookDevState()
+        self.folder = tempfile.mkdtemp()
+        self.imagePath = os.path.join(self.folder, "studio.hdr")
+        hdrReader.writeTestImage(self.imagePath, 512, 256)
+        self.mipCache = hdrCatalog.EN_HdrMipCache(os.path.join(self.folder, "mips"))
+        lookDev_environment.hdrLibrary["mipCache"] = self.mipCache
+        # A small render, so the preview needs a level narrower than the image.
+        cmds.setAttr("defaultResolution.width", 64)
+
+    def tearDown(self):
+        lookDev_environment.hdrLibrary["mipCache"] = None
+        shutil.rmtree(self.folder)
+
+    # Builds with previews on.  The build uses the full image, and the preview level is made and used once idle.
+    def testPreviewMadeAfterBuild(self):
+        lookDev_environment.buildLookDev(False, True, False, False, self.imagePath, hdrPreview=True)
+        hdrFile = lookDev_environment.lookDevNodes.get("HdrFile")
+        self.assertEqual(cmds.getAttr(hdrFile + ".fileTextureName"), self.imagePath)
+        self.assertEqual(self.mipCache.misses, 0)
+        cmds.runDeferred()
+        self.assertEqual(self.mipCache.misses, 1)
+        texturePath = cmds.getAttr(hdrFile + ".fileTextureName")
+        self.assertEqual(os.path.dirname(os.path.dirname(texturePath)), self.mipCache.folder)
+        self.assertEqual(hdrReader.readHeader(texturePath)["width"], 256)
+        self.assertEqual(cmds.getAttr(lookDev_environment.lookDevNodes.get("IblEnvironment") + ".texture"),
+                         texturePath)
+        self.assertEqual(cmds.deferred, [])
+
+    # Switches previews off before Maya is idle.  No preview level is made.
+    def testPreviewSwitchedOff(self):
+        lookDev_environment.buildLookDev(False, True, False, False, self.imagePath, hdrPreview=True)
+        lookDev_environment.toggleHdrPreview(False)
+        cmds.runDeferred()
+        self.assertEqual(self.mipCache.misses, 0)
+        self.assertEqual(cmds.getAttr(lookDev_environment.lookDevNodes.get("HdrFile") + ".fileTextureName"),
+                         self.imagePath)
+
+
+# Tests the batch set up, run in spawned workers against the stand-in.
+class EN_LookDevBatchTests(unittest.TestCase):
+    # Assets with the same file name in different folders are saved apart, results keep the input order, and a
+    # missing asset is reported in its result instead of stopping the batch.
+    def testBatch(self):
+        import os
+        import shutil
+        import tempfile
+        folder = tempfile.mkdtemp()
+        try:
+            assetPaths = []
+            for subfolder in ("b", "a"):
+                os.makedirs(os.path.join(folder, "assets", subfolder))
+                assetPaths.append(os.path.join(folder, "assets", subfolder, "chair.ma"))
+                with open(assetPaths[-1], "w") as assetFile:
+                    assetFile.write("transform chair None 0 0 0\n")
+            assetPaths.append(os.path.join(folder, "assets", "a", "missing.ma"))
+            outputFolder = os.path.join(folder, "out")
+            results = lookDev_environment.createLookDevBatch(assetPaths, outputFolder, workers=2, useStandIn=True,
+                                                            renderJobs=True)
+            self.assertEqual([result[0] for result in results],
+                             [os.path.join(outputFolder, "b", "chair_lookDev.ma"),
+                              os.path.join(outputFolder, "a", "chair_lookDev.ma"),
+                              os.path.join(outputFolder, "a", "missing_lookDev.ma")])
+            self.assertTrue(os.path.exists(results[0][0]) and os.path.exists(results[1][0]))
+            self.assertIsNone(results[0][5])
+            self.assertIsNone(results[2][1])
+            self.assertIn("missing.ma", results[2][5])
+            with open(os.path.join(outputFolder, "renderJobs.txt")) as jobFile:
+                self.assertEqual(len(jobFile.readlines()), 2)
+        finally:
+            shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    unittest.main()
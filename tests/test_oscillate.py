@@ -0,0 +1,110 @@
+import unittest
+from standIn import cmds
+import oscillate
+
+
+# Tests the oscillators against the stand-in scene.
+class EN_BakeTests(unittest.TestCase):
+    def setUp(self):
+        cmds.resetScene()
+        cmds.resetCounts()
+        self.records = [("ball", "translateY", 0.0, 2.0, 1.5, "sin", 0.3),
+                        ("ball", "rotateX", -10.0, 10.0, 2.0, "triangle", 0.0)]
+        cmds.createNode("transform", name="ball")
+
+    # Returns the keys written for a plug, whether they went on the plug itself or on the curve connected to it.
+    def keysOf(self, plug):
+        return cmds.keys.get(plug) or cmds.keys[cmds.connections[plug].split(".")[0]]
+
+    # A new curve is filled in one addKeys call, with the same keys the key commands write.
+    def testNewCurvesMatchKeyCommands(self):
+        batch = oscillate.EN_OscillatorBatch(self.records)
+        batch.bake(1, 48)
+        self.assertEqual(cmds.callCounts.get("addKeys"), 2)
+        self.assertFalse(cmds.callCounts.get("setKeyframe"))
+        baked = dict((record[1], self.keysOf("ball." + record[1])) for record in self.records)
+        cmds.resetScene()
+        for plug, waveform in (("ball.translateY", "sin"), ("ball.rotateX", "triangle")):
+            index = batch.plugs.index(plug)
+            frames = range(1, 49)
+            values = batch.evaluateRange([frame/24.0 for frame in frames])[index]
+            slopes = batch.evaluateRange([frame/24.0 for frame in frames], derivative=True)[index]
+            kept = sorted(int(frame) for frame in baked[plug.split(".")[1]])
+            indices = [frames.index(frame) for frame in kept]
+            oscillate.setCurveKeys(plug, kept, [values[index] for index in indices],
+                                   None if waveform not in oscillate.smoothWaveforms else
+                                   [slopes[index] for index in indices])
+            for frame, key in cmds.keys[plug].items():
+                for expected, actual in zip(key, baked[plug.split(".")[1]][frame]):
+                    if isinstance(expected, float):
+                        self.assertAlmostEqual(expected, actual)
+                    else:
+                        self.assertEqual(expected, actual)
+
+    # Baking onto an attribute that already has a curve uses the key commands, so undo can put the old keys back.
+    def testExistingCurveUsesKeyCommands(self):
+        oscillate.EN_OscillatorBatch(self.records[:1]).bake(1, 24)
+        cmds.resetCounts()
+        oscillate.EN_OscillatorBatch(self.records[:1]).bake(1, 24)
+        self.assertFalse(cmds.callCounts.get("addKeys"))
+        self.assertTrue(cmds.callCounts.get("setKeyframe"))
+
+
+# Tests the preview that sets the batch's values when the time changes.
+class EN_PreviewTests(unittest.TestCase):
+    def setUp(self):
+        cmds.resetScene()
+        cmds.resetCounts()
+        cmds.createNode("transform", name="ball")
+        self.batch = oscillate.EN_OscillatorBatch([("ball", "translateY", 0.0, 2.0, 1.5, "sin", 0.3)])
+
+    def tearDown(self):
+        cmds.__dict__.pop("about", None)
+        cmds.__dict__.pop("currentTime", None)
+
+    # The preview sets the values at the current time and is removed with the scene.
+    def testPreview(self):
+        cmds.__dict__["scriptJob"] = lambda **kwargs: kwargs
+        cmds.__dict__["currentTime"] = lambda **kwargs: 12.0
+        try:
+            job = self.batch.startPreview()
+        finally:
+            cmds.__dict__.pop("scriptJob")
+        self.assertEqual(job["event"][0], "timeChanged")
+        self.assertTrue(job["killWithScene"])
+        self.assertAlmostEqual(cmds.getAttr("ball.translateY"),
+                               float(self.batch.evaluate(12.0/oscillate.sceneFps())[0]))
+
+    # Batch mode has no time changes to run the preview, so it is refused and nothing is set.
+    def testPreviewRefusedInBatch(self):
+        cmds.__dict__["about"] = lambda **kwargs: kwargs.get("batch", False)
+        self.assertRaises(RuntimeError, self.batch.startPreview)
+        self.assertFalse(cmds.callCounts.get("scriptJob"))
+        self.assertFalse(cmds.callCounts.get("setAttr"))
+
+
+# Tests the utility node networks with the stand-in's network simulator.
+class EN_NodeNetworkTests(unittest.TestCase):
+    def setUp(self):
+        cmds.resetScene()
+        cmds.resetCounts()
+
+    # The lookup curve is written in one addKeys call and the network follows the expression formula.
+    def testNetworkMatchesFormula(self):
+        cache = oscillate.EN_OscillatorCache()
+        for oscType in ("sin", "cos"):
+            cmds.createNode("transform", name=oscType + "Ball")
+            output = cache.connect(oscType + "Ball.translateY", oscType, 1.0, 3.0, 2.0, "nodes") + ".output"
+            simulator = oscillate.EN_NodeNetworkSimulator(cmds, 24.0)
+            speed, ran, start = oscillate.oscillationValues(1.0, 3.0, 2.0)
+            for frame in range(0, 96, 5):
+                time = frame/24.0
+                expected = getattr(oscillate.math, oscType)(time*speed)*ran + start
+                self.assertAlmostEqual(simulator.evaluate(output, time), expected, places=2)
+        self.assertEqual(cmds.callCounts.get("addKeys"), 2)
+        self.assertFalse(cmds.callCounts.get("setKeyframe"))
+        self.assertFalse(cmds.callCounts.get("keyTangent"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import unittest
+from standIn import cmds
+import simpleRig
+
+
+# Tests the skeleton tools against the stand-in scene.
+class EN_SkeletonPreviewTests(unittest.TestCase):
+    def setUp(self):
+        cmds.resetScene()
+
+    # Changes the overall size and the shin length in the same idle cycle.  The stand-in does not apply group scales
+    # to world positions, so the test follows Maya: a joint moved to a world position under the root's scale at that
+    # moment keeps its local position, and ends up at that position times the root's final scale.
+    def testScaleAndMoveInOneUpdate(self):
+        preview = simpleRig.EN_SkeletonPreview()
+        preview.set("shinLength", 1.0)
+        cmds.runDeferred()
+        rootScale = [1.0]
+        localPositions = {}
+        joint = cmds.joint
+        scale = cmds.scale
+        def scaleRoot(x, y, z, *args, **kwargs):
+            rootScale[0] = x
+            return scale(x, y, z, *args, **kwargs)
+        def moveJoint(*args, **kwargs):
+            if kwargs.get("edit") and kwargs.get("component"):
+                localPositions[args[0]] = [value/rootScale[0] for value in kwargs["position"]]
+            return joint(*args, **kwargs)
+        cmds.__dict__["scale"], cmds.__dict__["joint"] = scaleRoot, moveJoint
+        try:
+            preview.set("overallSize", 2.0)
+            preview.set("shinLength", 3.0)
+            cmds.runDeferred()
+        finally:
+            cmds.__dict__["scale"], cmds.__dict__["joint"] = scale, joint
+        values = [1.0]*len(simpleRig.skeletonParameters)
+        values[simpleRig.skeletonParameters.index("overallSize")] = 2.0
+        values[simpleRig.skeletonParameters.index("shinLength")] = 3.0
+        expected = simpleRig.computeJointPositions([values])[0]
+        self.assertTrue(localPositions)
+        for index, name in enumerate(preview.joints):
+            if name in localPositions:
+                for value, target in zip(localPositions[name], expected[index]):
+                    self.assertAlmostEqual(value*rootScale[0], float(target)*2.0)
+
+    # Discarding the preview deletes its skeleton and drops changes still waiting for an idle cycle.
+    def testDiscard(self):
+        preview = simpleRig.EN_SkeletonPreview()
+        preview.set("shinLength", 1.0)
+        cmds.runDeferred()
+        root = preview.root
+        preview.set("shinLength", 2.0)
+        preview.discard()
+        cmds.runDeferred()
+        self.assertFalse(cmds.objExists(root))
+        self.assertFalse(preview.exists())
+
+
+# Tests the joint table against the joint positions the original joint commands placed.
+class EN_JointTableTests(unittest.TestCase):
+    def setUp(self):
+        cmds.resetScene()
+
+    # Returns the world position of every joint the original commands created, keyed by the joint table's names.
+    # The hands, heels and feet were placed relative to their parents.
+    def commandPositions(self, neckLength, torsoLength, shoulderWidth, armLength, foreArmLength, hipWidth, legLength,
+                         shinLength, footSize, overallSize):
+        positions = {"C_hip": (0, 0, 0), "C_chest": (0, torsoLength, 0), "C_neck": (0, neckLength + torsoLength, 0),
+                     "C_head": (0, neckLength + 2 + torsoLength, 0)}
+        for prefix, side in (("L_", 1), ("R_", -1)):
+            positions[prefix + "shoulder"] = (side*shoulderWidth, torsoLength - 1, 0)
+            positions[prefix + "upperArm"] = (side*(shoulderWidth + 1), -armLength, 0)
+            positions[prefix + "foreArm"] = (side*(shoulderWidth + 1), -armLength - foreArmLength, 0)
+            positions[prefix + "hand"] = (side*(shoulderWidth + 1), -armLength - foreArmLength - 2, 0)
+            positions[prefix + "hip"] = (side*hipWidth, -2, 0)
+            positions[prefix + "thigh"] = (side*hipWidth, -legLength, 0)
+            positions[prefix + "shin"] = (side*hipWidth, -legLength - shinLength, 0)
+            positions[prefix + "heel"] = (side*hipWidth, -legLength - shinLength - 2, 0)
+            positions[prefix + "foot"] = (side*(hipWidth + footSize), -legLength - shinLength - 3, 0)
+        return positions
+
+    # Computes the positions of skeletons whose values all differ, so a value driving the wrong joint shows.
+    def testPositionsMatchJointCommands(self):
+        rows = [[1.0]*len(simpleRig.skeletonParameters),
+                [1.1, 1.7, 2.3, 1.3, 1.9, 2.9, 1.2, 2.1, 1.5, 1.0],
+                [3.0, 1.0, 1.25, 2.5, 1.75, 1.5, 4.0, 3.5, 2.25, 2.0]]
+        names = simpleRig.compileJointTable()[0]
+        for row, positions in zip(rows, simpleRig.computeJointPositions(rows)):
+            expected = self.commandPositions(*row)
+            self.assertEqual(sorted(names), sorted(expected))
+            for name, position in zip(names, positions):
+                for axis in range(3):
+                    self.assertAlmostEqual(float(position[axis]), expected[name][axis])
+
+    # Builds a skeleton and checks each joint is created under its parent at its computed position.
+    def testBuildPlacesJoints(self):
+        row = [1.1, 1.7, 2.3, 1.3, 1.9, 2.9, 1.2, 2.1, 1.5, 1.0]
+        hip = simpleRig.createSkeleton(*row)
+        names, parents = simpleRig.compileJointTable()[:2]
+        expected = self.commandPositions(*row)
+        for name, parent in zip(names, parents):
+            self.assertEqual(cmds.parents[name], names[parent] if parent >= 0 else cmds.parents[hip])
+            for axis in range(3):
+                self.assertAlmostEqual(cmds.worldPositions[name][axis], expected[name][axis])
+
+
+# Tests the skeleton template cache.
+class EN_SkeletonTemplateCacheTests(unittest.TestCase):
+    def setUp(self):
+        cmds.resetScene()
+
+    # Values that round to the same key get the skeleton of the rounded values, whichever came first.
+    def testTemplateUsesRoundedValues(self):
+        cache = simpleRig.EN_SkeletonTemplateCache(precision=1)
+        first = [1.04]*len(simpleRig.skeletonParameters)
+        second = [0.96]*len(simpleRig.skeletonParameters)
+        self.assertEqual(cache.key(first), cache.key(second))
+        cache.create(first)
+        cache.create(second)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        template = cache.templates[cache.key(first)]
+        rounded = simpleRig.computeJointPositions([[1.0]*len(simpleRig.skeletonParameters)])[0]
+        hip = cmds.listRelatives(template, children=True, type="joint")[0]
+        self.assertEqual(sorted(cmds.worldPositions[joint] for joint in [hip] + cmds.listRelatives(
+                             template, allDescendents=True, type="joint")[1:]),
+                         sorted(tuple(float(value) for value in position) for position in rounded))
+
+    # The overall size is left out of the key, since it is applied to each copy.
+    def testKeyLeavesOutOverallSize(self):
+        cache = simpleRig.EN_SkeletonTemplateCache()
+        values = [1.0]*len(simpleRig.skeletonParameters)
+        scaled = list(values)
+        scaled[simpleRig.skeletonParameters.index("overallSize")] = 3.0
+        self.assertEqual(cache.key(values), cache.key(scaled))
+        self.assertEqual(cache.keyValues(cache.key(scaled)), values)
+
+    # Saving the scene deletes the templates first, so the saved file only has the skeletons that were created.
+    def testTemplatesAreNotSaved(self):
+        import os
+        import tempfile
+        cache = simpleRig.EN_SkeletonTemplateCache()
+        cache.create([1.5]*len(simpleRig.skeletonParameters))
+        handle, path = tempfile.mkstemp(suffix=".ma")
+        os.close(handle)
+        try:
+            cmds.file(rename=path)
+            cmds.file(save=True, type="mayaAscii")
+            with open(path) as sceneFile:
+                saved = sceneFile.read()
+        finally:
+            os.remove(path)
+        self.assertNotIn("skeletonTemplate", saved)
+        self.assertIn("skeletonRoot", saved)
+        self.assertFalse(cache.templates)
+        cache.create([1.5]*len(simpleRig.skeletonParameters))
+        self.assertEqual(cache.misses, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
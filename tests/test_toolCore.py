@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+import unittest
+from standIn import cmds
+import toolCore
+import simpleRig
+
+
+# Tests the worker processes the batch tools run in.
+class EN_WorkerTests(unittest.TestCase):
+    # Builds crowd variants in two spawned workers against the stand-in and checks every file is saved.
+    def testCrowdVariantsInWorkers(self):
+        folder = tempfile.mkdtemp()
+        try:
+            rows = [[1.0 + index*0.1]*len(simpleRig.skeletonParameters) for index in range(6)]
+            paths = simpleRig.createCrowdVariants(rows, folder, workers=2, useStandIn=True)
+            self.assertEqual(paths, sorted(os.path.join(folder, name) for name in os.listdir(folder)))
+            self.assertEqual(len(paths), 6)
+        finally:
+            shutil.rmtree(folder)
+
+    # A worker that fails is reported instead of hanging or returning partial results.
+    def testFailedWorker(self):
+        with open(os.devnull, "w") as devnull:
+            stderr = os.dup(2)
+            os.dup2(devnull.fileno(), 2)
+            try:
+                self.assertRaises(RuntimeError, toolCore.runWorkers, "toolCore", "missingFunction", [[1]], True)
+            finally:
+                os.dup2(stderr, 2)
+                os.close(stderr)
+
+
+# Tests the context the tools build their nodes in.
+class EN_BuildContextTests(unittest.TestCase):
+    def setUp(self):
+        cmds.resetScene()
+        self.refreshCalls = []
+        cmds.__dict__["refresh"] = lambda *args, **kwargs: self.refreshCalls.append(kwargs)
+
+    def tearDown(self):
+        cmds.__dict__.pop("refresh", None)
+        cmds.__dict__.pop("undoInfo", None)
+
+    # Fails to open the undo chunk and checks the refresh and the timed maya.cmds are put back.
+    def testFailedEnter(self):
+        def undoInfo(**kwargs):
+            raise RuntimeError("undo is off")
+        cmds.__dict__["undoInfo"] = undoInfo
+        context = toolCore.EN_BuildContext("failedEnter")
+        self.assertRaises(RuntimeError, context.__enter__)
+        self.assertIsNone(toolCore.EN_BuildContext.active)
+        self.assertIs(toolCore.lazyImport("maya.cmds").__dict__["module"], cmds)
+        self.assertEqual(self.refreshCalls, [{"suspend": True}, {"suspend": False}])
+
+    # Fails to suspend the refresh and checks no undo chunk is opened.
+    def testFailedSuspend(self):
+        undoCalls = []
+        def refresh(**kwargs):
+            raise RuntimeError("no viewport")
+        cmds.__dict__["refresh"] = refresh
+        cmds.__dict__["undoInfo"] = lambda **kwargs: undoCalls.append(kwargs)
+        context = toolCore.EN_BuildContext("failedSuspend")
+        self.assertRaises(RuntimeError, context.__enter__)
+        self.assertEqual(undoCalls, [])
+        self.assertIsNone(toolCore.EN_BuildContext.active)
+        self.assertIs(toolCore.lazyImport("maya.cmds").__dict__["module"], cmds)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,465 @@
+import imp
+import json
+import timeit
+import importlib
+
+'''
+This module holds the code shared by the tools: the base window class that the tool windows are built on,
+the lazy importer the tools use so that importing them has no side effects and does not load Maya up front,
+and the build context the tools run their create commands in.
+'''
+
+
+# Creates a stand-in for a module that is only imported the first time one of its attributes is used.
+class EN_LazyModule(object):
+    # Stores the module name.  Nothing is imported yet.
+    def __init__(self, name):
+        self.__dict__["moduleName"] = name
+        self.__dict__["module"] = None
+
+    # Imports the module on first use and returns the attribute from it.
+    def __getattr__(self, attr):
+        module = self.__dict__["module"]
+        if module is None:
+            module = importlib.import_module(self.moduleName)
+            self.__dict__["module"] = module
+        return getattr(module, attr)
+
+# The lazy modules made so far, keyed by module name.  The tools share one for each module, so the build context can
+# put its timing stand-in in front of maya.cmds for all of them at once.
+lazyModules = {}
+
+# Returns a lazily imported module.  With optional=True it returns None instead when the module is not installed,
+# which is checked without importing it.
+def lazyImport(name, optional=False):
+    if optional:
+        try:
+            imp.find_module(name)
+        except ImportError:
+            return None
+    if name not in lazyModules:
+        lazyModules[name] = EN_LazyModule(name)
+    return lazyModules[name]
+
+mc = lazyImport("maya.cmds")
+
+
+# Creates the idle coalescer class.  Slider drags fire a command for every mouse move, which is far more often than
+# the scene can be updated.  The coalescer keeps only the latest value posted for each key and hands them to the
+# callback in one go the next time Maya is idle, so a fast drag costs at most one scene update per idle cycle.
+class EN_IdleCoalescer(object):
+    # Initializes the coalescer.  The callback is called with a dictionary of the latest value for each key.
+    def __init__(self, callback):
+        self.callback = callback
+        self.pending = {}
+        self.scheduled = False
+        # Counts the values posted and the times the callback was called, to show how much work was saved.
+        self.events = 0
+        self.applied = 0
+
+    # Stores the latest value for a key and schedules the callback if it is not already waiting.
+    def post(self, key, value):
+        self.events += 1
+        self.pending[key] = value
+        if not self.scheduled:
+            self.scheduled = True
+            mc.evalDeferred(self.flush, lowestPriority=True)
+
+    # Calls the callback with the values posted since the last call.  Does nothing if there are none.
+    def flush(self):
+        self.scheduled = False
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, {}
+        self.applied += 1
+        self.callback(pending)
+
+
+# Creates the node registry class.  Tools register the nodes they create under a key and look them up by key later.
+# Each node is stored by its UUID, which survives renames, reparenting and name clashes.  The node's full path is
+# resolved from the UUID the first time it is needed and cached, so repeated lookups cost no scene calls.
+# Call invalidate after anything that may have renamed or reparented the nodes.
+class EN_NodeRegistry(object):
+    # Initializes the empty registry.
+    def __init__(self):
+        self.uuids = {}
+        self.names = {}
+
+    # Registers a node under a key and returns its UUID.
+    def register(self, key, node):
+        self.uuids[key] = mc.ls(node, uuid=True)[0]
+        self.names.pop(key, None)
+        return self.uuids[key]
+
+    # Reports whether a node has been registered under the key.
+    def __contains__(self, key):
+        return key in self.uuids
+
+    # Returns the full path of the node registered under the key, or None if there is none or it has been deleted.
+    def get(self, key):
+        name = self.names.get(key)
+        if name is None and key in self.uuids:
+            matches = mc.ls(self.uuids[key], long=True)
+            if matches:
+                name = self.names[key] = matches[0]
+        return name
+
+    # Returns the full path of the node registered under the key.  Raises RuntimeError if it has been deleted, as a
+    # Maya command given a deleted node does, so callers that retry after a RuntimeError handle both the same way.
+    def require(self, key):
+        name = self.get(key)
+        if name is None:
+            raise RuntimeError("No node is registered under %s, or it has been deleted" % key)
+        return name
+
+    # Forgets the cached paths, so they are resolved from the UUIDs again.
+    def invalidate(self):
+        self.names.clear()
+
+    # Forgets the nodes that have been deleted, for example by opening a new scene, and returns their keys.
+    def prune(self):
+        missing = [key for key in self.uuids if self.get(key) is None]
+        for key in missing:
+            del self.uuids[key]
+        return missing
+
+    # Forgets every node.
+    def clear(self):
+        self.uuids.clear()
+        self.names.clear()
+
+
+# Creates the timed module class.  It stands in front of a module and times every function called through it.
+class EN_TimedModule(object):
+    # Initializes the stand-in.  The timings are a dictionary of [calls, seconds] lists, keyed by function name.
+    def __init__(self, module, timings):
+        self.module = module
+        self.timings = timings
+
+    # Returns a function that calls the module's function and adds its time to the timings.
+    def __getattr__(self, name):
+        function = getattr(self.module, name)
+        if not callable(function):
+            return function
+        timing = self.timings.setdefault(name, [0, 0.0])
+        def timed(*args, **kwargs):
+            startTime = timeit.default_timer()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timing[0] += 1
+                timing[1] += timeit.default_timer() - startTime
+        # Stores the function on the instance so later calls skip __getattr__.
+        self.__dict__[name] = timed
+        return timed
+
+
+# Creates the build context class.  The tools run each create command inside one:
+#     with EN_BuildContext("createLookDev"):
+#         buildLookDev()
+# Everything the build does goes into one undo chunk, so one undo removes the whole build.  The viewports are not
+# redrawn until the build is done.  What the build creates is left selected, as Maya does, unless keepSelection is set
+# to put the selection back as it was before the build.  Every maya.cmds call made through the tools is timed.  A context opened inside another one
+# does nothing, and its calls are timed by the outer one.  The finished context is kept in buildHistory under its
+# name, and its report shows where the build's time went.
+class EN_BuildContext(object):
+    # The context currently open, if there is one.
+    active = None
+
+    # Initializes the context.  Each part of it can be switched off, for example undoChunk when building in batch mode
+    # where undo is off anyway.
+    def __init__(self, name, undoChunk=True, suspendRefresh=True, keepSelection=False, timeCalls=True):
+        self.name = name
+        self.undoChunk = undoChunk
+        self.suspendRefresh = suspendRefresh
+        self.keepSelection = keepSelection
+        self.timeCalls = timeCalls
+        # The time and count of each maya.cmds call, keyed by command name, and the time of the whole build.
+        self.timings = {}
+        self.elapsed = 0.0
+        self.outer = None
+
+    # Starts timing, suspends the viewport refresh and opens the undo chunk.  The chunk is opened last, and if a step
+    # fails the ones before it are undone, since __exit__ does not run when __enter__ raises.
+    def __enter__(self):
+        if EN_BuildContext.active is not None:
+            self.outer = EN_BuildContext.active
+            return self
+        self.startTime = timeit.default_timer()
+        self.selection = mc.ls(sl=True, long=True) if self.keepSelection else None
+        suspended = False
+        timed = False
+        try:
+            if self.timeCalls:
+                self.lazyCmds = lazyImport("maya.cmds")
+                self.cmds = self.lazyCmds.__dict__["module"] or importlib.import_module(self.lazyCmds.moduleName)
+                self.lazyCmds.__dict__["module"] = EN_TimedModule(self.cmds, self.timings)
+                timed = True
+            if self.suspendRefresh:
+                mc.refresh(suspend=True)
+                suspended = True
+            if self.undoChunk:
+                mc.undoInfo(openChunk=True, chunkName=self.name)
+        except Exception:
+            try:
+                if suspended:
+                    mc.refresh(suspend=False)
+            finally:
+                if timed:
+                    self.lazyCmds.__dict__["module"] = self.cmds
+            raise
+        EN_BuildContext.active = self
+        return self
+
+    # Stops timing, puts the selection back, redraws the viewports once and closes the undo chunk, also when the
+    # build failed.  Errors are not swallowed.
+    def __exit__(self, errorType, error, traceback):
+        if self.outer is not None:
+            return False
+        try:
+            if self.timeCalls:
+                self.lazyCmds.__dict__["module"] = self.cmds
+            if self.keepSelection:
+                if self.selection:
+                    mc.select(self.selection, replace=True)
+                else:
+                    mc.select(clear=True)
+        finally:
+            try:
+                if self.suspendRefresh:
+                    mc.refresh(suspend=False)
+                    mc.refresh()
+            finally:
+                if self.undoChunk:
+                    mc.undoInfo(closeChunk=True)
+                EN_BuildContext.active = None
+                self.elapsed = timeit.default_timer() - self.startTime
+                buildHistory[self.name] = self
+        return False
+
+    # Returns the number of maya.cmds calls the build made and the seconds they took.
+    def callTotals(self):
+        return (sum(timing[0] for timing in self.timings.values()),
+                sum(timing[1] for timing in self.timings.values()))
+
+    # Prints the time of the build and of its slowest commands.
+    def report(self, limit=10):
+        calls, seconds = self.callTotals()
+        print "%s: %.2f ms, %d scene calls taking %.2f ms" % (self.name, self.elapsed*1000.0, calls, seconds*1000.0)
+        for name, (count, seconds) in sorted(self.timings.items(), key=lambda item: -item[1][1])[:limit]:
+            print "    %s: %d calls, %.3f ms" % (name, count, seconds*1000.0)
+
+# The latest finished build context of each name.
+buildHistory = {}
+
+
+# This portion of the script runs the batch tools' work in separate worker processes.
+# Each worker is a new interpreter started with subprocess instead of a forked copy of this one, since forking a
+# process that has loaded Maya is not safe.  Under mayapy each worker starts its own Maya in batch mode.
+# Returns the interpreter the workers run in.  Inside the Maya GUI that is the mayapy next to the Maya executable.
+def workerExecutable():
+    import os
+    import sys
+    folder, name = os.path.split(sys.executable)
+    if name.lower().startswith("maya") and not name.lower().startswith("mayapy"):
+        return os.path.join(folder, "mayapy" + os.path.splitext(name)[1])
+    return sys.executable
+
+# Calls module.function(chunk, **kwargs) for each chunk, each in its own worker process, and returns the results in
+# the order of the chunks.  The chunks, keyword arguments and results are passed through pickled files.  With
+# useStandIn the workers build against mayaStandIn instead of starting Maya.  Raises RuntimeError if a worker fails.
+def runWorkers(moduleName, functionName, chunks, useStandIn=False, **kwargs):
+    import os
+    import pickle
+    import shutil
+    import subprocess
+    import tempfile
+    folder = tempfile.mkdtemp()
+    try:
+        processes = []
+        for index, chunk in enumerate(chunks):
+            taskPath = os.path.join(folder, "task%d.pickle" % index)
+            resultPath = os.path.join(folder, "result%d.pickle" % index)
+            with open(taskPath, "wb") as taskFile:
+                pickle.dump((moduleName, functionName, chunk, kwargs, useStandIn), taskFile, pickle.HIGHEST_PROTOCOL)
+            # Runs from the folder the tools are in, so the worker can import them.
+            processes.append(subprocess.Popen(
+                [workerExecutable(), "-c", "import sys, toolCore; toolCore.workerMain(sys.argv[1], sys.argv[2])",
+                 taskPath, resultPath], cwd=os.path.dirname(os.path.abspath(__file__))))
+        # Waits for every worker before reading any result, so none is still running when the files are removed.
+        codes = [process.wait() for process in processes]
+        results = []
+        for index, process in enumerate(processes):
+            if codes[index] != 0:
+                raise RuntimeError("Worker %d of %s.%s exited with code %d"
+                                   % (index, moduleName, functionName, process.returncode))
+            with open(os.path.join(folder, "result%d.pickle" % index), "rb") as resultFile:
+                results.append(pickle.load(resultFile))
+        return results
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+# Runs one chunk of work in a worker process started by runWorkers, and writes its result.
+def workerMain(taskPath, resultPath):
+    import pickle
+    with open(taskPath, "rb") as taskFile:
+        moduleName, functionName, chunk, kwargs, useStandIn = pickle.load(taskFile)
+    if useStandIn:
+        import mayaStandIn
+        mayaStandIn.install()
+    else:
+        import maya.standalone
+        maya.standalone.initialize(name="python")
+    try:
+        result = getattr(importlib.import_module(moduleName), functionName)(chunk, **kwargs)
+    finally:
+        if not useStandIn:
+            maya.standalone.uninitialize()
+    with open(resultPath, "wb") as resultFile:
+        pickle.dump(result, resultFile, pickle.HIGHEST_PROTOCOL)
+
+
+# Creates the custom window class called EN_BaseUIWindow.
+class EN_BaseUIWindow(object):
+    @classmethod
+    def showUI(cls):
+        win=cls()
+        win.create()
+        return win
+    # Initializes the handle, title, and size attributes for the window class.  
+    def __init__(self):
+        self.window = "en_baseuiwindow"
+        self.title = "Base GUI Window"
+        self.size = (600, 400)
+        self.supportsToolAction = False
+        self.actionName = "Create and Close"
+    # Function to draw the window
+    def create(self):
+        # Checks to see if this window has already been created.  If it has, it deletes the window.
+        if mc.window(self.window, exists=True):
+            mc.deleteUI(self.window, window=True)
+        # Creates the window using the already initialized attributes as well as the menuBar attribute from below.
+        self.window = mc.window(self.window, title=self.title, wh=self.size, menuBar = True)
+        # Establishes themain layout of the GUI.
+        self.mainForm = mc.formLayout(numberOfDivisions=100)
+        # Calls the cmmonMenu function created below.  
+        self.commonMenu()
+        # Calls the button creation function that is created below.
+        self.commonButtons()
+        # Creates a central pane in the display.
+        self.optionsBorder = mc.tabLayout(scrollable=True, tabsVisible = False, height = 1)
+        # Nests the pane within the main form layout.
+        mc.formLayout(self.mainForm, e=True, attachForm = (
+            # Pins the top edge to the top of the UI with a padding of 0 pixels.
+            [self.optionsBorder, 'top', 0], 
+            # Pins the left edge of pane to the left of the UI with a padding of 2 pixels.
+            [self.optionsBorder, 'left', 2],
+            # Pins the right edge of the pane to the right of the UI with a padding of 2 pixels.
+            [self.optionsBorder, 'right', 2]),
+            # Pins the bottom edge of the pane to the top edge of the buttons.
+            attachControl = ([self.optionsBorder, 'bottom', 5, self.createBtn]))
+        # Allows the panel to scale with the main UI.
+        self.optionsForm = mc.formLayout(numberOfDivisions=100)
+        # Calls the display option function from below.  
+        self.displayOptions()
+        # Restores the settings the user saved last time.
+        self.loadSettings()
+        # Shows (displays) the window.
+        mc.showWindow()
+    
+    # Adds menu items to the window.
+    def commonMenu(self):
+        # Creates a drop down menu labeled "Edit".
+        self.editMenu = mc.menu(label="Edit")
+        # Creates the option to either save settings or reset the settings.  This is in the drop down menu "Edit".
+        self.editMenuSave = mc.menuItem(label = "Save Settings", command = self.editMenuSaveCmd)
+        self.editMenuReset = mc.menuItem(label = "Reset Settings", command = self.editMenuResetCmd)
+        # Creates another drop down menu for the user to get help.  Labels it "Help".
+        self.helpMenu = mc.menu(label = "Help")
+        # Creates an option to get help on the menu/script.  
+        self.helpMenuItem = mc.menuItem(label = "Help on %s" %self.title)
+
+    # Function for the creation of the command buttons.
+    def commonButtons(self):
+        # Creates a button size parameter with a padding of 18 pixels.  The width is the size of the UI width minus the padding
+        # divided by three.  The height is 26 pixels.  
+        self.commonBtnSize = ((self.size[0]-18)/3, 26)
+        # Establishes the layout of the buttons.  Sets them into a row, with three buttons in the row.  Also establishes their size.
+        
+        # Creates the "create and close" button.
+        self.actionBtn = mc.button(label = self.actionName, height = self.commonBtnSize[1], command = self.actionBtnCmd)
+        # Creates the "create" button.  It runs the window's create command as one build.
+        self.createBtn = mc.button(label = "Create", height = self.commonBtnSize[1], command = self.buildBtnCmd)
+        # Creates the "close" button.
+        self.closeBtn = mc.button(label = "Close", height = self.commonBtnSize[1], command = self.closeBtnCmd)
+        # Dictates how the buttons scale when the user scales the UI.  
+            # First sets the main form to edit mode.
+        mc.formLayout(self.mainForm, e=True, attachForm=(
+            # Then takes each button, specifies the edge to adjust, and then specifies the value to adjust by.
+            # Pins the action button to the left of the UI with a padding of 5 pixels.
+            [self.actionBtn, 'left', 5],
+            # Pins the action button to the bottom of the UI with a padding of 5 pixels.
+            [self.actionBtn, 'bottom', 5],
+            # Pins the create button to the bottom of the UI with a padding of 5 pixels.
+            [self.createBtn, 'bottom', 5],
+            # Pins the close botton to the bottom of the UI with a padding of 5 pixels.
+            [self.closeBtn, 'bottom', 5],
+            # Pins the close button to the right of the UI with a padding of 5 pixels. 
+            [self.closeBtn, 'right', 5]),
+            # Pins buttons relative to the coordinates specified in the create(self) function according to the
+            # numberOfDivisions flag in the mainForm command.
+            attachPosition = ([self.actionBtn, 'right', 1, 33], [self.closeBtn, 'left', 0, 67]),
+            # Pins the middle button to the outer two buttons.  Allows it to scale along with the other two buttons.
+            attachControl = ([self.createBtn, 'left', 4, self.actionBtn], [self.createBtn, 'right', 4, self.closeBtn]),
+            # Makes sure that the the top edges of the buttons scale according to the above parameters.  
+            attachNone = ([self.actionBtn, 'top'], [self.createBtn, 'top'], [self.closeBtn, 'top']))
+        
+    # Function for the help menu goes here.  This will load a help text file explaining the options of the GUI.  
+    
+    # Returns the controls whose values are saved by "Save Settings", keyed by setting name.  Each is
+    # (control command, control, flag), for example (mc.floatField, self.time, "value").  Windows override this.
+    def settingsControls(self):
+        return {}
+
+    # Returns the name of the option variable the window's settings are saved in.
+    def settingsName(self):
+        return type(self).__name__ + "_settings"
+
+    # Saves the values of the window's controls so they are restored the next time the window is opened.
+    def editMenuSaveCmd(self, *args):
+        settings = {}
+        for name, (command, control, flag) in self.settingsControls().items():
+            settings[name] = command(control, query = True, **{flag: True})
+        mc.optionVar(stringValue = (self.settingsName(), json.dumps(settings, separators = (",", ":"))))
+
+    # Forgets the saved settings and redraws the window with its default values.
+    def editMenuResetCmd(self, *args):
+        mc.optionVar(remove = self.settingsName())
+        self.create()
+
+    # Sets the window's controls to the saved settings, if there are any.
+    def loadSettings(self):
+        if not mc.optionVar(exists = self.settingsName()):
+            return
+        settings = json.loads(mc.optionVar(query = self.settingsName()))
+        for name, (command, control, flag) in self.settingsControls().items():
+            if name in settings:
+                command(control, edit = True, **{flag: settings[name]})
+
+    # Creates function for the create and close button.  When user clicks button, action happens and UI closes.
+    def actionBtnCmd(self, *args):
+        self.buildBtnCmd()
+        self.closeBtnCmd()
+    # Runs the create command inside a build context, so it is undone in one step and the viewports redraw once.
+    def buildBtnCmd(self, *args):
+        with EN_BuildContext(type(self).__name__):
+            self.createBtnCmd(*args)
+    # Creates a function for the create button.  When user clicks button, UI creates something.
+    def createBtnCmd(self, *args):
+        pass
+    # Creates a function for the close button.  When user clicks button, UI closes.
+    def closeBtnCmd(self, *args):
+        mc.deleteUI(self.window, window=True)
+    # Creates a display options function.  This is a placeholder
+    def displayOptions(self):
+        pass